@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Admission Control
+Per-user token buckets and per-upstream concurrency limits with bounded
+wait queues, configured from config/orchestration.json
+"""
+
+import asyncio
+import json
+import logging
+import os
+import struct
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from shared import GATEWAY_WORKERS, SharedTable, shared_table
+
+logger = logging.getLogger("apex.admission")
+
+ORCHESTRATION_CONFIG = os.getenv(
+    "APEX_ORCHESTRATION_CONFIG",
+    str(Path(__file__).resolve().parent.parent / "config" / "orchestration.json")
+)
+RATE_LIMIT_STORE = os.getenv("APEX_RATE_LIMIT_STORE", "memory")  # memory | shared | redis
+REDIS_URL = os.getenv("APEX_REDIS_URL", "redis://redis:6379/0")
+
+# Used for keys missing from the rate_limiting section
+DEFAULT_POLICY: Dict[str, Any] = {
+    "enabled": False,
+    "requests_per_minute": 100,
+    "burst": None,                # defaults to requests_per_minute
+    "upstream_concurrency": {},   # service -> max in-flight calls per replica
+    "upstream_queue": 100,        # callers allowed to wait for a slot
+    "queue_timeout_seconds": 5,
+}
+
+# Idle buckets are dropped once the table grows past this
+MAX_TRACKED_USERS = 100000
+
+
+class RateLimited(Exception):
+    """A caller is over its request budget (HTTP 429)"""
+
+    status_code = 429
+
+    def __init__(self, key: str, retry_after: float):
+        super().__init__(f"Rate limit exceeded for {key}")
+        self.key = key
+        self.retry_after = retry_after
+
+
+class Saturated(Exception):
+    """An upstream's concurrency limit and wait queue are both full"""
+
+    def __init__(self, service: str, detail: str, retry_after: float = 1.0):
+        super().__init__(detail)
+        self.service = service
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+def load_policy(path: str = ORCHESTRATION_CONFIG) -> Dict[str, Any]:
+    """The rate_limiting section of the orchestration config, with defaults"""
+    policy = dict(DEFAULT_POLICY)
+    try:
+        with open(path) as f:
+            policy.update(json.load(f).get("rate_limiting", {}))
+    except FileNotFoundError:
+        logger.info("No orchestration config at %s; admission control disabled", path)
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read orchestration config %s (%s); admission control disabled", path, e)
+    if policy["burst"] is None:
+        policy["burst"] = policy["requests_per_minute"]
+    return policy
+
+
+class RateLimitStore:
+    """Token bucket storage interface"""
+
+    name = "base"
+
+    async def take(self, key: str, rate: float, burst: float) -> Tuple[bool, float]:
+        """Take one token; returns (allowed, seconds until one is available)"""
+        raise NotImplementedError
+
+    def tracked(self) -> Optional[int]:
+        return None
+
+    async def close(self):
+        pass
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """Per-replica buckets"""
+
+    name = "memory"
+
+    def __init__(self, max_tracked: int = MAX_TRACKED_USERS):
+        self.buckets: Dict[str, list] = {}  # key -> [tokens, updated_at]
+        self.max_tracked = max_tracked
+
+    async def take(self, key: str, rate: float, burst: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if len(self.buckets) >= self.max_tracked:
+                self._sweep(now, rate, burst)
+            bucket = self.buckets[key] = [burst, now]
+        tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return True, 0.0
+        bucket[0] = tokens
+        return False, (1 - tokens) / rate
+
+    def _sweep(self, now: float, rate: float, burst: float):
+        # A bucket that has refilled completely carries no state worth keeping
+        full_after = burst / rate
+        for key in [key for key, (_, updated) in self.buckets.items() if now - updated >= full_after]:
+            del self.buckets[key]
+
+    def tracked(self) -> Optional[int]:
+        return len(self.buckets)
+
+
+_BUCKET = struct.Struct("<dd")  # tokens, updated_at (wall clock, shared by workers)
+
+
+class SharedRateLimitStore(RateLimitStore):
+    """Buckets in the cross-worker shared table: one budget per host, not per worker"""
+
+    name = "shared"
+
+    def __init__(self, table: SharedTable, prefix: str = "ratelimit"):
+        self.table = table
+        self.prefix = prefix
+
+    async def take(self, key: str, rate: float, burst: float) -> Tuple[bool, float]:
+        def refill(raw: Optional[bytes]) -> Tuple[bytes, Tuple[bool, float]]:
+            now = time.time()
+            tokens, updated = _BUCKET.unpack(raw) if raw is not None else (burst, now)
+            tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+            if tokens >= 1:
+                return _BUCKET.pack(tokens - 1, now), (True, 0.0)
+            return _BUCKET.pack(tokens, now), (False, (1 - tokens) / rate)
+
+        # A bucket idle long enough to refill completely carries no state
+        return self.table.update(f"{self.prefix}:{key}", refill, ttl=burst / rate + 1)
+
+
+# Refill-and-take in one round trip; Redis TIME keeps replicas on one clock
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, tostring(retry)}
+"""
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """Buckets in the docker-compose Redis, shared by all gateway replicas"""
+
+    name = "redis"
+
+    def __init__(self, url: str = REDIS_URL, prefix: str = "apex:ratelimit"):
+        import redis.asyncio as redis
+        self.redis = redis.from_url(url)
+        self.script = self.redis.register_script(_TOKEN_BUCKET_SCRIPT)
+        self.prefix = prefix
+
+    async def take(self, key: str, rate: float, burst: float) -> Tuple[bool, float]:
+        allowed, retry = await self.script(keys=[f"{self.prefix}:{key}"], args=[rate, burst])
+        return bool(allowed), float(retry)
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+class ConcurrencyLimit:
+    """At most `limit` holders; up to `max_queue` callers wait, the rest are refused"""
+
+    def __init__(self, service: str, limit: int, max_queue: int, max_wait: float):
+        self.service = service
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.queued_total = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    async def acquire(self):
+        """Take a slot or raise Saturated (never queues past max_queue)"""
+        if self.active < self.limit and not self.waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+        if len(self.waiters) >= self.max_queue:
+            self.rejected += 1
+            raise Saturated(self.service, f"{self.service} is at capacity ({self.limit} in flight, "
+                                          f"{len(self.waiters)} queued)")
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        self.queued_total += 1
+        try:
+            await asyncio.wait_for(waiter, timeout=self.max_wait)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise Saturated(self.service, f"Timed out after {self.max_wait:.1f}s waiting for {self.service}")
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before we were cancelled
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            try:
+                self.waiters.remove(waiter)
+            except ValueError:
+                pass
+        self.admitted += 1
+
+    def release(self):
+        # Hand the slot straight to the oldest live waiter, if any
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": len(self.waiters),
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "queued_total": self.queued_total,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+class AdmissionController:
+    """Applies the orchestration rate_limiting policy at the gateway edge"""
+
+    def __init__(self, policy: Dict[str, Any], store: RateLimitStore):
+        self.policy = policy
+        self.store = store
+        self.enabled = bool(policy["enabled"])
+        self.rate = float(policy["requests_per_minute"]) / 60
+        self.burst = float(policy["burst"])
+        # upstream_concurrency is per replica; each worker gets its share
+        self.limits: Dict[str, ConcurrencyLimit] = {
+            service: ConcurrencyLimit(service, max(1, -(-int(limit) // GATEWAY_WORKERS)),
+                                      int(policy["upstream_queue"]), float(policy["queue_timeout_seconds"]))
+            for service, limit in policy["upstream_concurrency"].items()
+        } if self.enabled else {}
+        self.allowed = 0
+        self.limited = 0
+        self.errors = 0
+
+    async def check(self, key: str):
+        """Charge one request to `key` (a user_id); raises RateLimited"""
+        if not self.enabled or self.rate <= 0:
+            return
+        try:
+            allowed, retry_after = await self.store.take(key, self.rate, self.burst)
+        except Exception:
+            # Fail open: a limiter outage must not take the gateway down with it
+            logger.exception("Rate limit check failed")
+            self.errors += 1
+            return
+        if not allowed:
+            self.limited += 1
+            raise RateLimited(key, retry_after)
+        self.allowed += 1
+
+    def limit_for(self, service: str) -> Optional[ConcurrencyLimit]:
+        return self.limits.get(service)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "store": self.store.name,
+            "requests_per_minute": self.policy["requests_per_minute"],
+            "burst": self.burst,
+            "allowed": self.allowed,
+            "rate_limited": self.limited,
+            "errors": self.errors,
+            "tracked_users": self.store.tracked(),
+            "upstreams": {service: limit.snapshot() for service, limit in self.limits.items()},
+        }
+
+    async def close(self):
+        await self.store.close()
+
+
+def create_admission_controller(path: str = ORCHESTRATION_CONFIG, kind: str = RATE_LIMIT_STORE) -> AdmissionController:
+    """Build the controller from the orchestration config and APEX_RATE_LIMIT_STORE"""
+    policy = load_policy(path)
+    if kind == "redis" and policy["enabled"]:
+        store = RedisRateLimitStore()
+    elif policy["enabled"] and (kind == "shared" or shared_table() is not None):
+        # With several workers the per-process buckets become the shared ones
+        store = SharedRateLimitStore(shared_table() or SharedTable())
+    else:
+        store = MemoryRateLimitStore()
+    return AdmissionController(policy, store)
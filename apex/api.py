@@ -4,20 +4,205 @@ APEX OMNIBUS SUPREME - Master API Gateway
 Unified interface for all APEX operations
 """
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
-import httpx
+from fastapi.responses import StreamingResponse, JSONResponse, Response
+from pydantic import BaseModel, Field, ValidationError
+from starlette.datastructures import UploadFile
+from starlette.requests import HTTPConnection
+from typing import Optional, List, Dict, Any, AsyncIterator
+from contextlib import asynccontextmanager
+import asyncio
+import json
 import os
+import time
 from datetime import datetime
 
+from warmup import Warmup  # first, so its import timestamp covers the rest
+import metrics
+import proxy
+from upstream import UpstreamPools
+from resilience import Resilience, UpstreamError
+from admission import create_admission_controller, RateLimited
+from evidence import EvidenceSpool, EvidenceError, iter_ndjson_items, iter_upload, is_ndjson_part
+from health import HealthMonitor
+from cache import create_search_cache, search_cache_key
+from batching import MemoryBatcher, BATCH_MAX_ITEMS, COALESCE_SINGLE_ADDS
+from dedup import DedupIndex, DEDUP_ENABLED
+from replication import QuorumReplicator, QuorumNotMet, QUORUM_REPLICATION
+from hot_tier import HotTierIndex, merge_hits, HOT_TIER_ENABLED, HOT_TIER_MODE
+from shared import GATEWAY_WORKERS, shared_table
+from wal import WriteBehindLog, WAL_ENABLED, WAL_DIR
+from jobs import create_job_manager, JobQueueFull, TERMINAL_STATES
+from routing import RoutingEngine, RouteDecision, AdaptiveSelector, ADAPTIVE_ROUTING
+from singleflight import SingleFlight, digest
+from pagination import (SEARCH_MAX_PAGE_SIZE, InvalidCursor, cursor_scope, decode_cursor, encode_cursor,
+                        export_pages, search_page)
+from sessions import SessionHub
+from streaming import stream_search, encode_frames, NDJSON_MEDIA_TYPE, SSE_MEDIA_TYPE, SOURCE_DEADLINE
+
+# Configuration (APEX_<SERVICE>_URL overrides, e.g. for benchmarks/mock_upstreams.py)
+CONFIG = {
+    'memory_nexus': os.getenv('APEX_MEMORY_NEXUS_URL', 'http://memory_nexus:8080'),
+    'orchestration': os.getenv('APEX_ORCHESTRATION_URL', 'http://orchestration:9000'),
+    'memory_trinity': os.getenv('APEX_MEMORY_TRINITY_URL', 'http://memory_trinity:8081'),
+    'execution_engine': os.getenv('APEX_EXECUTION_ENGINE_URL', 'http://execution_engine:9100'),
+    'intelligence': os.getenv('APEX_INTELLIGENCE_URL', 'http://intelligence:9001'),
+    'neo4j': os.getenv('APEX_NEO4J_URL', 'bolt://neo4j:7687'),
+}
+
+MEMORY_SOURCES = ['mem0', 'memory_plugin', 'supermemory']
+
+# Compiled memory routing rules (APEX_ROUTING_RULES for a hot-reloaded JSON file)
+routing_engine = RoutingEngine()
+
+# Latency/error-aware rerouting of eligible adds (APEX_ADAPTIVE_ROUTING)
+adaptive_routing = AdaptiveSelector() if ADAPTIVE_ROUTING else None
+
+# Shared upstream connection pools (one pooled client per CONFIG service)
+pools = UpstreamPools(CONFIG)
+
+# Per-user rate limits and per-upstream concurrency limits (config/orchestration.json)
+admission = create_admission_controller()
+
+# Circuit breakers, adaptive timeouts and hedging around every upstream call
+upstream = Resilience(pools, admission.limits)
+
+# Startup DNS resolution + warm connections; gates /ready
+warmup = Warmup(pools)
+
+# Background-refreshed upstream health snapshot
+health_monitor = HealthMonitor(pools)
+
+# Memory search result cache (APEX_SEARCH_CACHE=memory|redis|off)
+search_cache = create_search_cache()
+
+# Per-backend micro-batching of memory adds
+memory_batcher = MemoryBatcher(upstream)
+if adaptive_routing is not None:
+    memory_batcher.observer = adaptive_routing.observe
+
+async def _write_memory(item: Dict[str, Any], backend: str) -> Dict[str, Any]:
+    """One memory add to one backend via memory_nexus; {"memory_id": ...} or raises"""
+    if COALESCE_SINGLE_ADDS:
+        # Share an upstream batch with other concurrent adds
+        return await memory_batcher.submit(item, backend)
+    started = time.perf_counter()
+    try:
+        response = await upstream.request(
+            'memory_nexus', "POST", "/api/memory/add",
+            json={**item, "preferred_backend": backend},
+            timeout=10.0
+        )
+    except UpstreamError as e:
+        # Timed out or failed on the way to the backend (not refused up front)
+        if adaptive_routing is not None and e.retry_after is None:
+            adaptive_routing.observe(backend, time.perf_counter() - started, 1)
+        raise
+    if adaptive_routing is not None:
+        adaptive_routing.observe(backend, time.perf_counter() - started, int(response.status_code != 200))
+    if response.status_code != 200:
+        raise RuntimeError(f"Memory add failed with status {response.status_code}")
+    return {"memory_id": response.json().get('memory_id')}
+
+# Gateway-side fan-out of 'all' routed adds (APEX_QUORUM_REPLICATION)
+replicator = QuorumReplicator(MEMORY_SOURCES, _write_memory) if QUORUM_REPLICATION else None
+
+async def _flush_memory_add(record: Dict[str, Any]) -> Dict[str, Any]:
+    item = {**record["item"], "idempotency_key": record["id"]}
+    if record["backend"] == 'all' and replicator is not None:
+        # Retried until the quorum acks; the idempotency key absorbs repeats
+        return await replicator.write(item, memory_batcher.submit)
+    return await memory_batcher.submit(item, record["backend"])
+
+async def _memory_add_flushed(record: Dict[str, Any]):
+    await search_cache.invalidate_user(record["item"]["user_id"])
+
+async def _memory_add_dead_lettered(record: Dict[str, Any]):
+    # Never stored after all; a re-add must not be answered as a duplicate
+    if dedup is not None:
+        dedup.forget(record["item"]["user_id"], record["item"]["content"], record["item"].get("metadata"),
+                     record["id"])
+
+# Optional write-behind log for memory adds (APEX_WAL_ENABLED)
+memory_wal = WriteBehindLog(WAL_DIR, _flush_memory_add, on_flushed=_memory_add_flushed,
+                            on_dead_letter=_memory_add_dead_lettered) if WAL_ENABLED else None
+
+# Short-circuits re-adds of content a user already stored (APEX_DEDUP)
+dedup = DedupIndex() if DEDUP_ENABLED else None
+
+# In-process BM25 index of recently added memories (APEX_HOT_TIER)
+hot_tier = HotTierIndex() if HOT_TIER_ENABLED else None
+
+# Coalescing of identical in-flight upstream calls (APEX_SINGLEFLIGHT_ROUTES)
+singleflight = SingleFlight()
+singleflight.register('forensic_analyze', lambda request: f"{request.case_id}:{digest(request.evidence)}")
+singleflight.register('memory_search', lambda user_id, generation, cache_key: f"{user_id}:{generation}:{cache_key}")
+singleflight.register('skill_execute', lambda request: f"{request.skill}:{digest(request.params)}")
+
+# Opt-in async job mode for long upstream calls (APEX_JOBS_STORE=memory|redis)
+job_manager = create_job_manager()
+
+# Pipelined operations over /api/v1/ws (handlers registered with the endpoint)
+ws_sessions = SessionHub()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open upstream pools on startup, drain them on shutdown"""
+    await pools.start()
+    warmup.start()
+    health_monitor.start()
+    job_manager.start()
+    if memory_wal is not None:
+        await memory_wal.start()
+    if dedup is not None:
+        await dedup.start()
+    try:
+        yield
+    finally:
+        await job_manager.stop()
+        await health_monitor.stop()
+        await warmup.stop()
+        if dedup is not None:
+            await dedup.stop()
+        if memory_wal is not None:
+            await memory_wal.stop()
+        if replicator is not None:
+            await replicator.drain()
+        await memory_batcher.drain()
+        await search_cache.close()
+        await admission.close()
+        await pools.close()
+
 app = FastAPI(
     title="APEX OMNIBUS SUPREME",
     description="Supreme AI Memory & Orchestration Command Center",
-    version="2025.1.0"
+    version="2025.1.0",
+    lifespan=lifespan,
+    default_response_class=proxy.FastJSONResponse
 )
 
+@app.exception_handler(UpstreamError)
+async def upstream_error_handler(request: Request, exc: UpstreamError):
+    """Fail fast with 503 (unavailable / circuit open) or 504 (timeout)"""
+    headers = {}
+    if exc.retry_after is not None:
+        headers["Retry-After"] = str(max(1, int(exc.retry_after + 0.999)))
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail, "service": exc.service},
+        headers=headers
+    )
+
+@app.exception_handler(RateLimited)
+async def rate_limited_handler(request: Request, exc: RateLimited):
+    """Over the per-user budget from the orchestration rate_limiting policy"""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": str(exc), "retry_after": round(exc.retry_after, 2)},
+        headers={"Retry-After": str(max(1, int(exc.retry_after + 0.999)))}
+    )
+
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -27,15 +212,57 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Configuration
-CONFIG = {
-    'memory_nexus': 'http://memory_nexus:8080',
-    'orchestration': 'http://orchestration:9000',
-    'memory_trinity': 'http://memory_trinity:8081',
-    'execution_engine': 'http://execution_engine:9100',
-    'intelligence': 'http://intelligence:9001',
-    'neo4j': 'bolt://neo4j:7687',
-}
+# Prometheus request metrics (outermost, so CORS time is included)
+app.add_middleware(metrics.PrometheusMiddleware)
+metrics.register_stats(
+    "apex_upstream_pool", "Upstream connection pool usage", "service", pools.stats,
+    ["connections", "active", "idle", "queued_requests", "max_connections", "requests_total"]
+)
+metrics.register_stats(
+    "apex_upstream_admission", "Upstream concurrency limits", "service",
+    lambda: admission.stats()["upstreams"], ["limit", "active", "queued", "rejected", "timed_out"]
+)
+metrics.register_stats(
+    "apex_upstream_warm", "Connections opened per upstream during startup warm-up", "service",
+    lambda: warmup.upstreams, ["connections", "dns_ms", "warm_ms"]
+)
+metrics.register_stats(
+    "apex_upstream_breaker", "Upstream circuit breaker state", "service", upstream.stats,
+    ["is_open", "consecutive_failures", "times_opened", "rejected"]
+)
+if adaptive_routing is not None:
+    metrics.register_stats(
+        "apex_routing_backend", "Adaptive routing scores per memory backend", "backend", adaptive_routing.stats,
+        ["latency_ms", "error_rate", "score_ms", "healthy", "routed", "rerouted_to"]
+    )
+if replicator is not None:
+    metrics.register_stats(
+        "apex_memory_replica", "Quorum-replicated memory writes", "backend", replicator.stats,
+        ["writes", "failures", "background", "avg_latency_ms"]
+    )
+if hot_tier is not None:
+    metrics.register_stats(
+        "apex_memory_hot_tier", "Hot-tier memory index", "tier", lambda: {"hot": hot_tier.stats()},
+        ["docs", "users", "terms", "hits", "misses", "evicted_age", "evicted_size"]
+    )
+if dedup is not None:
+    metrics.register_stats(
+        "apex_memory_dedup", "Memory add deduplication index", "index", lambda: {"content": dedup.stats()},
+        ["entries", "hits", "inflight_hits", "misses", "hit_rate", "bloom_bytes", "memory_bytes"]
+    )
+metrics.register_stats(
+    "apex_ws_op", "WebSocket session operations", "op", lambda: ws_sessions.stats()["ops"],
+    ["count", "errors", "inflight", "avg_ms"]
+)
+metrics.register_stats(
+    "apex_ws", "WebSocket sessions", "endpoint", lambda: {"/api/v1/ws": ws_sessions.stats()},
+    ["sessions_active", "frames_in", "frames_out", "backpressure_waits", "dropped_sessions"]
+)
+if memory_wal is not None:
+    metrics.register_stats(
+        "apex_memory_wal", "Memory add write-behind log", "log", lambda: {"memory_nexus": memory_wal.stats()},
+        ["pending", "lag_seconds", "log_bytes", "segments", "dead_lettered"]
+    )
 
 # ============================================
 # DATA MODELS
@@ -50,7 +277,11 @@ class MemorySearchRequest(BaseModel):
     query: str
     user_id: str
     sources: Optional[List[str]] = None
-    limit: Optional[int] = 10
+    limit: Optional[int] = Field(10, ge=1)
+    # Paged response ({"results", "page_size", "next_cursor"}): set paginate
+    # for the first page, then send each page's next_cursor back as cursor
+    paginate: bool = False
+    cursor: Optional[str] = None
 
 class ForensicAnalyzeRequest(BaseModel):
     case_id: str
@@ -74,27 +305,67 @@ async def health_check():
         "power_level": "SUPREME"
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: passes once upstream warm-up has finished (liveness is /health)"""
+    report = warmup.report()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus scrape endpoint"""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE_LATEST)
+
 @app.get("/api/v1/status")
 async def get_system_status():
-    """Get comprehensive system status"""
-    status = {}
-    
-    async with httpx.AsyncClient() as client:
-        for service, url in CONFIG.items():
-            if service == 'neo4j':
-                continue
-            try:
-                response = await client.get(f"{url}/health", timeout=2.0)
-                status[service] = {
-                    "status": "healthy" if response.status_code == 200 else "degraded",
-                    "response_time_ms": response.elapsed.total_seconds() * 1000
-                }
-            except:
-                status[service] = {"status": "unhealthy", "response_time_ms": None}
+    """Get comprehensive system status (served from the health snapshot)"""
+    snapshot = await health_monitor.snapshot()
     
     return {
-        "overall_status": "operational",
-        "services": status,
+        **snapshot,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v1/workers")
+async def get_workers():
+    """Worker layout and the cross-worker shared state table"""
+    table = shared_table()
+    return {
+        "workers": GATEWAY_WORKERS,
+        "pid": os.getpid(),
+        "shared_state": table.stats() if table is not None else None,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v1/upstream/pools")
+async def get_upstream_pools():
+    """Connection pool settings and usage per upstream"""
+    return {
+        "pools": pools.stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v1/singleflight")
+async def get_singleflight_stats():
+    """Per-route request coalescing counters"""
+    return {
+        "routes": singleflight.stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v1/admission")
+async def get_admission_stats():
+    """Rate limiting and upstream concurrency limits"""
+    return {
+        "admission": admission.stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v1/upstream/breakers")
+async def get_upstream_breakers():
+    """Circuit breaker state, latency percentiles and hedging per upstream"""
+    return {
+        "upstreams": upstream.stats(),
         "timestamp": datetime.utcnow().isoformat()
     }
 
@@ -106,122 +377,769 @@ async def get_system_status():
 async def add_memory(request: MemoryAddRequest):
     """Add memory with intelligent routing"""
     
+    await admission.check(request.user_id)
+    
     # Analyze content to determine optimal backend
-    backend = _route_memory_add(request.content, request.metadata)
+    route = _route_memory_add(request.content, request.metadata)
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{CONFIG['memory_nexus']}/api/memory/add",
-            json={
-                "content": request.content,
-                "user_id": request.user_id,
-                "metadata": request.metadata,
-                "preferred_backend": backend
-            },
-            timeout=10.0
-        )
-        
-        if response.status_code == 200:
-            return {
+    # Critical ('all') adds always go through: an earlier ordinary add of
+    # the same content reached only one backend
+    if dedup is not None and route.backend != 'all':
+        result, duplicate = await dedup.add_once(request.user_id, request.content, request.metadata,
+                                                 lambda: _store_memory(request, route))
+        if duplicate:
+            # Already stored for this user; answer with the original memory_id
+            return proxy.respond({
                 "success": True,
-                "backend_used": backend,
-                "memory_id": response.json().get('memory_id'),
+                **result,
+                "deduplicated": True,
                 "timestamp": datetime.utcnow().isoformat()
-            }
+            })
+        return proxy.respond(result)
+    return proxy.respond(await _store_memory(request, route))
+
+async def _store_memory(request: MemoryAddRequest, route: RouteDecision) -> Dict[str, Any]:
+    """Write one routed memory add (add_memory minus admission and dedup)"""
+    backend = route.backend
+    
+    if memory_wal is not None:
+        # Durable locally; memory_nexus gets it from the background flusher
+        record = await memory_wal.append({
+            "content": request.content,
+            "user_id": request.user_id,
+            "metadata": request.metadata
+        }, backend)
+        if hot_tier is not None:
+            hot_tier.add(request.user_id, record["id"], request.content, request.metadata, backend)
+        return {
+            "success": True,
+            "backend_used": backend,
+            "routing_rule": route.rule,
+            **({"rerouted_from": route.rerouted_from} if route.rerouted_from else {}),
+            "memory_id": record["id"],
+            "pending": True,
+            **({"durable": False} if record.get("durable") is False else {}),
+            "timestamp": datetime.utcnow().isoformat()
+        }
+    
+    item = {
+        "content": request.content,
+        "user_id": request.user_id,
+        "metadata": request.metadata
+    }
+    replication = None
+    try:
+        if backend == 'all' and replicator is not None:
+            # Concurrent per-backend writes; answer at the write quorum
+            replication = await replicator.write(item)
+            memory_id = replication["memory_id"]
         else:
-            raise HTTPException(status_code=500, detail="Memory add failed")
+            memory_id = (await _write_memory(item, backend)).get('memory_id')
+    except QuorumNotMet as e:
+        raise HTTPException(status_code=500, detail={"error": "Memory add failed: write quorum not met", **e.result})
+    except UpstreamError:
+        raise
+    except Exception:
+        raise HTTPException(status_code=500, detail="Memory add failed")
+    
+    # Write-through invalidation of this user's cached searches
+    await search_cache.invalidate_user(request.user_id)
+    if hot_tier is not None:
+        hot_tier.add(request.user_id, memory_id, request.content, request.metadata, backend)
+    return {
+        "success": True,
+        "backend_used": backend,
+        "routing_rule": route.rule,
+        **({"rerouted_from": route.rerouted_from} if route.rerouted_from else {}),
+        "memory_id": memory_id,
+        **({"replication": replication} if replication is not None else {}),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.post("/api/v1/memory/add_batch")
+async def add_memory_batch(request: Request):
+    """Add many memories at once (JSON array or NDJSON stream)"""
+    
+    await admission.check(_caller_key(request))
+    
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        items = _iter_ndjson(request)
+    else:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if isinstance(body, dict):
+            body = body.get("memories")
+        if not isinstance(body, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if len(body) > BATCH_MAX_ITEMS:
+            raise HTTPException(status_code=413, detail=f"Batch exceeds {BATCH_MAX_ITEMS} items")
+        items = _iter_list(body)
+    
+    # Items are routed and queued as they arrive, so NDJSON uploads
+    # start flushing upstream before the body has been fully received.
+    # Queued items cannot be taken back, so an NDJSON stream over the
+    # limit is cut off there and the items already accepted are reported.
+    tasks = []
+    truncated = False
+    async for item in items:
+        if len(tasks) >= BATCH_MAX_ITEMS:
+            truncated = True
+            break
+        tasks.append(asyncio.ensure_future(_add_batch_item(len(tasks), item)))
+    
+    results = await asyncio.gather(*tasks)
+    
+    for user_id in {result.pop("user_id") for result in results if result.get("user_id")}:
+        await search_cache.invalidate_user(user_id)
+    
+    succeeded = sum(1 for result in results if result["success"])
+    return proxy.respond({
+        "success": succeeded == len(results) and not truncated,
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+        **({"truncated": True,
+            "error": f"Batch exceeds {BATCH_MAX_ITEMS} items; the rest of the stream was not read"}
+           if truncated else {}),
+        "timestamp": datetime.utcnow().isoformat()
+    })
+
+@app.get("/api/v1/memory/add_batch/stats")
+async def get_memory_batch_stats():
+    """Micro-batcher counters (batch sizes, fallbacks, pending items)"""
+    return {
+        "batcher": memory_batcher.stats(),
+        "coalesce_single_adds": COALESCE_SINGLE_ADDS,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v1/memory/replication")
+async def get_memory_replication_stats():
+    """Per-backend results and latency of quorum-replicated ('all') adds"""
+    return {
+        "enabled": replicator is not None,
+        "write_quorum": f"{replicator.quorum}/{len(replicator.backends)}" if replicator is not None else None,
+        "writes": replicator.writes if replicator is not None else 0,
+        "quorum_failed": replicator.quorum_failed if replicator is not None else 0,
+        "backends": replicator.stats() if replicator is not None else {},
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v1/memory/dedup")
+async def get_memory_dedup_stats():
+    """Duplicate-add hit rate and index memory footprint"""
+    return {
+        "enabled": dedup is not None,
+        "index": dedup.stats() if dedup is not None else None,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v1/memory/wal")
+async def get_memory_wal_stats():
+    """Write-behind log lag (pending adds, oldest age) and size on disk"""
+    return {
+        "enabled": memory_wal is not None,
+        "wal": memory_wal.stats() if memory_wal is not None else None,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v1/memory/wal/{memory_id}")
+async def get_memory_wal_status(memory_id: str):
+    """Whether a provisional memory_id has reached memory_nexus yet"""
+    status = memory_wal.status(memory_id) if memory_wal is not None else None
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired provisional memory_id")
+    return {"memory_id": memory_id, **status}
 
 @app.post("/api/v1/memory/search")
 async def search_memory(request: MemorySearchRequest):
     """Search across all memory backends"""
     
-    sources = request.sources or ['mem0', 'memory_plugin', 'supermemory']
+    await admission.check(request.user_id)
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{CONFIG['memory_nexus']}/api/memory/search",
+    if request.paginate or request.cursor is not None:
+        return proxy.respond(await _search_memory_page(request))
+    
+    sources = request.sources or MEMORY_SOURCES
+    # Larger limits are clamped; deeper results are paged (paginate / cursor)
+    limit = min(request.limit or 10, SEARCH_MAX_PAGE_SIZE)
+    
+    hot_hits = []
+    if hot_tier is not None:
+        hot_hits = hot_tier.search(request.user_id, request.query, limit, sources)
+        if HOT_TIER_MODE == "local_first" and len(hot_hits) >= limit:
+            # Recent memories fill the page; skip the memory_nexus round trip
+            return proxy.respond({"results": hot_hits, "source": "hot_tier",
+                                  "hot_tier": {"hits": len(hot_hits), "merged": len(hot_hits)}})
+    
+    cache_key = search_cache_key(request.query, sources, limit)
+    generation, cached = await search_cache.get(request.user_id, cache_key)
+    if cached is not None:
+        return proxy.respond(_with_hot_hits(cached, hot_hits, limit))
+    
+    async def fetch():
+        response = await upstream.request(
+            'memory_nexus', "POST", "/api/memory/search",
             json={
                 "query": request.query,
                 "user_id": request.user_id,
                 "sources": sources,
-                "limit": request.limit
+                "limit": limit
             },
-            timeout=10.0
+            timeout=10.0,
+            hedge=True,
+            adaptive=True
         )
         
         if response.status_code == 200:
-            return response.json()
+            results = proxy.relay('memory_search', response)
+            await search_cache.set(request.user_id, generation, cache_key, results)
+            return results
         else:
             raise HTTPException(status_code=500, detail="Memory search failed")
+    
+    results = await singleflight.run('memory_search', fetch, request.user_id, generation, cache_key)
+    return proxy.respond(_with_hot_hits(results, hot_hits, limit))
+
+def _pagination_start(request: MemorySearchRequest):
+    """(scope, per-source offsets, page heads) to continue from, validating any cursor"""
+    sources = request.sources or MEMORY_SOURCES
+    if 'all' in sources:
+        sources = MEMORY_SOURCES
+    sources = list(dict.fromkeys(sources))
+    scope = cursor_scope(request.user_id, request.query, sources)
+    if request.cursor is None:
+        return scope, dict.fromkeys(sources, 0), {}
+    try:
+        return (scope, *decode_cursor(request.cursor, scope, sources))
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def _search_memory_page(request: MemorySearchRequest) -> Dict[str, Any]:
+    """One bounded page merged across sources, plus the cursor for the next"""
+    scope, offsets, heads = _pagination_start(request)
+    page_size = min(request.limit or 10, SEARCH_MAX_PAGE_SIZE)
+    try:
+        results, offsets, heads = await search_page(upstream, request.query, request.user_id, offsets,
+                                                    page_size, heads)
+    except UpstreamError:
+        raise
+    except Exception:
+        raise HTTPException(status_code=500, detail="Memory search failed")
+    return {
+        "results": results,
+        "page_size": page_size,
+        "next_cursor": encode_cursor(scope, offsets, heads) if offsets else None
+    }
+
+@app.post("/api/v1/memory/search/export")
+async def export_memory_search(request: MemorySearchRequest, http_request: Request, format: Optional[str] = None):
+    """Stream every page of a search (NDJSON or SSE), one page in memory at a time"""
+    
+    await admission.check(request.user_id)
+    
+    scope, offsets, heads = _pagination_start(request)
+    accept = http_request.headers.get("accept", "")
+    if format == "sse" or (format is None and SSE_MEDIA_TYPE in accept):
+        media_type = SSE_MEDIA_TYPE
+    else:
+        media_type = NDJSON_MEDIA_TYPE
+    
+    # Full pages unless the client asked for smaller ones
+    page_size = request.limit if "limit" in request.model_fields_set and request.limit else SEARCH_MAX_PAGE_SIZE
+    frames = export_pages(upstream, request.query, request.user_id, scope, offsets,
+                          min(page_size, SEARCH_MAX_PAGE_SIZE), heads)
+    return StreamingResponse(
+        encode_frames(frames, media_type),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/v1/memory/search/stream")
+async def search_memory_stream(request: MemorySearchRequest, http_request: Request,
+                               format: Optional[str] = None, deadline_ms: Optional[int] = None):
+    """Stream per-source search results as each backend answers (NDJSON or SSE)"""
+    
+    await admission.check(request.user_id)
+    
+    sources = request.sources or MEMORY_SOURCES
+    if 'all' in sources:
+        sources = MEMORY_SOURCES
+    
+    accept = http_request.headers.get("accept", "")
+    if format == "sse" or (format is None and SSE_MEDIA_TYPE in accept):
+        media_type = SSE_MEDIA_TYPE
+    else:
+        media_type = NDJSON_MEDIA_TYPE
+    deadline = deadline_ms / 1000 if deadline_ms else SOURCE_DEADLINE
+    
+    frames = stream_search(upstream, request.query, request.user_id, list(dict.fromkeys(sources)),
+                           min(request.limit or 10, SEARCH_MAX_PAGE_SIZE), deadline=deadline)
+    return StreamingResponse(
+        encode_frames(frames, media_type),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/api/v1/memory/hot_tier")
+async def get_hot_tier_stats():
+    """Hot-tier index size, hit rate and evictions"""
+    return {
+        "enabled": hot_tier is not None,
+        "mode": HOT_TIER_MODE,
+        "index": hot_tier.stats() if hot_tier is not None else None,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v1/memory/search/cache")
+async def get_search_cache_stats():
+    """Search cache hit/miss/eviction counters"""
+    return {
+        "cache": search_cache.stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v1/routing/rules")
+async def get_routing_rules():
+    """Active memory routing rules and per-rule match counters"""
+    return {
+        **routing_engine.describe(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v1/routing/scores")
+async def get_routing_scores():
+    """Live per-backend EWMA latency, error rate and score for adaptive routing"""
+    return {
+        "enabled": adaptive_routing is not None,
+        **(adaptive_routing.describe() if adaptive_routing is not None else {}),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.post("/api/v1/routing/reload")
+async def reload_routing_rules():
+    """Re-read the routing rules file now"""
+    if not routing_engine.path:
+        raise HTTPException(status_code=400, detail="No APEX_ROUTING_RULES file configured")
+    reloaded = routing_engine.reload(force=True)
+    if not reloaded:
+        raise HTTPException(status_code=422, detail="Routing rules file is invalid; previous rules kept")
+    return {
+        "reloaded": True,
+        "rules": len(routing_engine.rules),
+        "timestamp": datetime.utcnow().isoformat()
+    }
 
 # ============================================
 # FORENSIC INTELLIGENCE
 # ============================================
 
 @app.post("/api/v1/forensic/analyze")
-async def analyze_forensic_case(request: ForensicAnalyzeRequest):
-    """Analyze forensic case using SUPERLUMINAL"""
+async def analyze_forensic_case(request: ForensicAnalyzeRequest, http_request: Request,
+                                mode: Optional[str] = None):
+    """Analyze forensic case using SUPERLUMINAL (mode=async returns a job)"""
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{CONFIG['intelligence']}/api/case/analyze",
+    await admission.check(_caller_key(http_request))
+    
+    streamed = _streams_upstream('forensic_analyze', http_request, mode)
+    
+    async def fetch():
+        response = await upstream.request(
+            'intelligence', "POST", "/api/case/analyze",
             json={
                 "case_id": request.case_id,
                 "evidence": request.evidence or []
             },
-            timeout=30.0
+            timeout=30.0,
+            stream=streamed,
+            headers=proxy.upstream_headers(http_request.headers) if streamed else None
         )
         
         if response.status_code == 200:
-            return response.json()
+            return proxy.relay('forensic_analyze', response, streamed)
         else:
+            await response.aclose()
             raise HTTPException(status_code=500, detail="Forensic analysis failed")
+    
+    async def run():
+        return await singleflight.run('forensic_analyze', fetch, request)
+    
+    if _wants_async(http_request, mode):
+        return await _submit_job('forensic_analyze', run)
+    return proxy.respond(await run())
+
+@app.post("/api/v1/forensic/analyze/upload")
+async def analyze_forensic_upload(http_request: Request, case_id: Optional[str] = None,
+                                  mode: Optional[str] = None):
+    """Analyze a case from streamed evidence (NDJSON body or multipart files)
+    
+    Items are validated one at a time and spooled (to disk past
+    APEX_EVIDENCE_SPOOL_THRESHOLD_MB), then streamed on to SUPERLUMINAL.
+    """
+    
+    await admission.check(_caller_key(http_request))
+    
+    try:
+        spool = await _spool_evidence(http_request, case_id)
+    except EvidenceError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    
+    streamed = 'forensic_analyze' in proxy.PASSTHROUGH_ROUTES and not _wants_async(http_request, mode)
+    headers = {"content-type": "application/json", "content-length": str(spool.size)}
+    if streamed:
+        headers.update(proxy.upstream_headers(http_request.headers))
+    
+    async def run():
+        try:
+            response = await upstream.request(
+                'intelligence', "POST", "/api/case/analyze",
+                content=spool.body(),
+                headers=headers,
+                timeout=30.0,
+                stream=streamed
+            )
+        finally:
+            spool.close()
+        
+        if response.status_code == 200:
+            return proxy.relay('forensic_analyze', response, streamed)
+        else:
+            await response.aclose()
+            raise HTTPException(status_code=500, detail="Forensic analysis failed")
+    
+    if _wants_async(http_request, mode):
+        try:
+            return await _submit_job('forensic_analyze', run)
+        except BaseException:
+            # Rejected (queue full): run() will never close the spool
+            spool.close()
+            raise
+    return proxy.respond(await run())
 
 # ============================================
 # SKILL EXECUTION
 # ============================================
 
 @app.post("/api/v1/skills/execute")
-async def execute_skill(request: SkillExecuteRequest):
-    """Execute automated skill via Omni_Engine"""
+async def execute_skill(request: SkillExecuteRequest, http_request: Request,
+                        mode: Optional[str] = None):
+    """Execute automated skill via Omni_Engine (mode=async returns a job)"""
+    
+    await admission.check(_caller_key(http_request))
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{CONFIG['execution_engine']}/api/skill/execute",
+    streamed = _streams_upstream('skill_execute', http_request, mode)
+    headers = proxy.upstream_headers(http_request.headers) if streamed else None
+    
+    async def run():
+        return await _execute_skill(request, streamed, headers)
+    
+    if _wants_async(http_request, mode):
+        return await _submit_job('skill_execute', run)
+    return proxy.respond(await run())
+
+async def _execute_skill(request: SkillExecuteRequest, streamed: bool = False,
+                         headers: Optional[Dict[str, str]] = None) -> Any:
+    """Run a skill on execution_engine (coalesced by single-flight)"""
+    
+    async def fetch():
+        response = await upstream.request(
+            'execution_engine', "POST", "/api/skill/execute",
             json={
                 "skill": request.skill,
                 "params": request.params
             },
-            timeout=60.0
+            timeout=60.0,
+            stream=streamed,
+            headers=headers
         )
         
         if response.status_code == 200:
-            return response.json()
+            return proxy.relay('skill_execute', response, streamed)
         else:
+            await response.aclose()
             raise HTTPException(status_code=500, detail="Skill execution failed")
+    
+    return await singleflight.run('skill_execute', fetch, request)
+
+# ============================================
+# WEBSOCKET SESSIONS
+# ============================================
+
+async def _ws_memory_add(data: Dict[str, Any], caller: str) -> Any:
+    return await add_memory(MemoryAddRequest.model_validate(data))
+
+async def _ws_memory_search(data: Dict[str, Any], caller: str) -> Any:
+    return await search_memory(MemorySearchRequest.model_validate(data))
+
+async def _ws_skill_execute(data: Dict[str, Any], caller: str) -> Any:
+    request = SkillExecuteRequest.model_validate(data)
+    await admission.check(caller)
+    return await _execute_skill(request)
+
+# Same handlers as the REST endpoints, minus per-request HTTP overhead
+ws_sessions.register("memory.add", _ws_memory_add)
+ws_sessions.register("memory.search", _ws_memory_search)
+ws_sessions.register("skill.execute", _ws_skill_execute)
+
+@app.websocket("/api/v1/ws")
+async def websocket_session(websocket: WebSocket):
+    """Pipelined memory.add / memory.search / skill.execute over one socket
+    
+    Frames are {"id", "op", "data"}; replies {"id", "ok", "status",
+    "result" | "error"} arrive in completion order.
+    """
+    await ws_sessions.serve(websocket, _caller_key(websocket))
+
+@app.get("/api/v1/ws/stats")
+async def get_websocket_stats():
+    """Open sessions, per-op counts and latency, backpressure waits"""
+    return {
+        **ws_sessions.stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+# ============================================
+# ASYNC JOBS
+# ============================================
+
+@app.get("/api/v1/jobs")
+async def get_job_stats():
+    """Job queue depth, wait times and outcome counters"""
+    return {
+        "jobs": job_manager.stats(),
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v1/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Poll an async job for its status and result"""
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+@app.get("/api/v1/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Server-Sent Events for an async job until it finishes"""
+    job = await job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    
+    async def events():
+        current = job
+        while True:
+            yield b"event: " + current["status"].encode("utf-8") + b"\ndata: " + proxy.dumps(current) + b"\n\n"
+            if current["status"] in TERMINAL_STATES:
+                return
+            status = current["status"]
+            while current is not None and current["status"] == status:
+                current = await job_manager.wait_for_change(job_id, timeout=15.0)
+                if current is not None and current["status"] == status:
+                    yield b": keep-alive\n\n"
+            if current is None:
+                yield b"event: expired\ndata: {}\n\n"
+                return
+    
+    return StreamingResponse(
+        events(),
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # ============================================
 # HELPER FUNCTIONS
 # ============================================
 
-def _route_memory_add(content: str, metadata: Optional[Dict] = None) -> str:
-    """Intelligent routing logic for memory adds"""
+def _wants_async(http_request: Request, mode: Optional[str]) -> bool:
+    """Async job mode via ?mode=async or `Prefer: respond-async` (RFC 7240)"""
+    if mode is not None:
+        return mode == "async"
+    return "respond-async" in http_request.headers.get("prefer", "")
+
+def _caller_key(http_request: HTTPConnection) -> str:
+    """Rate limit key for endpoints without a user_id in the body"""
+    user_id = http_request.headers.get("x-user-id")
+    if user_id:
+        return user_id
+    return f"ip:{http_request.client.host if http_request.client else 'unknown'}"
+
+def _streams_upstream(route: str, http_request: Request, mode: Optional[str]) -> bool:
+    """Stream the upstream body straight through when nothing needs it buffered
+    (not coalesced by single-flight and not stored as an async job result)"""
+    return (route in proxy.PASSTHROUGH_ROUTES and route not in singleflight.enabled
+            and not _wants_async(http_request, mode))
+
+async def _submit_job(kind: str, fn) -> JSONResponse:
+    """Queue `fn` on the job pool and answer 202 with where to find the result"""
+    async def run():
+        # Job stores keep JSON, so passthrough bodies are parsed here
+        return proxy.materialize(await fn())
     
-    # Check for preferences
-    if any(word in content.lower() for word in ['prefer', 'like', 'favorite', 'setting']):
-        return 'memory_plugin'
+    try:
+        job = await job_manager.submit(kind, run)
+    except JobQueueFull:
+        raise HTTPException(status_code=503, detail="Job queue is full", headers={"Retry-After": "5"})
+    status_url = f"/api/v1/jobs/{job['job_id']}"
+    return JSONResponse(
+        status_code=202,
+        content={
+            "job_id": job["job_id"],
+            "status": job["status"],
+            "status_url": status_url,
+            "events_url": f"{status_url}/events",
+            "timestamp": datetime.utcnow().isoformat()
+        },
+        headers={"Location": status_url}
+    )
+
+async def _add_batch_item(index: int, raw: Any) -> Dict[str, Any]:
+    """Validate, route and queue one add_batch item"""
+    if isinstance(raw, Exception):
+        return {"index": index, "success": False, "error": str(raw)}
+    try:
+        item = MemoryAddRequest.model_validate(raw)
+    except ValidationError as e:
+        return {"index": index, "success": False, "error": e.errors(include_url=False)}
     
-    # Check for relationships/cases
-    if any(word in content.lower() for word in ['case', 'linked', 'related', 'connection']):
-        return 'mem0'
+    backend = _route_memory_add(item.content, item.metadata).backend
+    fields = {
+        "content": item.content,
+        "user_id": item.user_id,
+        "metadata": item.metadata
+    }
     
-    # Check for critical/emergency
-    if metadata and metadata.get('priority', 0) >= 5:
-        return 'all'  # Replicate to all backends
+    async def store() -> Dict[str, Any]:
+        if backend == 'all' and replicator is not None:
+            result = await replicator.write(fields, memory_batcher.submit)
+        else:
+            result = await memory_batcher.submit(fields, backend)
+        return {"memory_id": result.get('memory_id'), "backend_used": backend}
+    
+    duplicate = False
+    try:
+        if dedup is not None and backend != 'all':
+            result, duplicate = await dedup.add_once(item.user_id, item.content, item.metadata, store)
+        else:
+            result = await store()
+    except Exception as e:
+        return {"index": index, "success": False, "backend_used": backend, "error": str(e)}
+    if hot_tier is not None and not duplicate:
+        hot_tier.add(item.user_id, result['memory_id'], item.content, item.metadata, backend)
+    return {
+        "index": index,
+        "success": True,
+        "backend_used": result['backend_used'],
+        "memory_id": result['memory_id'],
+        "user_id": item.user_id,
+        **({"deduplicated": True} if duplicate else {})
+    }
+
+async def _spool_evidence(http_request: Request, case_id: Optional[str]) -> EvidenceSpool:
+    """Validate and spool an evidence upload; raises EvidenceError"""
+    content_type = http_request.headers.get("content-type", "")
+    if not content_type.startswith("multipart/form-data"):
+        if not case_id:
+            raise EvidenceError(422, "case_id query parameter is required")
+        spool = EvidenceSpool(case_id)
+        try:
+            async for _, item in iter_ndjson_items(http_request.stream()):
+                await spool.add(item)
+            await spool.finish()
+        except BaseException:
+            spool.close()
+            raise
+        return spool
+    
+    # Starlette spools each file part to disk past 1 MB while parsing
+    form = await http_request.form()
+    try:
+        case_id = case_id or form.get("case_id")
+        if not case_id or not isinstance(case_id, str):
+            raise EvidenceError(422, "case_id is required (query parameter or form field)")
+        spool = EvidenceSpool(case_id)
+        try:
+            for field, value in form.multi_items():
+                if isinstance(value, UploadFile):
+                    if is_ndjson_part(value.content_type, value.filename):
+                        async for _, item in iter_ndjson_items(iter_upload(value)):
+                            await spool.add(item)
+                    else:
+                        await spool.add_file({
+                            "type": "file",
+                            "field": field,
+                            "filename": value.filename,
+                            "content_type": value.content_type
+                        }, iter_upload(value))
+                elif field == "evidence":
+                    async for _, item in iter_ndjson_items(_iter_list([value.encode("utf-8")])):
+                        await spool.add(item)
+            await spool.finish()
+        except BaseException:
+            spool.close()
+            raise
+        return spool
+    finally:
+        await form.close()
+
+async def _iter_list(items: List[Any]) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+async def _iter_ndjson(request: Request) -> AsyncIterator[Any]:
+    """Yield one parsed object per NDJSON line (a ValueError for bad lines)"""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_ndjson_line(line)
+    if buffer.strip():
+        yield _parse_ndjson_line(buffer)
+
+def _parse_ndjson_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"Invalid JSON line: {e}")
+
+def _with_hot_hits(results: Any, hits: List[Dict[str, Any]], limit: Optional[int]) -> Any:
+    """Merge hot-tier hits into an upstream search answer (parsing it only if needed)"""
+    if not hits:
+        return results
+    return merge_hits(proxy.materialize(results), hits, limit)
+
+def _route_memory_add(content: str, metadata: Optional[Dict] = None) -> RouteDecision:
+    """Intelligent routing logic for memory adds
     
-    # Default to Supermemory for fast contextual memory
-    return 'supermemory'
+    Rules are evaluated in priority order by the routing engine:
+    preferences -> memory_plugin, relationships/cases -> mem0,
+    metadata priority >= 5 -> all backends, otherwise Supermemory.
+    With APEX_ADAPTIVE_ROUTING, eligible decisions may then move to the
+    backend with the best observed latency and error rate.
+    """
+    decision = routing_engine.route(content, metadata)
+    if adaptive_routing is not None:
+        decision = adaptive_routing.select(decision)
+    metrics.observe_route(decision.backend, decision.rule)
+    return decision
 
 if __name__ == '__main__':
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    import sys
+    # Hand over to the uvicorn CLI instead of uvicorn.run("api:app"), which
+    # would import this file again as `api` (and, with workers, once more
+    # per child as __mp_main__). APEX_WORKERS > 1: uvicorn's supervisor
+    # binds the socket once and pre-forks that many workers sharing it
+    # (state via shared.py). Extra arguments go to uvicorn as-is.
+    os.execv(sys.executable, [
+        sys.executable, "-m", "uvicorn", "api:app",
+        "--app-dir", os.path.dirname(os.path.abspath(__file__)),
+        "--host", os.getenv("APEX_HOST", "0.0.0.0"),
+        "--port", os.getenv("APEX_PORT", "8000"),
+        "--workers", str(GATEWAY_WORKERS),
+        *sys.argv[1:]
+    ])
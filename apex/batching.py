@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Memory Add Micro-Batcher
+Groups memory adds per target backend into size/time bounded upstream batches
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from resilience import Resilience, UpstreamError
+
+logger = logging.getLogger("apex.batching")
+
+BATCH_MAX_SIZE = int(os.getenv("APEX_BATCH_MAX_SIZE", "100"))
+BATCH_MAX_DELAY = float(os.getenv("APEX_BATCH_MAX_DELAY_MS", "20")) / 1000
+BATCH_UPSTREAM_PATH = os.getenv("APEX_BATCH_UPSTREAM_PATH", "/api/memory/add_batch")
+BATCH_TIMEOUT = float(os.getenv("APEX_BATCH_TIMEOUT", "30"))
+BATCH_MAX_ITEMS = int(os.getenv("APEX_BATCH_MAX_ITEMS", "10000"))
+# Route single POST /api/v1/memory/add calls through the batcher as well
+COALESCE_SINGLE_ADDS = os.getenv("APEX_BATCH_COALESCE_ADDS", "false").lower() in ("1", "true", "yes")
+
+
+class _Batch:
+    """Items bound for one backend, flushed together"""
+
+    def __init__(self, backend: str):
+        self.backend = backend
+        self.items: List[Dict[str, Any]] = []
+        self.futures: List[asyncio.Future] = []
+        self.flushed = False
+
+
+class MemoryBatcher:
+    """Coalesces memory adds into batched memory_nexus calls
+
+    Batches are cut when they reach `max_size` items or `max_delay` seconds
+    after their first item, whichever comes first. If memory_nexus does not
+    expose the batch endpoint (404/405) the batch is sent as concurrent
+    single adds instead.
+    """
+
+    def __init__(self, upstream: Resilience, max_size: int = BATCH_MAX_SIZE,
+                 max_delay: float = BATCH_MAX_DELAY, upstream_path: str = BATCH_UPSTREAM_PATH):
+        self.upstream = upstream
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.upstream_path = upstream_path
+        self.pending: Dict[str, _Batch] = {}
+        self.inflight: set = set()
+        self.batch_supported = True
+        self.batches_sent = 0
+        self.items_sent = 0
+        self.items_failed = 0
+        self.fallback_batches = 0
+        # observer(backend, seconds, failed, count) after each upstream batch
+        self.observer: Optional[Callable[[str, float, int, int], None]] = None
+
+    async def submit(self, item: Dict[str, Any], backend: str) -> Dict[str, Any]:
+        """Queue one add for `backend`; resolves to {"memory_id": ...} or raises"""
+        batch = self.pending.get(backend)
+        if batch is None:
+            batch = self.pending[backend] = _Batch(backend)
+            self._spawn(self._flush_later(batch))
+        future = asyncio.get_running_loop().create_future()
+        batch.items.append(item)
+        batch.futures.append(future)
+        if len(batch.items) >= self.max_size:
+            self._spawn(self._flush(batch))
+        return await future
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self.inflight.add(task)
+        task.add_done_callback(self.inflight.discard)
+
+    async def _flush_later(self, batch: _Batch):
+        await asyncio.sleep(self.max_delay)
+        await self._flush(batch)
+
+    async def _flush(self, batch: _Batch):
+        if batch.flushed:
+            return
+        batch.flushed = True
+        if self.pending.get(batch.backend) is batch:
+            del self.pending[batch.backend]
+
+        started = time.perf_counter()
+        try:
+            results = await self._send(batch)
+        except Exception as e:
+            logger.warning("Memory batch for %s failed: %s", batch.backend, e)
+            results = [e] * len(batch.items)
+        # A hanging or failing backend times out or errors through memory_nexus
+        # and counts against it; a call refused before it was sent (circuit
+        # open, saturated: those carry retry_after) says nothing about it
+        if self.observer is not None and not any(
+                isinstance(result, UpstreamError) and result.retry_after is not None for result in results):
+            failed = sum(1 for result in results if isinstance(result, Exception))
+            self.observer(batch.backend, time.perf_counter() - started, failed, len(results))
+
+        self.batches_sent += 1
+        for future, result in zip(batch.futures, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                self.items_failed += 1
+                future.set_exception(result)
+            else:
+                self.items_sent += 1
+                future.set_result(result)
+
+    async def _send(self, batch: _Batch) -> List[Any]:
+        if self.batch_supported:
+            response = await self.upstream.request(
+                'memory_nexus', "POST", self.upstream_path,
+                json={"memories": batch.items, "preferred_backend": batch.backend},
+                timeout=BATCH_TIMEOUT
+            )
+            if response.status_code in (404, 405):
+                logger.warning("memory_nexus has no %s; falling back to single adds", self.upstream_path)
+                self.batch_supported = False
+            elif response.status_code == 200:
+                results = response.json().get("results", [])
+                if len(results) != len(batch.items):
+                    raise RuntimeError("Batch response length mismatch")
+                return [
+                    result if not result.get("error") else RuntimeError(result["error"])
+                    for result in results
+                ]
+            else:
+                raise RuntimeError(f"Batch add failed with status {response.status_code}")
+
+        self.fallback_batches += 1
+        return await asyncio.gather(
+            *(self._send_single(item, batch.backend) for item in batch.items),
+            return_exceptions=True
+        )
+
+    async def _send_single(self, item: Dict[str, Any], backend: str) -> Dict[str, Any]:
+        response = await self.upstream.request(
+            'memory_nexus', "POST", "/api/memory/add",
+            json={**item, "preferred_backend": backend},
+            timeout=10.0
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"Memory add failed with status {response.status_code}")
+        return {"memory_id": response.json().get('memory_id')}
+
+    async def drain(self):
+        """Flush everything still pending (called from the app lifespan)"""
+        for batch in list(self.pending.values()):
+            await self._flush(batch)
+        if self.inflight:
+            await asyncio.gather(*self.inflight, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_size,
+            "max_delay_ms": self.max_delay * 1000,
+            "upstream_batch_supported": self.batch_supported,
+            "pending_items": sum(len(batch.items) for batch in self.pending.values()),
+            "batches_sent": self.batches_sent,
+            "items_sent": self.items_sent,
+            "items_failed": self.items_failed,
+            "avg_batch_size": round(
+                (self.items_sent + self.items_failed) / self.batches_sent, 2
+            ) if self.batches_sent else None,
+            "fallback_batches": self.fallback_batches,
+        }
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Memory Search Cache
+Bounded LRU+TTL cache for search results with per-user invalidation
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from proxy import RawJSON, dumps
+from shared import SharedTable, shared_table
+
+logger = logging.getLogger("apex.cache")
+
+SEARCH_CACHE_BACKEND = os.getenv("APEX_SEARCH_CACHE", "memory")  # memory | shared | redis | off
+SEARCH_CACHE_TTL = float(os.getenv("APEX_SEARCH_CACHE_TTL", "30"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("APEX_SEARCH_CACHE_MAX_ENTRIES", "10000"))
+REDIS_URL = os.getenv("APEX_REDIS_URL", "redis://redis:6379/0")
+
+
+def search_cache_key(query: str, sources: List[str], limit: Optional[int]) -> str:
+    """Stable digest of a normalized search request (user scoping is separate)"""
+    normalized = {
+        "query": " ".join(query.split()),
+        "sources": sorted(set(sources)),
+        "limit": limit,
+    }
+    raw = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class CacheBackend:
+    """Storage interface behind SearchCache"""
+
+    name = "base"
+
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: float):
+        raise NotImplementedError
+
+    async def generation(self, user_id: str) -> int:
+        raise NotImplementedError
+
+    async def bump_generation(self, user_id: str) -> int:
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+    async def close(self):
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU with per-entry expiry"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = SEARCH_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.generations: Dict[str, int] = {}
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self.entries[key]
+            self.expirations += 1
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float):
+        self.entries[key] = (time.monotonic() + ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    async def generation(self, user_id: str) -> int:
+        return self.generations.get(user_id, 0)
+
+    async def bump_generation(self, user_id: str) -> int:
+        self.generations[user_id] = self.generations.get(user_id, 0) + 1
+        return self.generations[user_id]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class RedisCacheBackend(CacheBackend):
+    """Shared cache in the docker-compose Redis (entries expire via SETEX)"""
+
+    name = "redis"
+
+    def __init__(self, url: str = REDIS_URL, prefix: str = "apex:search"):
+        import redis.asyncio as redis
+        self.redis = redis.from_url(url)
+        self.url = url
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        # Entries are JSON bodies; hand them back unparsed for passthrough
+        raw = await self.redis.get(f"{self.prefix}:{key}")
+        return RawJSON(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float):
+        body = value.body if isinstance(value, RawJSON) else dumps(value)
+        await self.redis.set(f"{self.prefix}:{key}", body, px=int(ttl * 1000))
+
+    async def generation(self, user_id: str) -> int:
+        raw = await self.redis.get(f"{self.prefix}:gen:{user_id}")
+        return int(raw) if raw is not None else 0
+
+    async def bump_generation(self, user_id: str) -> int:
+        return await self.redis.incr(f"{self.prefix}:gen:{user_id}")
+
+    def stats(self) -> Dict[str, Any]:
+        # Eviction is delegated to Redis' own maxmemory policy
+        return {"url": self.url, "evictions": None}
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+class SharedCacheBackend(CacheBackend):
+    """Cache in the cross-worker shared table (see shared.py)
+
+    Entries larger than a shared slot are simply not cached.
+    """
+
+    name = "shared"
+
+    def __init__(self, table: SharedTable, prefix: str = "search"):
+        self.table = table
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = self.table.get(f"{self.prefix}:{key}")
+        return RawJSON(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float):
+        body = value.body if isinstance(value, RawJSON) else dumps(value)
+        self.table.set(f"{self.prefix}:{key}", body, ttl)
+
+    async def generation(self, user_id: str) -> int:
+        return self.table.update(f"{self.prefix}:gen:{user_id}", _initial_generation)
+
+    async def bump_generation(self, user_id: str) -> int:
+        return self.table.update(f"{self.prefix}:gen:{user_id}", _next_generation)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"shared": self.table.stats()}
+
+
+def _initial_generation(raw: Optional[bytes]) -> Tuple[bytes, int]:
+    # A generation evicted from the table restarts at a fresh, time-based
+    # value, so entries cached under an older generation stay unreachable
+    generation = int(raw) if raw is not None else time.time_ns() // 1000
+    return str(generation).encode(), generation
+
+
+def _next_generation(raw: Optional[bytes]) -> Tuple[bytes, int]:
+    _, generation = _initial_generation(raw)
+    return str(generation + 1).encode(), generation + 1
+
+
+class SearchCache:
+    """Search result cache keyed on (user, generation, normalized request)"""
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: float = SEARCH_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def _entry_key(self, user_id: str, generation: int, request_key: str) -> str:
+        return f"{user_id}:{generation}:{request_key}"
+
+    async def get(self, user_id: str, request_key: str) -> Tuple[int, Optional[Any]]:
+        """Return (generation, cached value or None)
+
+        The generation must be handed back to `set` so that a result fetched
+        before a concurrent add_memory can never be cached as current.
+        """
+        if not self.enabled:
+            return 0, None
+        try:
+            generation = await self.backend.generation(user_id)
+            value = await self.backend.get(self._entry_key(user_id, generation, request_key))
+        except Exception:
+            logger.exception("Search cache lookup failed")
+            self.errors += 1
+            return 0, None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return generation, value
+
+    async def set(self, user_id: str, generation: int, request_key: str, value: Any):
+        if not self.enabled:
+            return
+        try:
+            await self.backend.set(self._entry_key(user_id, generation, request_key), value, self.ttl)
+        except Exception:
+            logger.exception("Search cache store failed")
+            self.errors += 1
+
+    async def invalidate_user(self, user_id: str):
+        """Drop every cached search for a user by moving to a new generation"""
+        if not self.enabled:
+            return
+        try:
+            await self.backend.bump_generation(user_id)
+            self.invalidations += 1
+        except Exception:
+            logger.exception("Search cache invalidation failed")
+            self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name if self.backend else "off",
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            **(self.backend.stats() if self.backend else {}),
+        }
+
+    async def close(self):
+        if self.backend is not None:
+            await self.backend.close()
+
+
+def create_search_cache(kind: str = SEARCH_CACHE_BACKEND) -> SearchCache:
+    """Build the search cache selected by APEX_SEARCH_CACHE"""
+    if kind == "off":
+        return SearchCache(None)
+    if kind == "redis":
+        return SearchCache(RedisCacheBackend())
+    # With several workers the in-process cache becomes the shared one
+    table = shared_table()
+    if kind == "shared" or table is not None:
+        return SearchCache(SharedCacheBackend(table or SharedTable()))
+    return SearchCache(MemoryCacheBackend())
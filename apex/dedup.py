@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Memory Add Deduplication
+Per-user content fingerprints in a Bloom filter plus an exact, time-windowed
+index, snapshotted to disk so duplicates are still caught after a restart
+"""
+
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import math
+import os
+import struct
+import sys
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("apex.dedup")
+
+DEDUP_ENABLED = os.getenv("APEX_DEDUP", "false").lower() in ("1", "true", "yes")
+DEDUP_WINDOW = float(os.getenv("APEX_DEDUP_WINDOW_SECONDS", "86400"))
+DEDUP_MAX_ENTRIES = int(os.getenv("APEX_DEDUP_MAX_ENTRIES", "200000"))
+DEDUP_FALSE_POSITIVE_RATE = float(os.getenv("APEX_DEDUP_BLOOM_FP_RATE", "0.001"))
+DEDUP_SNAPSHOT_PATH = os.getenv("APEX_DEDUP_SNAPSHOT", "/var/lib/apex/dedup/snapshot")
+DEDUP_SNAPSHOT_INTERVAL = float(os.getenv("APEX_DEDUP_SNAPSHOT_INTERVAL", "60"))
+
+_SNAPSHOT_MAGIC = b"APEXDDP1"
+_RECORD = struct.Struct("<16sdH")  # fingerprint, added_at (wall clock), value length
+
+
+def fingerprint(user_id: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> bytes:
+    """128-bit digest of a user's content and metadata
+
+    Content is compared insensitive to case, width and spacing; metadata
+    exactly (key order aside), so a re-add carrying new metadata is stored.
+    """
+    normalized = " ".join(unicodedata.normalize("NFKC", content).casefold().split())
+    meta = json.dumps(metadata, sort_keys=True, default=str, separators=(",", ":")) if metadata else ""
+    return hashlib.blake2b(f"{user_id}\0{normalized}\0{meta}".encode("utf-8"), digest_size=16).digest()
+
+
+class _LeaderCancelled(Exception):
+    """The add being shared was cancelled; a waiter takes over the write"""
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over 128-bit fingerprints (no deletes)"""
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        bits = max(64, int(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.bits = bits
+        self.hashes = max(1, round(bits / capacity * math.log(2)))
+        self.array = bytearray((bits + 7) // 8)
+
+    def _positions(self, fp: bytes):
+        # Double hashing from the two halves of the fingerprint
+        first, second = struct.unpack("<QQ", fp)
+        for index in range(self.hashes):
+            yield (first + index * second) % self.bits
+
+    def add(self, fp: bytes):
+        for position in self._positions(fp):
+            self.array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, fp: bytes) -> bool:
+        return all(self.array[position >> 3] & (1 << (position & 7)) for position in self._positions(fp))
+
+
+class DedupIndex:
+    """Remembers (user, content, metadata) -> first memory_id for `window` seconds
+
+    The Bloom filter answers most first-time adds without touching the
+    exact index; a Bloom hit is confirmed against the exact index, so a
+    false positive never suppresses a real add. Identical adds racing each
+    other share the first one's upstream write.
+
+    Gateway workers each keep their own index and meet in the snapshot:
+    every save first merges in what the other workers saved.
+    """
+
+    def __init__(self, window: float = DEDUP_WINDOW, max_entries: int = DEDUP_MAX_ENTRIES,
+                 false_positive_rate: float = DEDUP_FALSE_POSITIVE_RATE,
+                 snapshot_path: Optional[str] = DEDUP_SNAPSHOT_PATH,
+                 snapshot_interval: float = DEDUP_SNAPSHOT_INTERVAL):
+        self.window = window
+        self.max_entries = max_entries
+        self.false_positive_rate = false_positive_rate
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        # fingerprint -> (added_at wall clock, memory_id, backend), oldest first
+        self.entries: "OrderedDict[bytes, Tuple[float, str, str]]" = OrderedDict()
+        self.bloom = BloomFilter(max_entries, false_positive_rate)
+        self.bloom_inserts = 0
+        self.inflight: Dict[bytes, asyncio.Future] = {}
+        # fingerprint -> added_at of entries dropped by forget(), until they expire
+        self.forgotten: Dict[bytes, float] = {}
+        # fingerprint -> memory_id forgotten while its add_once() was still running
+        self.forgotten_inflight: Dict[bytes, str] = {}
+        self.entry_bytes = 0
+        self.hits = 0
+        self.inflight_hits = 0
+        self.misses = 0
+        self.bloom_negatives = 0
+        self.bloom_false_positives = 0
+        self.expired = 0
+        self.evicted = 0
+        self.snapshots = 0
+        self.merged_from_snapshot = 0
+        self.dirty = False
+        self._task: Optional[asyncio.Task] = None
+        self._saving: Optional[asyncio.Task] = None
+
+    # ---------- index ----------
+
+    @staticmethod
+    def _size(fp: bytes, entry: Tuple[float, str, str]) -> int:
+        return sys.getsizeof(fp) + sys.getsizeof(entry) + sys.getsizeof(entry[1]) + 24  # + float
+
+    def _expire(self, now: float):
+        while self.entries:
+            fp, entry = next(iter(self.entries.items()))
+            if entry[0] >= now - self.window and len(self.entries) <= self.max_entries:
+                break
+            del self.entries[fp]
+            self.entry_bytes -= self._size(fp, entry)
+            if entry[0] < now - self.window:
+                self.expired += 1
+            else:
+                self.evicted += 1
+        for fp in [fp for fp, added_at in self.forgotten.items() if added_at < now - self.window]:
+            del self.forgotten[fp]
+        # Bits of expired entries linger; rebuild once they could dominate
+        if self.bloom_inserts > 2 * self.max_entries:
+            self._rebuild_bloom()
+
+    def lookup(self, fp: bytes) -> Optional[Tuple[float, str, str]]:
+        if fp not in self.bloom:
+            self.bloom_negatives += 1
+            return None
+        entry = self.entries.get(fp)
+        if entry is None or entry[0] < time.time() - self.window:
+            self.bloom_false_positives += 1
+            return None
+        return entry
+
+    def record(self, fp: bytes, memory_id: Optional[str], backend: str):
+        if not memory_id:
+            return
+        entry = (time.time(), memory_id, backend)
+        self._insert(fp, entry)
+        self.dirty = True
+        self._expire(entry[0])
+
+    def forget(self, user_id: str, content: str, metadata: Optional[Dict[str, Any]], memory_id: str):
+        """Drop the entry for an add whose `memory_id` never reached a backend
+
+        The entry is also kept out of later snapshot merges, which could
+        otherwise bring it back from an earlier save.
+        """
+        fp = fingerprint(user_id, content, metadata)
+        if fp in self.inflight:
+            # Dead-lettered before its add returned; add_once won't record it
+            self.forgotten_inflight[fp] = memory_id
+            return
+        entry = self.entries.get(fp)
+        if entry is None or entry[1] != memory_id:
+            return
+        del self.entries[fp]
+        self.entry_bytes -= self._size(fp, entry)
+        self.forgotten[fp] = entry[0]
+        self.dirty = True
+
+    def _insert(self, fp: bytes, entry: Tuple[float, str, str]):
+        previous = self.entries.pop(fp, None)
+        if previous is not None:
+            self.entry_bytes -= self._size(fp, previous)
+        self.entries[fp] = entry
+        self.entry_bytes += self._size(fp, entry)
+        self.bloom.add(fp)
+        self.bloom_inserts += 1
+
+    def _rebuild_bloom(self):
+        self.bloom = BloomFilter(self.max_entries, self.false_positive_rate)
+        for fp in self.entries:
+            self.bloom.add(fp)
+        self.bloom_inserts = len(self.entries)
+
+    async def add_once(self, user_id: str, content: str, metadata: Optional[Dict[str, Any]],
+                       add: Callable[[], Awaitable[Dict[str, Any]]]) -> Tuple[Dict[str, Any], bool]:
+        """Run `add()` unless this content and metadata were already added for the user
+
+        Returns (result, duplicate). `add` must return a dict with
+        `memory_id` and `backend_used`; a duplicate's result carries the
+        original ones.
+        """
+        fp = fingerprint(user_id, content, metadata)
+        while True:
+            entry = self.lookup(fp)
+            if entry is not None:
+                self.hits += 1
+                return {"memory_id": entry[1], "backend_used": entry[2], "first_added_at": entry[0]}, True
+            inflight = self.inflight.get(fp)
+            if inflight is None:
+                break
+            try:
+                result = await asyncio.shield(inflight)
+            except _LeaderCancelled:
+                # Its client went away; this request still wants the write
+                continue
+            self.inflight_hits += 1
+            return {"memory_id": result.get("memory_id"), "backend_used": result.get("backend_used"),
+                    "first_added_at": None}, True
+
+        self.misses += 1
+        future = self.inflight[fp] = asyncio.get_running_loop().create_future()
+        try:
+            result = await add()
+        except BaseException as e:
+            # Waiters must not inherit this request's cancellation
+            future.set_exception(_LeaderCancelled() if isinstance(e, asyncio.CancelledError) else e)
+            # Nobody may be waiting; don't log "exception never retrieved"
+            future.exception()
+            raise
+        finally:
+            self.inflight.pop(fp, None)
+            forgotten = self.forgotten_inflight.pop(fp, None)
+        future.set_result(result)
+        if forgotten != result.get("memory_id"):
+            self.record(fp, result.get("memory_id"), result.get("backend_used", ""))
+        return result, False
+
+    # ---------- persistence ----------
+
+    def _lock_and_read(self) -> Tuple[int, List[Tuple[bytes, float, str, str]]]:
+        """Take the snapshot lock and read its unexpired records (in a thread)
+
+        Workers share one snapshot; each save merges in the others'
+        fingerprints and writes under this lock, so none is overwritten.
+        """
+        os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+        lock_fd = os.open(f"{self.snapshot_path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(lock_fd, fcntl.LOCK_EX)
+        records = []
+        cutoff = time.time() - self.window
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                if f.read(len(_SNAPSHOT_MAGIC)) != _SNAPSHOT_MAGIC:
+                    raise ValueError("bad header")
+                while True:
+                    header = f.read(_RECORD.size)
+                    if len(header) < _RECORD.size:
+                        break
+                    fp, added_at, value_length = _RECORD.unpack(header)
+                    memory_id, _, backend = f.read(value_length).decode("utf-8").partition("\0")
+                    if added_at >= cutoff:
+                        records.append((fp, added_at, memory_id, backend))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            logger.warning("Ignoring unreadable dedup snapshot %s (%s)", self.snapshot_path, e)
+        return lock_fd, records
+
+    def _write_and_unlock(self, lock_fd: int, entries: List[Tuple[bytes, Tuple[float, str, str]]]):
+        try:
+            tmp = f"{self.snapshot_path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(_SNAPSHOT_MAGIC)
+                for fp, (added_at, memory_id, backend) in entries:
+                    value = f"{memory_id}\0{backend}".encode("utf-8")
+                    f.write(_RECORD.pack(fp, added_at, len(value)) + value)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.snapshot_path)
+        finally:
+            os.close(lock_fd)
+
+    def _merge(self, records: List[Tuple[bytes, float, str, str]]) -> int:
+        """Adopt snapshot fingerprints this index does not hold"""
+        merged = 0
+        for fp, added_at, memory_id, backend in records:
+            if fp not in self.entries and self.forgotten.get(fp) != added_at:
+                self._insert(fp, (added_at, memory_id, backend))
+                merged += 1
+        if merged:
+            # Merged entries arrive out of order; restore oldest-first
+            self.entries = OrderedDict(sorted(self.entries.items(), key=lambda item: item[1][0]))
+            self._expire(time.time())
+        return merged
+
+    async def save(self) -> int:
+        """Merge the shared snapshot into this index, then rewrite it"""
+        lock_fd, records = await asyncio.to_thread(self._lock_and_read)
+        try:
+            merged = self._merge(records)
+            self.dirty = False
+            entries = list(self.entries.items())
+        except BaseException:
+            os.close(lock_fd)
+            raise
+        await asyncio.to_thread(self._write_and_unlock, lock_fd, entries)
+        self.snapshots += 1
+        return merged
+
+    async def _snapshot_loop(self):
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            if self.dirty:
+                # Shielded: a save cancelled mid-way would leave the lock held
+                self._saving = asyncio.create_task(self.save())
+                try:
+                    self.merged_from_snapshot += await asyncio.shield(self._saving)
+                except OSError:
+                    logger.exception("Dedup snapshot failed")
+
+    async def start(self):
+        """Load the last snapshot and start periodic saving (app lifespan)"""
+        if not self.snapshot_path:
+            return
+        try:
+            loaded = await self.save()
+            logger.info("Loaded %d dedup fingerprints from %s", loaded, self.snapshot_path)
+        except OSError:
+            logger.exception("Dedup snapshot unavailable; starting empty")
+        if self._task is None:
+            self._task = asyncio.create_task(self._snapshot_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._saving is not None:
+            await asyncio.gather(self._saving, return_exceptions=True)
+        if self.snapshot_path and self.dirty:
+            try:
+                await self.save()
+            except OSError:
+                logger.exception("Dedup snapshot failed")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.inflight_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "window_seconds": self.window,
+            "hits": self.hits,
+            "inflight_hits": self.inflight_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.inflight_hits) / lookups, 4) if lookups else None,
+            "bloom_negatives": self.bloom_negatives,
+            "bloom_false_positives": self.bloom_false_positives,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "bloom_bytes": len(self.bloom.array),
+            "index_bytes": self.entry_bytes + sys.getsizeof(self.entries),
+            "memory_bytes": len(self.bloom.array) + self.entry_bytes + sys.getsizeof(self.entries),
+            "snapshot": self.snapshot_path,
+            "snapshots": self.snapshots,
+            "merged_from_snapshot": self.merged_from_snapshot,
+        }
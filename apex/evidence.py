@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Evidence Upload Spooling
+Item-by-item evidence ingest into a disk-backed request body for SUPERLUMINAL
+"""
+
+import asyncio
+import base64
+import os
+import tempfile
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from proxy import dumps, loads
+
+# Bodies above this size spill from memory to a temporary file
+EVIDENCE_SPOOL_THRESHOLD = int(os.getenv("APEX_EVIDENCE_SPOOL_THRESHOLD_MB", "8")) * 1048576
+EVIDENCE_SPOOL_DIR = os.getenv("APEX_EVIDENCE_SPOOL_DIR") or None
+EVIDENCE_MAX_ITEM_BYTES = int(os.getenv("APEX_EVIDENCE_MAX_ITEM_MB", "16")) * 1048576
+EVIDENCE_MAX_BYTES = int(os.getenv("APEX_EVIDENCE_MAX_MB", "2048")) * 1048576
+
+CHUNK_SIZE = 65536
+
+
+class EvidenceError(Exception):
+    """Rejected upload; carries the HTTP status to return"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class EvidenceSpool:
+    """Builds `{"case_id": ..., "evidence": [...]}` incrementally
+
+    Only the current item (or file chunk) is ever held in memory beyond the
+    spool threshold; the upstream request body is then read back in chunks.
+    Writes are gathered into CHUNK_SIZE blocks, and once the body has
+    spilled to disk each block is written (and later read) off the event
+    loop.
+    """
+
+    def __init__(self, case_id: str, threshold: int = EVIDENCE_SPOOL_THRESHOLD,
+                 max_bytes: int = EVIDENCE_MAX_BYTES):
+        self.file = tempfile.SpooledTemporaryFile(max_size=threshold, dir=EVIDENCE_SPOOL_DIR)
+        self.threshold = threshold
+        self.max_bytes = max_bytes
+        self.items = 0
+        self.size = 0
+        self.buffer = bytearray()
+        self._buffer(b'{"case_id":' + dumps(case_id) + b',"evidence":[')
+
+    def _buffer(self, data: bytes):
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise EvidenceError(413, f"Evidence exceeds {self.max_bytes // 1048576} MB")
+        self.buffer += data
+
+    async def _write(self, data: bytes):
+        self._buffer(data)
+        if len(self.buffer) >= CHUNK_SIZE:
+            await self._flush()
+
+    async def _flush(self):
+        block, self.buffer = bytes(self.buffer), bytearray()
+        # Past the threshold this write rolls over to (or already is) disk I/O
+        if self.size > self.threshold:
+            await asyncio.to_thread(self.file.write, block)
+        else:
+            self.file.write(block)
+
+    async def _separator(self):
+        if self.items:
+            await self._write(b",")
+        self.items += 1
+
+    async def add(self, item: Dict[str, Any]):
+        await self._separator()
+        await self._write(dumps(item))
+
+    async def add_file(self, meta: Dict[str, Any], chunks: AsyncIterator[bytes]):
+        """Append a binary file as an item with streamed base64 `content_base64`"""
+        await self._separator()
+        await self._write(dumps(meta)[:-1] + (b',"content_base64":"' if meta else b'"content_base64":"'))
+        carry = b""
+        async for chunk in chunks:
+            chunk = carry + chunk
+            # base64 works in 3-byte groups; carry the remainder to the next chunk
+            whole = len(chunk) - len(chunk) % 3
+            await self._write(base64.b64encode(chunk[:whole]))
+            carry = chunk[whole:]
+        await self._write(base64.b64encode(carry) + b'"}')
+
+    async def finish(self):
+        self._buffer(b"]}")
+        await self._flush()
+        self.file.seek(0)
+
+    @property
+    def spilled(self) -> bool:
+        return bool(getattr(self.file, "_rolled", False))
+
+    async def body(self, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """The finished JSON body, chunk by chunk"""
+        spilled = self.spilled
+        while True:
+            chunk = await asyncio.to_thread(self.file.read, chunk_size) if spilled else self.file.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+            await asyncio.sleep(0)
+
+    def close(self):
+        self.file.close()
+
+
+async def iter_ndjson_items(chunks: AsyncIterator[bytes],
+                            max_item_bytes: int = EVIDENCE_MAX_ITEM_BYTES) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (line number, item) per NDJSON line; each item must be an object
+
+    The line buffer never grows past `max_item_bytes`.
+    """
+    buffer = bytearray()
+    line_no = 0
+
+    def parse(line: bytes) -> Dict[str, Any]:
+        try:
+            item = loads(line)
+        except ValueError as e:
+            raise EvidenceError(400, f"Evidence line {line_no}: invalid JSON ({e})")
+        if not isinstance(item, dict):
+            raise EvidenceError(400, f"Evidence line {line_no}: expected a JSON object")
+        return item
+
+    async for chunk in chunks:
+        buffer += chunk
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end == -1:
+                break
+            line_no += 1
+            line = bytes(buffer[start:end])
+            start = end + 1
+            if line.strip():
+                yield line_no, parse(line)
+        del buffer[:start]
+        if len(buffer) > max_item_bytes:
+            raise EvidenceError(413, f"Evidence line {line_no + 1} exceeds {max_item_bytes // 1048576} MB")
+    if bytes(buffer).strip():
+        line_no += 1
+        yield line_no, parse(bytes(buffer))
+
+
+async def iter_upload(upload, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Chunks of a multipart UploadFile (already spooled by Starlette)"""
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def is_ndjson_part(content_type: Optional[str], filename: Optional[str]) -> bool:
+    content_type = (content_type or "").split(";")[0].strip()
+    return content_type in ("application/x-ndjson", "application/jsonl") or (filename or "").endswith((".ndjson", ".jsonl"))
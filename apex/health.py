@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Upstream Health Monitor
+Concurrent health fan-out with a background-refreshed snapshot
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from proxy import dumps, loads
+from shared import SharedTable, shared_table
+from upstream import UpstreamPools
+
+logger = logging.getLogger("apex.health")
+
+HEALTH_INTERVAL = float(os.getenv("APEX_HEALTH_INTERVAL", "5"))
+HEALTH_TTL = float(os.getenv("APEX_HEALTH_TTL", "15"))
+HEALTH_DEADLINE = float(os.getenv("APEX_HEALTH_DEADLINE", "2"))
+
+
+def overall_status(services: Dict[str, Dict[str, Any]]) -> str:
+    """Derive the gateway-wide status from per-service results"""
+    if not services:
+        return "unknown"
+    states = [entry["status"] for entry in services.values()]
+    if all(state == "healthy" for state in states):
+        return "operational"
+    if all(state == "unhealthy" for state in states):
+        return "down"
+    return "degraded"
+
+
+class HealthMonitor:
+    """Checks every pooled upstream concurrently and caches the result"""
+
+    def __init__(self, pools: UpstreamPools, interval: float = HEALTH_INTERVAL,
+                 ttl: float = HEALTH_TTL, deadline: float = HEALTH_DEADLINE,
+                 shared: Optional[SharedTable] = None):
+        self.pools = pools
+        # With several workers, one fan-out per interval serves all of them
+        self.shared = shared if shared is not None else shared_table()
+        self.interval = interval
+        self.ttl = ttl
+        self.deadline = deadline
+        self.services: Dict[str, Dict[str, Any]] = {}
+        self.checked_at: Optional[float] = None  # monotonic
+        self.checked_at_iso: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._refresh_lock = asyncio.Lock()
+
+    async def _check(self, service: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            response = await self.pools.client(service).get("/health", timeout=self.deadline)
+        except Exception as e:
+            return {"status": "unhealthy", "response_time_ms": None, "error": type(e).__name__}
+        return {
+            "status": "healthy" if response.status_code == 200 else "degraded",
+            "response_time_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    async def check_all(self) -> Dict[str, Dict[str, Any]]:
+        """Check all upstreams at once, bounded by one overall deadline"""
+        tasks = {
+            asyncio.ensure_future(self._check(service)): service
+            for service in self.pools.services
+        }
+        if not tasks:
+            return {}
+        done, pending = await asyncio.wait(tasks, timeout=self.deadline)
+        for task in pending:
+            task.cancel()
+        results = {}
+        for task, service in tasks.items():
+            if task in done:
+                results[service] = task.result()
+            else:
+                results[service] = {"status": "unhealthy", "response_time_ms": None, "error": "deadline"}
+        return results
+
+    async def refresh(self, only_if_stale: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Run a fan-out and store it as the current snapshot"""
+        async with self._refresh_lock:
+            # A concurrent caller may have refreshed while we waited
+            if only_if_stale and self.is_fresh():
+                return self.services
+            if self._adopt_shared():
+                return self.services
+            self.services = await self.check_all()
+            self.checked_at = time.monotonic()
+            self.checked_at_iso = datetime.utcnow().isoformat()
+            if self.shared is not None:
+                self.shared.set("health", dumps({
+                    "services": self.services, "checked_at": time.time(), "checked_at_iso": self.checked_at_iso
+                }), self.ttl)
+            return self.services
+
+    def _adopt_shared(self) -> bool:
+        """Take another worker's snapshot if it is younger than one interval"""
+        if self.shared is None:
+            return False
+        raw = self.shared.get("health")
+        if raw is None:
+            return False
+        snapshot = loads(raw)
+        age = time.time() - snapshot["checked_at"]
+        if age >= self.interval:
+            return False
+        self.services = snapshot["services"]
+        self.checked_at = time.monotonic() - max(0.0, age)
+        self.checked_at_iso = snapshot["checked_at_iso"]
+        return True
+
+    def age_seconds(self) -> Optional[float]:
+        if self.checked_at is None:
+            return None
+        return time.monotonic() - self.checked_at
+
+    def is_fresh(self) -> bool:
+        age = self.age_seconds()
+        return age is not None and age <= self.ttl
+
+    async def snapshot(self) -> Dict[str, Any]:
+        """Current health view; only hits upstreams when the snapshot expired"""
+        if not self.is_fresh():
+            await self.refresh(only_if_stale=True)
+        age = self.age_seconds()
+        return {
+            "overall_status": overall_status(self.services),
+            "services": self.services,
+            "checked_at": self.checked_at_iso,
+            "age_ms": round(age * 1000, 2) if age is not None else None,
+            "ttl_seconds": self.ttl,
+        }
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Health refresh failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start the background refresher (called from the app lifespan)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background refresher (called from the app lifespan)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Hot-Tier Memory Index
+Bounded per-user BM25 inverted index over recently added memories, searched
+in-process before (or alongside) memory_nexus
+"""
+
+import math
+import os
+import re
+import sys
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+
+HOT_TIER_ENABLED = os.getenv("APEX_HOT_TIER", "false").lower() in ("1", "true", "yes")
+# merge: local hits are folded into every upstream answer
+# local_first: enough local hits answer the search without memory_nexus
+HOT_TIER_MODE = os.getenv("APEX_HOT_TIER_MODE", "merge")
+HOT_TIER_MAX_DOCS = int(os.getenv("APEX_HOT_TIER_MAX_DOCS", "100000"))
+HOT_TIER_MAX_PER_USER = int(os.getenv("APEX_HOT_TIER_MAX_PER_USER", "1000"))
+HOT_TIER_TTL = float(os.getenv("APEX_HOT_TIER_TTL_SECONDS", "900"))
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    # Interned so every posting and doc shares one copy of each term
+    return [sys.intern(token) for token in _TOKEN.findall(text.lower())]
+
+
+class _Doc:
+    __slots__ = ("memory_id", "content", "metadata", "backend", "added_at", "terms", "tfs", "length")
+
+    def __init__(self, memory_id: str, content: str, metadata: Optional[Dict[str, Any]],
+                 backend: str, added_at: float, terms: Tuple[str, ...], tfs: bytes, length: int):
+        self.memory_id = memory_id
+        self.content = content
+        self.metadata = metadata
+        self.backend = backend
+        self.added_at = added_at
+        self.terms = terms
+        self.tfs = tfs
+        self.length = length
+
+
+class _UserIndex:
+    """One user's postings: term -> packed (doc key << 8 | tf) entries
+
+    Most of a user's terms occur in a single recent memory, so a posting
+    is a bare int until a second doc shares the term, then a list. This
+    keeps the index at a fraction of a dict-per-posting layout.
+    """
+
+    __slots__ = ("docs", "postings", "total_length")
+
+    def __init__(self):
+        self.docs: "OrderedDict[int, _Doc]" = OrderedDict()
+        self.postings: Dict[str, Union[int, List[int]]] = {}
+        self.total_length = 0
+
+    def add(self, key: int, doc: _Doc):
+        self.docs[key] = doc
+        self.total_length += doc.length
+        postings = self.postings
+        for term, tf in zip(doc.terms, doc.tfs):
+            entry = key << 8 | tf
+            posting = postings.get(term)
+            if posting is None:
+                postings[term] = entry
+            elif isinstance(posting, int):
+                postings[term] = [posting, entry]
+            else:
+                posting.append(entry)
+
+    def remove(self, key: int) -> bool:
+        doc = self.docs.pop(key, None)
+        if doc is None:
+            return False
+        self.total_length -= doc.length
+        for term, tf in zip(doc.terms, doc.tfs):
+            posting = self.postings[term]
+            if isinstance(posting, int):
+                del self.postings[term]
+                continue
+            posting.remove(key << 8 | tf)
+            if len(posting) == 1:
+                self.postings[term] = posting[0]
+        return True
+
+    def search(self, terms: List[str], limit: int, min_added_at: float) -> List[Tuple[float, _Doc]]:
+        count = len(self.docs)
+        if not count:
+            return []
+        avg_length = self.total_length / count
+        scores: Dict[int, float] = {}
+        for term in set(terms):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            entries = (posting,) if isinstance(posting, int) else posting
+            idf = math.log(1 + (count - len(entries) + 0.5) / (len(entries) + 0.5))
+            for entry in entries:
+                key, tf = entry >> 8, entry & 0xFF
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self.docs[key].length / avg_length)
+                scores[key] = scores.get(key, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+        ranked = sorted(scores.items(), key=lambda entry: entry[1], reverse=True)
+        return [(score, self.docs[key]) for key, score in ranked
+                if self.docs[key].added_at >= min_added_at][:limit]
+
+
+class HotTierIndex:
+    """Recent memories per user, evicted by age and by total/per-user size
+
+    Eviction is oldest-first: a global insertion-order queue bounds the
+    total and the TTL, each user's ordered docs bound the per-user count.
+    """
+
+    def __init__(self, max_docs: int = HOT_TIER_MAX_DOCS, max_per_user: int = HOT_TIER_MAX_PER_USER,
+                 ttl: float = HOT_TIER_TTL):
+        self.max_docs = max_docs
+        self.max_per_user = max_per_user
+        self.ttl = ttl
+        self.users: Dict[str, _UserIndex] = {}
+        self.order: Deque[Tuple[float, str, int]] = deque()  # (added_at, user_id, doc key)
+        # Keys are never reused, so stale queue entries cannot hit a newer doc
+        self.next_key = 0
+        self.docs = 0
+        self.hits = 0
+        self.misses = 0
+        self.evicted_age = 0
+        self.evicted_size = 0
+
+    def add(self, user_id: str, memory_id: Optional[str], content: str,
+            metadata: Optional[Dict[str, Any]] = None, backend: str = ""):
+        now = time.monotonic()
+        tokens = tokenize(content)
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        index = self.users.get(user_id)
+        if index is None:
+            index = self.users[user_id] = _UserIndex()
+        key = self.next_key
+        self.next_key += 1
+        index.add(key, _Doc(memory_id, content, metadata, backend, now, tuple(counts),
+                            bytes(min(tf, 255) for tf in counts.values()), len(tokens)))
+        self.order.append((now, user_id, key))
+        self.docs += 1
+        while len(index.docs) > self.max_per_user:
+            self._remove(user_id, next(iter(index.docs)))
+            self.evicted_size += 1
+        self._evict(now)
+
+    def _remove(self, user_id: str, key: int) -> bool:
+        index = self.users.get(user_id)
+        if index is None or not index.remove(key):
+            return False
+        self.docs -= 1
+        if not index.docs:
+            del self.users[user_id]
+        return True
+
+    def _evict(self, now: float):
+        # Entries for docs already dropped per user are skipped lazily
+        while self.order and (self.docs > self.max_docs or self.order[0][0] < now - self.ttl):
+            added_at, user_id, key = self.order.popleft()
+            if self._remove(user_id, key):
+                if added_at < now - self.ttl:
+                    self.evicted_age += 1
+                else:
+                    self.evicted_size += 1
+        # Lazy entries must not let the queue outgrow the docs it tracks
+        if len(self.order) > 2 * self.max_docs:
+            self.order = deque(entry for entry in self.order
+                               if entry[1] in self.users and entry[2] in self.users[entry[1]].docs)
+
+    def search(self, user_id: str, query: str, limit: int = 10,
+               backends: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """BM25-ranked local hits; `backends` filters by routed backend"""
+        now = time.monotonic()
+        self._evict(now)
+        index = self.users.get(user_id)
+        hits = []
+        if index is not None:
+            wanted = set(backends or []) - {'all'}
+            for score, doc in index.search(tokenize(query), max(limit, 1) * 2, now - self.ttl):
+                if wanted and doc.backend not in wanted and doc.backend != 'all':
+                    continue
+                hits.append({
+                    "memory_id": doc.memory_id,
+                    "content": doc.content,
+                    "metadata": doc.metadata,
+                    "score": round(score, 4),
+                    "backend": doc.backend,
+                    "source": "hot_tier",
+                    "age_seconds": round(now - doc.added_at, 1),
+                })
+                if len(hits) >= limit:
+                    break
+        if hits:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return hits
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "docs": self.docs,
+            "users": len(self.users),
+            "terms": sum(len(index.postings) for index in self.users.values()),
+            "max_docs": self.max_docs,
+            "max_per_user": self.max_per_user,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted_age": self.evicted_age,
+            "evicted_size": self.evicted_size,
+        }
+
+
+def merge_hits(results: Any, hits: List[Dict[str, Any]], limit: Optional[int]) -> Any:
+    """Put local hits ahead of upstream results they are not already part of
+
+    Upstream answers are expected as {"results": [...]}; any other shape is
+    returned untouched.
+    """
+    if not hits or not isinstance(results, dict) or not isinstance(results.get("results"), list):
+        return results
+    # Provisional (write-behind) ids differ from upstream ones, so match on content too
+    seen = set()
+    for result in results["results"]:
+        if isinstance(result, dict):
+            seen.update((result.get("memory_id") or result.get("id"), result.get("content") or result.get("memory")))
+    fresh = [hit for hit in hits if hit["memory_id"] not in seen and hit["content"] not in seen]
+    merged = fresh + results["results"]
+    return {
+        **results,
+        "results": merged[:limit] if limit else merged,
+        "hot_tier": {"hits": len(hits), "merged": len(fresh)},
+    }
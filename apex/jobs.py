@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Async Job Runner
+Bounded worker pool for long upstream calls, with pluggable result storage
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from fastapi import HTTPException
+
+logger = logging.getLogger("apex.jobs")
+
+JOBS_WORKERS = int(os.getenv("APEX_JOBS_WORKERS", "8"))
+JOBS_QUEUE_SIZE = int(os.getenv("APEX_JOBS_QUEUE_SIZE", "1000"))
+JOBS_RESULT_TTL = float(os.getenv("APEX_JOBS_RESULT_TTL", "3600"))
+JOBS_STORE = os.getenv("APEX_JOBS_STORE", "memory")  # memory | redis
+REDIS_URL = os.getenv("APEX_REDIS_URL", "redis://redis:6379/0")
+
+TERMINAL_STATES = ("succeeded", "failed")
+
+
+class JobQueueFull(Exception):
+    """Raised when the job queue is at capacity"""
+
+
+class JobStore:
+    """Storage interface for job records"""
+
+    name = "base"
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def put(self, job: Dict[str, Any], ttl: float):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class MemoryJobStore(JobStore):
+    """In-process job records with lazy expiry"""
+
+    name = "memory"
+
+    def __init__(self):
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.expires: Dict[str, float] = {}
+        self.next_sweep = 0.0
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self._expire()
+        return self.jobs.get(job_id)
+
+    async def put(self, job: Dict[str, Any], ttl: float):
+        self.jobs[job["job_id"]] = job
+        self.expires[job["job_id"]] = time.monotonic() + ttl
+
+    def _expire(self):
+        now = time.monotonic()
+        if now < self.next_sweep:
+            return
+        self.next_sweep = now + 1.0
+        for job_id in [job_id for job_id, at in self.expires.items() if at < now]:
+            self.jobs.pop(job_id, None)
+            self.expires.pop(job_id, None)
+
+
+class RedisJobStore(JobStore):
+    """Job records in the docker-compose Redis, shared by all gateway replicas"""
+
+    name = "redis"
+
+    def __init__(self, url: str = REDIS_URL, prefix: str = "apex:job"):
+        import redis.asyncio as redis
+        self.redis = redis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.redis.get(f"{self.prefix}:{job_id}")
+        return json.loads(raw) if raw is not None else None
+
+    async def put(self, job: Dict[str, Any], ttl: float):
+        await self.redis.set(f"{self.prefix}:{job['job_id']}", json.dumps(job, default=str), px=int(ttl * 1000))
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+def _percentile(samples, fraction: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class JobManager:
+    """Runs submitted coroutines on a fixed number of workers"""
+
+    def __init__(self, store: JobStore, workers: int = JOBS_WORKERS,
+                 queue_size: int = JOBS_QUEUE_SIZE, result_ttl: float = JOBS_RESULT_TTL):
+        self.store = store
+        self.workers = workers
+        self.queue_size = queue_size
+        self.result_ttl = result_ttl
+        self.queue: Optional[asyncio.Queue] = None
+        self.tasks = []
+        self.events: Dict[str, asyncio.Event] = {}
+        self.running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        # Queue slots claimed by submits still writing their job to the store
+        self.reserved = 0
+        self.wait_times: Deque[float] = deque(maxlen=1000)
+        self.run_times: Deque[float] = deque(maxlen=1000)
+
+    def start(self):
+        """Spawn the worker pool (called from the app lifespan)"""
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Cancel the worker pool (called from the app lifespan)"""
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        await self.store.close()
+
+    async def submit(self, kind: str, fn: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+        """Queue `fn` and return its job record; raises JobQueueFull"""
+        # Claim the slot before awaiting the store, so concurrent submits
+        # cannot all pass the check and then overflow the queue
+        if self.queue is None or 0 < self.queue.maxsize <= self.queue.qsize() + self.reserved:
+            self.rejected += 1
+            raise JobQueueFull()
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "queued",
+            "created_at": datetime.utcnow().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+            "status_code": None,
+        }
+        self.reserved += 1
+        try:
+            await self.store.put(job, self.result_ttl)
+        finally:
+            self.reserved -= 1
+        self.events[job["job_id"]] = asyncio.Event()
+        self.queue.put_nowait((job, fn, time.monotonic()))
+        self.submitted += 1
+        return job
+
+    async def _worker(self):
+        while True:
+            job, fn, enqueued = await self.queue.get()
+            self.wait_times.append(time.monotonic() - enqueued)
+            self.running += 1
+            started = time.monotonic()
+            try:
+                await self._update(job, status="running", started_at=datetime.utcnow().isoformat())
+                try:
+                    result = await fn()
+                except HTTPException as e:
+                    await self._finish(job, "failed", error=e.detail, status_code=e.status_code)
+                except Exception as e:
+                    logger.exception("Job %s failed", job["job_id"])
+                    await self._finish(job, "failed", error=str(e) or type(e).__name__,
+                                       status_code=getattr(e, "status_code", 500))
+                else:
+                    await self._finish(job, "succeeded", result=result, status_code=200)
+            except Exception:
+                logger.exception("Could not record job %s", job["job_id"])
+            finally:
+                self.running -= 1
+                self.run_times.append(time.monotonic() - started)
+                self.queue.task_done()
+
+    async def _update(self, job: Dict[str, Any], **changes):
+        job.update(changes)
+        await self.store.put(job, self.result_ttl)
+        event = self.events.get(job["job_id"])
+        if event is not None:
+            event.set()
+            # Waiters re-arm on a fresh event for the next transition
+            self.events[job["job_id"]] = asyncio.Event()
+
+    async def _finish(self, job: Dict[str, Any], status: str, **changes):
+        if status == "succeeded":
+            self.completed += 1
+        else:
+            self.failed += 1
+        await self._update(job, status=status, finished_at=datetime.utcnow().isoformat(), **changes)
+        self.events.pop(job["job_id"], None)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.store.get(job_id)
+
+    async def wait_for_change(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Wait until the job changes state (or `timeout`), then return it
+
+        Jobs run by this process wake waiters immediately; jobs owned by
+        another replica (Redis store) are polled.
+        """
+        event = self.events.get(job_id)
+        if event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        else:
+            await asyncio.sleep(min(timeout, 1.0))
+        return await self.store.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "store": self.store.name,
+            "workers": self.workers,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "queue_capacity": self.queue_size,
+            "running": self.running,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "wait_ms": {
+                "p50": _ms(_percentile(self.wait_times, 0.50)),
+                "p95": _ms(_percentile(self.wait_times, 0.95)),
+                "max": _ms(max(self.wait_times) if self.wait_times else None),
+            },
+            "run_ms": {
+                "p50": _ms(_percentile(self.run_times, 0.50)),
+                "p95": _ms(_percentile(self.run_times, 0.95)),
+            },
+            "result_ttl_seconds": self.result_ttl,
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 2) if seconds is not None else None
+
+
+def create_job_manager(kind: str = JOBS_STORE) -> JobManager:
+    """Build the job manager with the store selected by APEX_JOBS_STORE"""
+    store = RedisJobStore() if kind == "redis" else MemoryJobStore()
+    return JobManager(store)
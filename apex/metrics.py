@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Prometheus Metrics
+Request/upstream latency histograms, in-flight gauges and pool usage for /metrics
+"""
+
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client.core import GaugeMetricFamily
+
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+# Tuned around the <150ms gateway budget, with a tail for 30s/60s upstreams
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+REQUEST_LATENCY = Histogram(
+    "apex_http_request_duration_seconds",
+    "Gateway request latency by route template, method and status",
+    ["route", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "apex_http_requests_in_flight",
+    "Gateway requests currently being served",
+    registry=REGISTRY,
+)
+UPSTREAM_LATENCY = Histogram(
+    "apex_upstream_request_duration_seconds",
+    "Upstream call latency by CONFIG service and outcome",
+    ["service", "outcome"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+UPSTREAM_IN_FLIGHT = Gauge(
+    "apex_upstream_requests_in_flight",
+    "Upstream calls currently outstanding",
+    ["service"],
+    registry=REGISTRY,
+)
+MEMORY_ROUTES = Counter(
+    "apex_memory_route_total",
+    "Backends chosen by _route_memory_add",
+    ["backend", "rule"],
+    registry=REGISTRY,
+)
+
+UNMATCHED_ROUTE = "__unmatched__"
+
+
+class PrometheusMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware overhead, streaming-safe)
+
+    Requests are labelled by route template ("/api/v1/jobs/{job_id}"), not
+    raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            # FastAPI stores the matched route in the scope during routing
+            template = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            REQUEST_LATENCY.labels(template, scope["method"], str(status)).observe(
+                time.perf_counter() - started
+            )
+
+
+def observe_upstream(service: str, outcome: str, seconds: float):
+    UPSTREAM_LATENCY.labels(service, outcome).observe(seconds)
+
+
+def upstream_in_flight(service: str) -> Gauge:
+    return UPSTREAM_IN_FLIGHT.labels(service)
+
+
+def observe_route(backend: str, rule: str):
+    MEMORY_ROUTES.labels(backend, rule).inc()
+
+
+class StatsCollector:
+    """Exports gauges computed at scrape time from a stats() callable"""
+
+    def __init__(self, name: str, documentation: str, label: str,
+                 stats: Callable[[], Dict[str, Dict]], fields: Iterable[str]):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.stats = stats
+        self.fields = list(fields)
+
+    def collect(self):
+        snapshot = self.stats()
+        for field in self.fields:
+            family = GaugeMetricFamily(f"{self.name}_{field}", f"{self.documentation} ({field})", labels=[self.label])
+            for key, values in snapshot.items():
+                value = _numeric(values.get(field))
+                if value is not None:
+                    family.add_metric([key], value)
+            yield family
+
+
+def _numeric(value) -> Optional[float]:
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)):
+        return float(value)
+    return None
+
+
+_stats_collectors: Dict[str, StatsCollector] = {}
+
+
+def register_stats(name: str, documentation: str, label: str,
+                   stats: Callable[[], Dict[str, Dict]], fields: Iterable[str]):
+    """Expose a component's stats() dict (keyed by `label`) as gauges
+
+    Registering a name again (api.py imported a second time, e.g. as
+    __main__ and as `api`) points the existing gauges at the new stats().
+    """
+    collector = _stats_collectors.get(name)
+    if collector is not None:
+        collector.stats = stats
+        return
+    collector = _stats_collectors[name] = StatsCollector(name, documentation, label, stats, fields)
+    REGISTRY.register(collector)
+
+
+def render() -> bytes:
+    return generate_latest(REGISTRY)
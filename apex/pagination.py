@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Paginated Memory Search
+Bounded search pages merged across sources, with opaque continuation
+tokens that carry each source's offset
+"""
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from proxy import dumps, loads
+from resilience import Resilience
+
+SEARCH_MAX_PAGE_SIZE = int(os.getenv("APEX_SEARCH_MAX_PAGE_SIZE", "100"))
+# Deepest offset served per source; bounds walks over upstreams that ignore `offset`
+SEARCH_MAX_OFFSET = int(os.getenv("APEX_SEARCH_MAX_OFFSET", "10000"))
+
+_CURSOR_VERSION = 1
+
+
+class InvalidCursor(ValueError):
+    """Continuation token that is malformed or belongs to another search"""
+
+
+def cursor_scope(user_id: str, query: str, sources: List[str]) -> str:
+    """Digest of what a cursor continues, so it cannot be replayed elsewhere"""
+    return hashlib.blake2b(dumps([user_id, query, sources]), digest_size=8).hexdigest()
+
+
+def encode_cursor(scope: str, offsets: Dict[str, int], heads: Optional[Dict[str, str]] = None) -> str:
+    raw = dumps({"v": _CURSOR_VERSION, "s": scope, "o": offsets, **({"h": heads} if heads else {})})
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(token: str, scope: str, sources: List[str]) -> Tuple[Dict[str, int], Dict[str, str]]:
+    """(per-source offsets, page heads) from a cursor issued for the same search"""
+    try:
+        state = loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        offsets = state["o"]
+        heads = state.get("h") or {}
+        valid = (state["v"] == _CURSOR_VERSION and isinstance(offsets, dict) and set(offsets) <= set(sources)
+                 and all(isinstance(offset, int) and offset >= 0 for offset in offsets.values())
+                 and isinstance(heads, dict) and all(isinstance(head, str) for head in heads.values()))
+    except (binascii.Error, ValueError, TypeError, KeyError, AttributeError):
+        raise InvalidCursor("Malformed cursor")
+    if not valid:
+        raise InvalidCursor("Malformed cursor")
+    if state["s"] != scope:
+        raise InvalidCursor("Cursor belongs to a different user, query or source list")
+    return offsets, heads
+
+
+def _head(results: List[Dict[str, Any]]) -> Optional[str]:
+    """Short digest of a source page's first result"""
+    return hashlib.blake2b(dumps(results[0]), digest_size=6).hexdigest() if results else None
+
+
+async def _fetch_source(upstream: Resilience, query: str, user_id: str, source: str,
+                        offset: int, limit: int) -> List[Dict[str, Any]]:
+    response = await upstream.request(
+        'memory_nexus', "POST", "/api/memory/search",
+        json={"query": query, "user_id": user_id, "sources": [source], "limit": limit, "offset": offset},
+        timeout=10.0,
+        hedge=True,
+        adaptive=True
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"Memory search failed for {source} with status {response.status_code}")
+    data = response.json()
+    results = data.get("results", []) if isinstance(data, dict) else data
+    # Never trust more than was asked for
+    return results[:limit]
+
+
+async def search_page(upstream: Resilience, query: str, user_id: str, offsets: Dict[str, int],
+                      page_size: int, heads: Optional[Dict[str, str]] = None
+                      ) -> Tuple[List[Dict[str, Any]], Dict[str, int], Dict[str, str]]:
+    """One page of the score-ordered merge of every source still in `offsets`
+
+    Each source is asked for `page_size` results from its own offset; the
+    best `page_size` of their union is the page, and each source advances
+    by how many of its results made it in. Returns (page, next offsets,
+    next heads); empty next offsets means every source is exhausted.
+
+    Paging assumes memory_nexus honors `offset`. `heads` holds the first
+    result of each source's previous page when that source advanced; a
+    source whose page starts with it again ignored the offset and is
+    dropped, rather than repeating one page until SEARCH_MAX_OFFSET.
+    """
+    heads = heads or {}
+    sources = list(offsets)
+    limits = [min(page_size, SEARCH_MAX_OFFSET - offsets[source]) for source in sources]
+    fetched = await asyncio.gather(*(
+        _fetch_source(upstream, query, user_id, source, offsets[source], limit)
+        for source, limit in zip(sources, limits)
+    ))
+    stalled = {
+        source for source, results in zip(sources, fetched)
+        if source in heads and _head(results) == heads[source]
+    }
+
+    candidates = [
+        (result, source)
+        for source, results in zip(sources, fetched)
+        if source not in stalled
+        for result in results
+    ]
+    # Stable: equal scores keep source order, then each source's own order
+    candidates.sort(key=lambda candidate: -(candidate[0].get("score") or 0))
+    page = candidates[:page_size]
+
+    consumed = dict.fromkeys(sources, 0)
+    for _, source in page:
+        consumed[source] += 1
+    next_offsets, next_heads = {}, {}
+    for source, limit, results in zip(sources, limits, fetched):
+        offset = offsets[source] + consumed[source]
+        exhausted = source in stalled or (len(results) < limit and consumed[source] == len(results))
+        if not exhausted and offset < SEARCH_MAX_OFFSET:
+            next_offsets[source] = offset
+            if consumed[source]:
+                next_heads[source] = _head(results)
+            elif source in heads:
+                next_heads[source] = heads[source]
+    return [result for result, _ in page], next_offsets, next_heads
+
+
+async def export_pages(upstream: Resilience, query: str, user_id: str, scope: str, offsets: Dict[str, int],
+                       page_size: int, heads: Optional[Dict[str, str]] = None) -> AsyncIterator[Dict[str, Any]]:
+    """Yield every page of a search as a frame, then a summary frame
+
+    Only one page is held at a time, and the next one is fetched only when
+    the consumer asks for it, so a slow client slows the walk instead of
+    growing the gateway's memory. Each page frame carries the cursor that
+    resumes after it.
+    """
+    pages = total = 0
+    while offsets:
+        results, offsets, heads = await search_page(upstream, query, user_id, offsets, page_size, heads)
+        pages += 1
+        total += len(results)
+        yield {
+            "type": "page",
+            "page": pages,
+            "results": results,
+            "next_cursor": encode_cursor(scope, offsets, heads) if offsets else None,
+        }
+    yield {"type": "done", "pages": pages, "total": total}
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Upstream Passthrough
+Relays upstream JSON bodies without parsing and re-encoding them, plus a
+faster JSON encoder for the responses the gateway builds itself
+"""
+
+import json
+import os
+from typing import Any, Dict
+
+import httpx
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json fallback
+    orjson = None
+
+PASSTHROUGH_ROUTES = {
+    route.strip()
+    for route in os.getenv("APEX_PASSTHROUGH_ROUTES", "memory_search,forensic_analyze,skill_execute").split(",")
+    if route.strip()
+}
+
+JSON_MEDIA_TYPE = "application/json"
+
+# Upstream headers worth relaying on a streamed passthrough
+_RELAYED_HEADERS = ("content-encoding", "content-length")
+
+
+def dumps(value: Any) -> bytes:
+    """Compact JSON bytes (orjson when installed)"""
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with `dumps` (the app's default response class)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class RawJSON:
+    """An upstream JSON body kept as bytes; parsed only if something needs it
+
+    Safe to share between single-flight waiters and to keep in the search
+    cache: each caller gets its own Response around the same bytes.
+    """
+
+    __slots__ = ("body", "status_code", "media_type")
+
+    def __init__(self, body: bytes, status_code: int = 200, media_type: str = JSON_MEDIA_TYPE):
+        self.body = body
+        self.status_code = status_code
+        self.media_type = media_type
+
+    @classmethod
+    def from_response(cls, response: httpx.Response) -> "RawJSON":
+        return cls(response.content, response.status_code, response.headers.get("content-type", JSON_MEDIA_TYPE))
+
+    def json(self) -> Any:
+        return loads(self.body)
+
+    def response(self) -> Response:
+        return Response(content=self.body, status_code=self.status_code, media_type=self.media_type)
+
+
+def stream_response(response: httpx.Response) -> StreamingResponse:
+    """Relay an open (stream=True) upstream response chunk by chunk
+
+    Bytes are forwarded undecoded, so the upstream must have been asked for
+    an encoding the client accepts (see `upstream_headers`).
+    """
+    headers = {name: response.headers[name] for name in _RELAYED_HEADERS if name in response.headers}
+    return StreamingResponse(
+        response.aiter_raw(),
+        status_code=response.status_code,
+        media_type=response.headers.get("content-type", JSON_MEDIA_TYPE),
+        headers=headers,
+        background=BackgroundTask(response.aclose),
+    )
+
+
+def upstream_headers(client_headers) -> Dict[str, str]:
+    """Ask the upstream for an encoding the downstream client can take as-is"""
+    return {"accept-encoding": client_headers.get("accept-encoding", "identity")}
+
+
+def respond(result: Any) -> Response:
+    """Turn a handler result into what FastAPI should send
+
+    Parsed results are encoded here rather than returned as-is: FastAPI
+    runs jsonable_encoder over returned dicts before the response class
+    sees them, which costs more than the encoding itself.
+    """
+    if isinstance(result, RawJSON):
+        return result.response()
+    if isinstance(result, Response):
+        return result
+    return FastJSONResponse(result)
+
+
+def materialize(result: Any) -> Any:
+    """Parsed value of a result, for places that store JSON (async jobs)"""
+    return result.json() if isinstance(result, RawJSON) else result
+
+
+def relay(route: str, response: httpx.Response, streamed: bool = False) -> Any:
+    """Result for a 200 upstream response: streamed, raw bytes, or parsed"""
+    if streamed:
+        return stream_response(response)
+    if route in PASSTHROUGH_ROUTES:
+        return RawJSON.from_response(response)
+    return response.json()
+
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Quorum Replication
+Concurrent per-backend writes for memories routed to 'all', acknowledged
+once a write quorum of backends has accepted them
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger("apex.replication")
+
+QUORUM_REPLICATION = os.getenv("APEX_QUORUM_REPLICATION", "false").lower() in ("1", "true", "yes")
+# Acks needed before the add returns; 0 (default) waits for every backend
+WRITE_QUORUM = int(os.getenv("APEX_WRITE_QUORUM", "0"))
+# Stragglers still running this long after the quorum are abandoned
+REPLICATION_TIMEOUT = float(os.getenv("APEX_REPLICATION_TIMEOUT", "30"))
+
+WriteFn = Callable[[Dict[str, Any], str], Awaitable[Dict[str, Any]]]
+
+
+class QuorumNotMet(Exception):
+    """Fewer than `required` backends accepted the write"""
+
+    def __init__(self, result: Dict[str, Any]):
+        super().__init__(f"Write quorum not met ({result['acks']}/{result['required']} acks)")
+        self.result = result
+
+
+class _BackendStats:
+    __slots__ = ("writes", "failures", "background", "latency_total")
+
+    def __init__(self):
+        self.writes = 0
+        self.failures = 0
+        self.background = 0
+        self.latency_total = 0.0
+
+
+class QuorumReplicator:
+    """Writes one item to every backend at once; returns at `quorum` acks
+
+    Replicas still in flight when the quorum is reached keep running in
+    the background; their outcome lands in `stats()` and the logs.
+    """
+
+    def __init__(self, backends: List[str], write: WriteFn, quorum: int = WRITE_QUORUM,
+                 timeout: float = REPLICATION_TIMEOUT):
+        self.backends = list(backends)
+        self.write_fn = write
+        self.quorum = len(self.backends) if quorum <= 0 else min(quorum, len(self.backends))
+        self.timeout = timeout
+        self.background: set = set()
+        self.per_backend: Dict[str, _BackendStats] = {backend: _BackendStats() for backend in self.backends}
+        self.writes = 0
+        self.quorum_failed = 0
+
+    async def write(self, item: Dict[str, Any], write: Optional[WriteFn] = None) -> Dict[str, Any]:
+        """Replicate `item`; raises QuorumNotMet if too many backends fail
+
+        The result reports each replica as ok / error / pending with its
+        latency, plus the first acknowledged memory_id.
+        """
+        write = write or self.write_fn
+        self.writes += 1
+        started = time.monotonic()
+        replicas: Dict[str, Dict[str, Any]] = {backend: {"status": "pending"} for backend in self.backends}
+        tasks = {
+            asyncio.ensure_future(self._replicate(write, item, backend, started, replicas)): backend
+            for backend in self.backends
+        }
+        acks = failures = 0
+        pending = set(tasks)
+        while pending and acks < self.quorum and failures <= len(self.backends) - self.quorum:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if replicas[tasks[task]]["status"] == "ok":
+                    acks += 1
+                else:
+                    failures += 1
+
+        for task in pending:
+            self.per_backend[tasks[task]].background += 1
+            self.background.add(task)
+            task.add_done_callback(self.background.discard)
+
+        result = {
+            "acks": acks,
+            "required": self.quorum,
+            "quorum_met": acks >= self.quorum,
+            "quorum_ms": round((time.monotonic() - started) * 1000, 1),
+            "memory_id": next((replica["memory_id"] for replica in replicas.values()
+                               if replica["status"] == "ok"), None),
+            # Snapshot: background replicas keep updating the live dicts
+            "replicas": {backend: dict(replica) for backend, replica in replicas.items()},
+        }
+        if not result["quorum_met"]:
+            self.quorum_failed += 1
+            raise QuorumNotMet(result)
+        return result
+
+    async def _replicate(self, write: WriteFn, item: Dict[str, Any], backend: str,
+                         started: float, replicas: Dict[str, Dict[str, Any]]):
+        stats = self.per_backend[backend]
+        stats.writes += 1
+        try:
+            response = await asyncio.wait_for(write(item, backend), timeout=self.timeout)
+        except Exception as e:
+            stats.failures += 1
+            error = str(e) or type(e).__name__
+            replicas[backend] = {"status": "error", "error": error}
+            logger.warning("Replica write to %s failed: %s", backend, error)
+        else:
+            replicas[backend] = {"status": "ok", "memory_id": response.get("memory_id")}
+        latency = time.monotonic() - started
+        stats.latency_total += latency
+        replicas[backend]["latency_ms"] = round(latency * 1000, 1)
+
+    async def drain(self):
+        """Wait for background replicas (called from the app lifespan)"""
+        if self.background:
+            await asyncio.gather(*list(self.background), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            backend: {
+                "writes": stats.writes,
+                "failures": stats.failures,
+                "background": stats.background,
+                "avg_latency_ms": round(stats.latency_total / stats.writes * 1000, 1) if stats.writes else 0.0,
+            }
+            for backend, stats in self.per_backend.items()
+        }
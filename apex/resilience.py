@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Upstream Resilience
+Per-upstream circuit breakers, latency-derived timeouts and hedged reads
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import httpx
+
+from admission import ConcurrencyLimit, Saturated
+from metrics import observe_upstream, upstream_in_flight
+from upstream import UpstreamPools
+
+logger = logging.getLogger("apex.resilience")
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("APEX_BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_OPEN_SECONDS = float(os.getenv("APEX_BREAKER_OPEN_SECONDS", "15"))
+BREAKER_HALF_OPEN_PROBES = int(os.getenv("APEX_BREAKER_HALF_OPEN_PROBES", "1"))
+ADAPTIVE_TIMEOUTS = os.getenv("APEX_ADAPTIVE_TIMEOUTS", "true").lower() in ("1", "true", "yes")
+TIMEOUT_PERCENTILE = float(os.getenv("APEX_TIMEOUT_PERCENTILE", "0.99"))
+TIMEOUT_MULTIPLIER = float(os.getenv("APEX_TIMEOUT_MULTIPLIER", "3"))
+TIMEOUT_FLOOR = float(os.getenv("APEX_TIMEOUT_FLOOR", "1"))
+HEDGING = os.getenv("APEX_HEDGING", "true").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = float(os.getenv("APEX_HEDGE_PERCENTILE", "0.95"))
+HEDGE_MIN_DELAY = float(os.getenv("APEX_HEDGE_MIN_DELAY_MS", "20")) / 1000
+
+# Samples needed before latency percentiles replace the fixed timeouts
+MIN_LATENCY_SAMPLES = 20
+LATENCY_WINDOW = 512
+
+
+class UpstreamError(Exception):
+    """An upstream could not serve the request; carries the HTTP status to return"""
+
+    status_code = 502
+
+    def __init__(self, service: str, detail: str, retry_after: Optional[float] = None):
+        super().__init__(detail)
+        self.service = service
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class UpstreamUnavailable(UpstreamError):
+    status_code = 503
+
+
+class UpstreamTimeout(UpstreamError):
+    status_code = 504
+
+
+class CircuitBreaker:
+    """closed -> open after N consecutive failures -> half_open probes -> closed"""
+
+    def __init__(self, threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 open_seconds: float = BREAKER_OPEN_SECONDS, probes: int = BREAKER_HALF_OPEN_PROBES):
+        self.threshold = threshold
+        self.open_seconds = open_seconds
+        self.probes = probes
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probes_inflight = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.open_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == "open" and self.retry_after() <= 0:
+            self.state = "half_open"
+            self.probes_inflight = 0
+        if self.state == "closed":
+            return True
+        if self.state == "half_open" and self.probes_inflight < self.probes:
+            self.probes_inflight += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        if self.state == "half_open":
+            self.state = "closed"
+            self.probes_inflight = 0
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.threshold:
+            if self.state != "open":
+                self.times_opened += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self.probes_inflight = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "is_open": self.state == "open",
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_after_seconds": round(self.retry_after(), 2) if self.state == "open" else None,
+        }
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies with cached percentiles"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self._sorted = []
+        self._dirty = 0
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+        self._dirty += 1
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if len(self.samples) < MIN_LATENCY_SAMPLES:
+            return None
+        # Re-sort lazily: at most once per 32 new samples
+        if self._dirty >= 32 or not self._sorted:
+            self._sorted = sorted(self.samples)
+            self._dirty = 0
+        return self._sorted[min(len(self._sorted) - 1, int(len(self._sorted) * fraction))]
+
+
+class Resilience:
+    """Wraps every pooled upstream call with breaker, timeout and hedging policy"""
+
+    def __init__(self, pools: UpstreamPools, limits: Optional[Dict[str, ConcurrencyLimit]] = None):
+        self.pools = pools
+        self.limits = limits or {}
+        self.breakers: Dict[str, CircuitBreaker] = {service: CircuitBreaker() for service in pools.services}
+        # Per (service, "METHOD /path"): a fast search must not set the pace for a slow analyze
+        self.latency: Dict[Tuple[str, str], LatencyTracker] = {}
+        self.hedges_fired: Dict[str, int] = {service: 0 for service in pools.services}
+        self.hedges_won: Dict[str, int] = {service: 0 for service in pools.services}
+        self.timeouts: Dict[str, int] = {service: 0 for service in pools.services}
+
+    def tracker(self, service: str, route: str) -> LatencyTracker:
+        tracker = self.latency.get((service, route))
+        if tracker is None:
+            tracker = self.latency[(service, route)] = LatencyTracker()
+        return tracker
+
+    def timeout_for(self, service: str, route: str, max_timeout: float) -> float:
+        """Observed-latency timeout for the route, never above its fixed timeout"""
+        if not ADAPTIVE_TIMEOUTS:
+            return max_timeout
+        tail = self.tracker(service, route).percentile(TIMEOUT_PERCENTILE)
+        if tail is None:
+            return max_timeout
+        return min(max_timeout, max(TIMEOUT_FLOOR, tail * TIMEOUT_MULTIPLIER))
+
+    def hedge_delay(self, service: str, route: str) -> Optional[float]:
+        p = self.tracker(service, route).percentile(HEDGE_PERCENTILE)
+        return max(HEDGE_MIN_DELAY, p) if p is not None else None
+
+    async def request(self, service: str, method: str, path: str, *, timeout: float,
+                      hedge: bool = False, adaptive: bool = False, stream: bool = False,
+                      **kwargs) -> httpx.Response:
+        """Send a request through the breaker; raises UpstreamError subclasses
+
+        `timeout` is the route's maximum. `adaptive` lets it shrink to a
+        multiple of the route's observed tail latency; set it only for short
+        routes whose work does not vary much (not analyses, skills or batch
+        writes). `hedge` should only be set for idempotent reads, which may
+        then be sent twice. With `stream` the
+        response is returned once headers arrive (never hedged) and the
+        caller must aclose() it. Services with an admission concurrency
+        limit wait for a slot first, or fail fast with 503 when saturated.
+        """
+        limit = self.limits.get(service)
+        if limit is None:
+            return await self._request(service, method, path, timeout, hedge, adaptive, stream, kwargs)
+        try:
+            await limit.acquire()
+        except Saturated as e:
+            observe_upstream(service, "shed", 0.0)
+            raise UpstreamUnavailable(service, e.detail, retry_after=e.retry_after)
+        try:
+            return await self._request(service, method, path, timeout, hedge, adaptive, stream, kwargs)
+        finally:
+            limit.release()
+
+    async def _request(self, service: str, method: str, path: str, timeout: float,
+                       hedge: bool, adaptive: bool, stream: bool, kwargs: Dict[str, Any]) -> httpx.Response:
+        breaker = self.breakers[service]
+        if not breaker.allow():
+            observe_upstream(service, "rejected", 0.0)
+            raise UpstreamUnavailable(service, f"{service} circuit open", retry_after=breaker.retry_after())
+
+        route = f"{method} {path}"
+        latency = self.tracker(service, route)
+        effective = self.timeout_for(service, route, timeout) if adaptive else timeout
+        delay = self.hedge_delay(service, route) if hedge and not stream and HEDGING and breaker.state == "closed" else None
+
+        in_flight = upstream_in_flight(service)
+
+        async def send() -> httpx.Response:
+            started = time.perf_counter()
+            in_flight.inc()
+            try:
+                client = self.pools.client(service)
+                request = client.build_request(method, path, timeout=effective, **kwargs)
+                response = await client.send(request, stream=stream)
+            finally:
+                in_flight.dec()
+            if response.status_code < 500:
+                latency.record(time.perf_counter() - started)
+            return response
+
+        started = time.perf_counter()
+        try:
+            if delay is not None and delay < effective:
+                response = await self._hedged(service, send, delay, effective)
+            else:
+                response = await send()
+        except httpx.TimeoutException:
+            breaker.record_failure()
+            self.timeouts[service] += 1
+            observe_upstream(service, "timeout", time.perf_counter() - started)
+            raise UpstreamTimeout(service, f"{service} timed out after {effective:.2f}s")
+        except httpx.TransportError as e:
+            breaker.record_failure()
+            observe_upstream(service, "unavailable", time.perf_counter() - started)
+            raise UpstreamUnavailable(service, f"{service} unreachable: {type(e).__name__}")
+        except BaseException:
+            # Cancelled by the caller: release a half-open probe slot without judging
+            if breaker.state == "half_open":
+                breaker.probes_inflight = max(0, breaker.probes_inflight - 1)
+            raise
+
+        if response.status_code >= 500:
+            breaker.record_failure()
+            observe_upstream(service, "error", time.perf_counter() - started)
+        else:
+            breaker.record_success()
+            observe_upstream(service, "ok", time.perf_counter() - started)
+        return response
+
+    async def _hedged(self, service: str, send, delay: float, timeout: float) -> httpx.Response:
+        """Send once, and again if no answer after `delay`; first good answer wins"""
+        first = asyncio.ensure_future(send())
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+
+        self.hedges_fired[service] += 1
+        second = asyncio.ensure_future(send())
+        pending = {first, second}
+        deadline = time.monotonic() + timeout - delay
+        error: Optional[BaseException] = None
+        fallback: Optional[httpx.Response] = None
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    response = task.result()
+                    if response.status_code < 500:
+                        if task is second:
+                            self.hedges_won[service] += 1
+                        return response
+                    fallback = response
+        finally:
+            for task in pending:
+                task.cancel()
+        if fallback is not None:
+            return fallback
+        if error is not None:
+            raise error
+        raise httpx.ReadTimeout(f"hedged request to {service} timed out")
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {}
+        for service, breaker in self.breakers.items():
+            stats[service] = {
+                **breaker.snapshot(),
+                "latency_ms": {
+                    route: {
+                        "samples": len(latency.samples),
+                        "p50": _ms(latency.percentile(0.50)),
+                        "p95": _ms(latency.percentile(0.95)),
+                        "p99": _ms(latency.percentile(0.99)),
+                        "hedge_delay_ms": _ms(self.hedge_delay(service, route)),
+                    }
+                    for (name, route), latency in self.latency.items() if name == service
+                },
+                "timeouts": self.timeouts[service],
+                "hedges_fired": self.hedges_fired[service],
+                "hedges_won": self.hedges_won[service],
+            }
+        return stats
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 2) if seconds is not None else None
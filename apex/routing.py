@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Memory Routing Engine
+Compiles routing keywords once into word-boundary literal matchers, and
+optionally steers eligible adds to the fastest healthy backend
+"""
+
+import json
+import logging
+import operator
+import os
+import random
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("apex.routing")
+
+ROUTING_RULES_PATH = os.getenv("APEX_ROUTING_RULES", "")
+ROUTING_RELOAD_INTERVAL = float(os.getenv("APEX_ROUTING_RELOAD_INTERVAL", "5"))
+
+# Adaptive mode: rules listed in ADAPTIVE_RULES may be rerouted among
+# ADAPTIVE_BACKENDS by observed latency and error rate
+ADAPTIVE_ROUTING = os.getenv("APEX_ADAPTIVE_ROUTING", "false").lower() in ("1", "true", "yes")
+ADAPTIVE_RULES = [name for name in os.getenv("APEX_ADAPTIVE_RULES", "default").split(",") if name]
+ADAPTIVE_BACKENDS = [name for name in os.getenv(
+    "APEX_ADAPTIVE_BACKENDS", "supermemory,mem0,memory_plugin").split(",") if name]
+ADAPTIVE_ALPHA = float(os.getenv("APEX_ADAPTIVE_ALPHA", "0.2"))
+ADAPTIVE_MARGIN = float(os.getenv("APEX_ADAPTIVE_MARGIN", "1.25"))
+ADAPTIVE_MAX_ERROR_RATE = float(os.getenv("APEX_ADAPTIVE_MAX_ERROR_RATE", "0.2"))
+ADAPTIVE_EXPLORE = float(os.getenv("APEX_ADAPTIVE_EXPLORE", "0.05"))
+ADAPTIVE_MIN_SAMPLES = int(os.getenv("APEX_ADAPTIVE_MIN_SAMPLES", "5"))
+
+# Evaluated in order, first match wins. A trailing '*' on a keyword matches
+# any word starting with it ("prefer*" -> prefer, preferred, preferences).
+DEFAULT_RULES: Dict[str, Any] = {
+    "rules": [
+        {
+            "name": "preferences",
+            "backend": "memory_plugin",
+            "keywords": ["prefer*", "like", "likes", "liked", "favorite*", "favourite*", "setting*"]
+        },
+        {
+            "name": "relationships",
+            "backend": "mem0",
+            "keywords": ["case", "cases", "linked", "related", "relation*", "connection*"]
+        },
+        {
+            "name": "critical",
+            "backend": "all",
+            "metadata": {"priority": {"gte": 5}}
+        },
+    ],
+    "default": {"name": "default", "backend": "supermemory"}
+}
+
+# Keywords sharing at least this many leading characters share one search
+MIN_STEM_LENGTH = 4
+
+_OPERATORS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "in": lambda value, options: value in options,
+}
+
+
+class RoutingRule:
+    """One routing rule: keywords and/or metadata conditions -> backend"""
+
+    def __init__(self, index: int, spec: Dict[str, Any]):
+        if "backend" not in spec:
+            raise ValueError(f"Routing rule #{index} has no backend")
+        self.index = index
+        self.name = spec.get("name", f"rule_{index}")
+        self.backend = spec["backend"]
+        self.keywords: List[str] = [kw.strip().lower() for kw in spec.get("keywords", []) if kw.strip()]
+        self.metadata: Dict[str, Dict[str, Any]] = spec.get("metadata", {})
+        for field, conditions in self.metadata.items():
+            unknown = set(conditions) - set(_OPERATORS)
+            if unknown:
+                raise ValueError(f"Routing rule '{self.name}': unknown operator(s) {sorted(unknown)} on '{field}'")
+        if not self.keywords and not self.metadata:
+            raise ValueError(f"Routing rule '{self.name}' needs keywords or metadata conditions")
+
+    def stems(self) -> List["_Stem"]:
+        """Fold keywords sharing a stem into one literal search each
+
+        ("like", "likes", "liked") become a single search for "like" that
+        accepts the word tails "", "s" and "d"; ("related", "relation*")
+        share "relat". Stems keep the order the keywords were declared in.
+        """
+        groups: List[List[Any]] = []  # [stem literal, [(literal, is_prefix), ...]]
+        for kw in self.keywords:
+            literal, is_prefix = kw.rstrip("*"), kw.endswith("*")
+            for group in groups:
+                common = os.path.commonprefix([group[0], literal])
+                if len(common) >= MIN_STEM_LENGTH or common in (group[0], literal):
+                    group[0] = common
+                    group[1].append((literal, is_prefix))
+                    break
+            else:
+                groups.append([literal, [(literal, is_prefix)]])
+
+        stems = []
+        for literal, members in groups:
+            stem = _Stem(literal)
+            for member, is_prefix in members:
+                stem.add(member[len(literal):], is_prefix)
+            stems.append(stem)
+        return stems
+
+    def metadata_matches(self, metadata: Optional[Dict[str, Any]]) -> bool:
+        if not self.metadata:
+            return True
+        if not metadata:
+            return False
+        for field, conditions in self.metadata.items():
+            if field not in metadata:
+                return False
+            for op, expected in conditions.items():
+                try:
+                    if not _OPERATORS[op](metadata[field], expected):
+                        return False
+                except TypeError:
+                    return False
+        return True
+
+    def describe(self) -> Dict[str, Any]:
+        return {"name": self.name, "backend": self.backend, "keywords": self.keywords, "metadata": self.metadata}
+
+
+_WORD_TAIL = re.compile(r"\w*")
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class _Stem:
+    """One literal to search for, plus which word tails after it count as a match"""
+
+    __slots__ = ("literal", "exact_tails", "prefix_tails", "any_tail")
+
+    def __init__(self, literal: str):
+        self.literal = literal
+        self.exact_tails: set = set()
+        self.prefix_tails: tuple = ()
+        self.any_tail = False
+
+    def add(self, tail: str, is_prefix: bool):
+        if is_prefix:
+            self.prefix_tails += (tail,)
+            self.any_tail = self.any_tail or tail == ""
+        else:
+            self.exact_tails.add(tail)
+
+    def find(self, text: str) -> Optional[str]:
+        """First whole-word match in lowercased text, or None
+
+        str.find runs the literal search in C; Python only looks at the
+        (rare) candidate positions to check word boundaries.
+        """
+        literal, size = self.literal, len(self.literal)
+        start = text.find(literal)
+        while start != -1:
+            if start == 0 or not _is_word_char(text[start - 1]):
+                tail = _WORD_TAIL.match(text, start + size).group(0)
+                if self.any_tail or tail in self.exact_tails or (
+                        self.prefix_tails and tail.startswith(self.prefix_tails)):
+                    return literal + tail
+            start = text.find(literal, start + 1)
+        return None
+
+
+class RouteDecision:
+    """Chosen backend plus the rule (and keyword) that selected it"""
+
+    __slots__ = ("backend", "rule", "keyword", "rerouted_from")
+
+    def __init__(self, backend: str, rule: str, keyword: Optional[str] = None,
+                 rerouted_from: Optional[str] = None):
+        self.backend = backend
+        self.rule = rule
+        self.keyword = keyword
+        # Backend the rule picked, when adaptive routing chose another
+        self.rerouted_from = rerouted_from
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"backend": self.backend, "rule": self.rule, "keyword": self.keyword,
+                "rerouted_from": self.rerouted_from}
+
+
+class RoutingEngine:
+    """Compiled rule set with optional hot reload from a JSON file"""
+
+    def __init__(self, spec: Optional[Dict[str, Any]] = None, path: str = ROUTING_RULES_PATH,
+                 reload_interval: float = ROUTING_RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.loaded_mtime: Optional[float] = None
+        self.failed_mtime: Optional[float] = None
+        self.next_reload_check = 0.0
+        self.reloads = 0
+        self.reload_errors = 0
+        self.matches: Dict[str, int] = {}
+        if path:
+            self.reload(force=True)
+        else:
+            self.compile(spec or DEFAULT_RULES)
+
+    def compile(self, spec: Dict[str, Any]):
+        """Validate a rule spec and swap it in atomically"""
+        rules = [RoutingRule(index, rule) for index, rule in enumerate(spec.get("rules", []))]
+        default = spec.get("default", DEFAULT_RULES["default"])
+        self.rules, self.default = rules, default
+        self.stems = {rule.index: rule.stems() for rule in rules if rule.keywords}
+        for name in [rule.name for rule in rules] + [default["name"]]:
+            self.matches.setdefault(name, 0)
+
+    def reload(self, force: bool = False) -> bool:
+        """Re-read the rules file if it changed; keeps the old rules on error"""
+        if not self.path:
+            return False
+        mtime = None
+        try:
+            mtime = os.stat(self.path).st_mtime
+            if not force and mtime in (self.loaded_mtime, self.failed_mtime):
+                return False
+            with open(self.path) as f:
+                spec = json.load(f)
+            self.compile(spec)
+        except Exception as e:
+            self.reload_errors += 1
+            self.failed_mtime = mtime
+            if force and self.loaded_mtime is None:
+                logger.warning("Could not load routing rules from %s (%s); using defaults", self.path, e)
+                self.compile(DEFAULT_RULES)
+            else:
+                logger.warning("Could not reload routing rules from %s: %s", self.path, e)
+            return False
+        self.loaded_mtime = mtime
+        self.reloads += 1
+        logger.info("Loaded %d routing rules from %s", len(self.rules), self.path)
+        return True
+
+    def _maybe_reload(self):
+        if not self.path:
+            return
+        now = time.monotonic()
+        if now >= self.next_reload_check:
+            self.next_reload_check = now + self.reload_interval
+            self.reload()
+
+    def route(self, content: str, metadata: Optional[Dict[str, Any]] = None) -> RouteDecision:
+        """Pick the backend for a memory add"""
+        self._maybe_reload()
+        text = None
+        for rule in self.rules:
+            keyword = None
+            if rule.keywords:
+                if not rule.metadata_matches(metadata):
+                    continue
+                if text is None:
+                    # Lowercase once per call, only if a keyword rule is reached
+                    text = content.lower()
+                for stem in self.stems[rule.index]:
+                    keyword = stem.find(text)
+                    if keyword is not None:
+                        break
+                if keyword is None:
+                    continue
+            elif not rule.metadata_matches(metadata):
+                continue
+            self.matches[rule.name] = self.matches.get(rule.name, 0) + 1
+            return RouteDecision(rule.backend, rule.name, keyword)
+        name = self.default["name"]
+        self.matches[name] = self.matches.get(name, 0) + 1
+        return RouteDecision(self.default["backend"], name)
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "source": self.path or "builtin",
+            "rules": [rule.describe() for rule in self.rules],
+            "default": self.default,
+            "matches": self.matches,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+        }
+
+
+class BackendScore:
+    """EWMA latency and error rate of memory adds to one backend"""
+
+    __slots__ = ("latency", "error_rate", "samples", "errors", "routed", "rerouted_to", "updated_at")
+
+    def __init__(self):
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.samples = 0
+        self.errors = 0
+        self.routed = 0
+        self.rerouted_to = 0
+        self.updated_at: Optional[float] = None
+
+    def observe(self, seconds: float, errors: int, count: int, alpha: float):
+        """One upstream call carrying `count` adds, `errors` of which failed"""
+        self.latency = seconds if self.latency is None else self.latency + alpha * (seconds - self.latency)
+        self.error_rate += alpha * (errors / count - self.error_rate)
+        self.samples += 1
+        self.errors += errors
+        self.updated_at = time.monotonic()
+
+    def score(self) -> Optional[float]:
+        """Expected seconds per successful add (lower is better)"""
+        if self.latency is None:
+            return None
+        return self.latency / max(0.01, 1.0 - self.error_rate)
+
+
+class AdaptiveSelector:
+    """Reroutes eligible memory adds to the fastest healthy backend
+
+    Only decisions from rules in `rules` (by default just the fallback
+    rule, whose backend choice carries no meaning) are candidates, and only
+    among `backends`. A decision moves when its backend is unhealthy or
+    scores worse than the best healthy one by more than `margin`. Each
+    backend is probed `min_samples` times first, and a small `explore`
+    share of eligible adds goes to a random candidate afterwards, so
+    backends that lost traffic keep being measured and can win it back.
+    """
+
+    def __init__(self, backends: Optional[List[str]] = None, rules: Optional[List[str]] = None,
+                 alpha: float = ADAPTIVE_ALPHA, margin: float = ADAPTIVE_MARGIN,
+                 max_error_rate: float = ADAPTIVE_MAX_ERROR_RATE, explore: float = ADAPTIVE_EXPLORE,
+                 min_samples: int = ADAPTIVE_MIN_SAMPLES):
+        self.backends = list(ADAPTIVE_BACKENDS if backends is None else backends)
+        self.rules = set(ADAPTIVE_RULES if rules is None else rules)
+        self.alpha = alpha
+        self.margin = margin
+        self.max_error_rate = max_error_rate
+        self.explore = explore
+        self.min_samples = min_samples
+        self.scores: Dict[str, BackendScore] = {backend: BackendScore() for backend in self.backends}
+        self.rerouted = 0
+        self.explored = 0
+
+    def observe(self, backend: str, seconds: float, errors: int = 0, count: int = 1):
+        score = self.scores.get(backend)
+        if score is not None and count:
+            score.observe(seconds, errors, count, self.alpha)
+
+    def _healthy(self, score: BackendScore) -> bool:
+        return score.samples >= self.min_samples and score.error_rate <= self.max_error_rate
+
+    def select(self, decision: RouteDecision) -> RouteDecision:
+        preferred = self.scores.get(decision.backend)
+        if preferred is None or decision.rule not in self.rules:
+            return decision
+        choice = decision.backend
+        # Backends never tried yet get `min_samples` probes before scores count
+        cold = [name for name, score in self.scores.items() if score.routed < self.min_samples]
+        if cold or (self.explore and random.random() < self.explore):
+            choice = cold[0] if cold else random.choice(self.backends)
+            self.explored += 1
+        elif preferred.samples >= self.min_samples:
+            best_name, best = None, None
+            for name, score in self.scores.items():
+                if self._healthy(score) and (best is None or score.score() < best.score()):
+                    best_name, best = name, score
+            if best is not None and (not self._healthy(preferred) or preferred.score() > best.score() * self.margin):
+                choice = best_name
+        self.scores[choice].routed += 1
+        if choice == decision.backend:
+            return decision
+        self.scores[choice].rerouted_to += 1
+        self.rerouted += 1
+        return RouteDecision(choice, decision.rule, decision.keyword, rerouted_from=decision.backend)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic()
+        return {
+            name: {
+                "latency_ms": round(score.latency * 1000, 2) if score.latency is not None else None,
+                "error_rate": round(score.error_rate, 4),
+                "score_ms": round(score.score() * 1000, 2) if score.latency is not None else None,
+                "healthy": self._healthy(score),
+                "samples": score.samples,
+                "errors": score.errors,
+                "routed": score.routed,
+                "rerouted_to": score.rerouted_to,
+                "age_seconds": round(now - score.updated_at, 1) if score.updated_at is not None else None,
+            }
+            for name, score in self.scores.items()
+        }
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "rules": sorted(self.rules),
+            "backends": self.backends,
+            "alpha": self.alpha,
+            "margin": self.margin,
+            "max_error_rate": self.max_error_rate,
+            "explore": self.explore,
+            "min_samples": self.min_samples,
+            "rerouted": self.rerouted,
+            "explored": self.explored,
+            "scores": self.stats(),
+        }
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - WebSocket Sessions
+Pipelined memory/skill operations multiplexed over one connection, answered
+out of order by request id, with bounded in-flight work per session
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Set
+
+from fastapi import HTTPException, WebSocket
+from pydantic import ValidationError
+from starlette.responses import Response
+from starlette.websockets import WebSocketDisconnect
+
+from admission import RateLimited
+from proxy import RawJSON, dumps, loads
+from resilience import UpstreamError
+
+logger = logging.getLogger("apex.sessions")
+
+# Operations a session runs at once; further frames wait unread
+WS_MAX_INFLIGHT = int(os.getenv("APEX_WS_MAX_INFLIGHT", "64"))
+# Replies queued for a slow reader before operations stop completing
+WS_SEND_QUEUE = int(os.getenv("APEX_WS_SEND_QUEUE", "256"))
+
+# handler(data, caller key) -> dict, RawJSON or a JSON Response
+Handler = Callable[[Dict[str, Any], str], Awaitable[Any]]
+
+
+def _error(request_id: Any, status: int, detail: Any, **extra: Any) -> bytes:
+    return dumps({"id": request_id, "ok": False, "status": status, "error": detail, **extra})
+
+
+def _reply(request_id: Any, result: Any) -> bytes:
+    """Success frame; upstream bodies kept as bytes are spliced in unparsed"""
+    if isinstance(result, RawJSON):
+        status, body = result.status_code, result.body
+    elif isinstance(result, Response):
+        status, body = result.status_code, result.body
+    else:
+        return dumps({"id": request_id, "ok": True, "status": 200, "result": result})
+    return b'{"id":' + dumps(request_id) + b',"ok":true,"status":' + str(status).encode() + b',"result":' + body + b"}"
+
+
+class _OpStats:
+    __slots__ = ("count", "errors", "seconds", "inflight")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.inflight = 0
+
+
+class SessionHub:
+    """Serves `/api/v1/ws` sessions against registered operation handlers
+
+    Clients send `{"id": ..., "op": ..., "data": {...}}` frames and may
+    pipeline as many as they like; each reply carries the request's id and
+    is sent as soon as its operation finishes. Backpressure: a session runs
+    at most `max_inflight` operations, and an operation's slot is freed
+    only once its reply fits in the `send_queue`, so a client that stops
+    reading soon stops being read from.
+    """
+
+    def __init__(self, max_inflight: int = WS_MAX_INFLIGHT, send_queue: int = WS_SEND_QUEUE):
+        self.max_inflight = max_inflight
+        self.send_queue = send_queue
+        self.handlers: Dict[str, Handler] = {}
+        self.ops: Dict[str, _OpStats] = {}
+        self.sessions_active = 0
+        self.sessions_total = 0
+        self.frames_in = 0
+        self.frames_out = 0
+        self.bad_frames = 0
+        self.backpressure_waits = 0
+        self.dropped_sessions = 0
+        self.register("ping", self._ping)
+
+    def register(self, op: str, handler: Handler):
+        self.handlers[op] = handler
+        self.ops[op] = _OpStats()
+
+    @staticmethod
+    async def _ping(data: Dict[str, Any], caller: str) -> Dict[str, Any]:
+        return {"pong": time.time()}
+
+    async def _run(self, request_id: Any, op: str, data: Dict[str, Any], caller: str) -> bytes:
+        stats = self.ops.get(op)
+        if stats is None:
+            return _error(request_id, 404, f"Unknown op '{op}'")
+        stats.count += 1
+        stats.inflight += 1
+        started = time.perf_counter()
+        try:
+            return _reply(request_id, await self.handlers[op](data, caller))
+        except HTTPException as e:
+            stats.errors += 1
+            return _error(request_id, e.status_code, e.detail)
+        except RateLimited as e:
+            stats.errors += 1
+            return _error(request_id, e.status_code, str(e), retry_after=round(e.retry_after, 2))
+        except UpstreamError as e:
+            stats.errors += 1
+            return _error(request_id, e.status_code, e.detail, service=e.service)
+        except ValidationError as e:
+            stats.errors += 1
+            return _error(request_id, 422, e.errors(include_url=False))
+        except Exception:
+            stats.errors += 1
+            logger.exception("WebSocket op %s failed", op)
+            return _error(request_id, 500, f"{op} failed")
+        finally:
+            stats.inflight -= 1
+            stats.seconds += time.perf_counter() - started
+
+    async def serve(self, websocket: WebSocket, caller: str):
+        """Run one session until the client disconnects"""
+        await websocket.accept()
+        self.sessions_active += 1
+        self.sessions_total += 1
+        outbox: "asyncio.Queue[bytes]" = asyncio.Queue(self.send_queue)
+        slots = asyncio.Semaphore(self.max_inflight)
+        tasks: Set[asyncio.Task] = set()
+        closed = False
+
+        async def write():
+            while True:
+                frame = await outbox.get()
+                await websocket.send_text(frame.decode("utf-8"))
+                self.frames_out += 1
+
+        async def run(request_id: Any, op: str, data: Dict[str, Any]):
+            try:
+                frame = await self._run(request_id, op, data, caller)
+                if not closed:
+                    await outbox.put(frame)
+            finally:
+                slots.release()
+
+        writer = asyncio.create_task(write())
+        try:
+            while True:
+                # Read the next frame only while it could run; a full
+                # session leaves it in the socket buffer
+                if slots.locked():
+                    self.backpressure_waits += 1
+                await slots.acquire()
+                receive = asyncio.ensure_future(websocket.receive())
+                done, _ = await asyncio.wait({receive, writer}, return_when=asyncio.FIRST_COMPLETED)
+                if receive not in done:
+                    # Writer died (client gone mid-send)
+                    receive.cancel()
+                    slots.release()
+                    break
+                message = receive.result()
+                if message["type"] == "websocket.disconnect":
+                    slots.release()
+                    break
+                self.frames_in += 1
+                frame = None
+                try:
+                    frame = loads(message.get("text") or message.get("bytes") or b"")
+                    request_id, op = frame.get("id"), frame["op"]
+                    data = frame.get("data") or {}
+                    if not isinstance(data, dict):
+                        raise TypeError("data must be an object")
+                except (ValueError, TypeError, KeyError, AttributeError) as e:
+                    self.bad_frames += 1
+                    slots.release()
+                    try:
+                        # Never block the reader: a full outbox means the
+                        # client has stopped reading, so end the session
+                        outbox.put_nowait(_error(frame.get("id") if isinstance(frame, dict) else None, 400,
+                                                 f"Bad frame: {e}"))
+                    except asyncio.QueueFull:
+                        # Returning closes the socket; a close frame could
+                        # itself wait forever on a client that never reads
+                        self.dropped_sessions += 1
+                        break
+                    continue
+                task = asyncio.create_task(run(request_id, op, data))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            closed = True
+            self.sessions_active -= 1
+            writer.cancel()
+            await asyncio.gather(writer, return_exceptions=True)
+            # Operations already started finish (an add may be half way
+            # upstream); their replies have nowhere to go, so keep the
+            # outbox empty for any that are blocked queueing one
+            while tasks:
+                while not outbox.empty():
+                    outbox.get_nowait()
+                await asyncio.wait(set(tasks), timeout=0.05)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions_active": self.sessions_active,
+            "sessions_total": self.sessions_total,
+            "frames_in": self.frames_in,
+            "frames_out": self.frames_out,
+            "bad_frames": self.bad_frames,
+            "backpressure_waits": self.backpressure_waits,
+            "dropped_sessions": self.dropped_sessions,
+            "max_inflight": self.max_inflight,
+            "send_queue": self.send_queue,
+            "ops": {
+                op: {
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "inflight": stats.inflight,
+                    "avg_ms": round(stats.seconds / stats.count * 1000, 3) if stats.count else None,
+                }
+                for op, stats in self.ops.items()
+            },
+        }
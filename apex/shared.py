@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Cross-Worker Shared State
+mmap-backed key/value table shared by every gateway worker process, used
+for search cache entries, rate-limit buckets and health snapshots
+"""
+
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+logger = logging.getLogger("apex.shared")
+
+GATEWAY_WORKERS = int(os.getenv("APEX_WORKERS", "1"))
+# auto: on whenever more than one worker serves the gateway
+SHARED_STATE = os.getenv("APEX_SHARED_STATE", "auto")  # auto | on | off
+SHARED_STATE_PATH = os.getenv(
+    "APEX_SHARED_STATE_PATH",
+    os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "apex-gateway.state")
+)
+SHARED_STATE_SLOTS = int(os.getenv("APEX_SHARED_STATE_SLOTS", "16384"))
+SHARED_STATE_SLOT_BYTES = int(os.getenv("APEX_SHARED_STATE_SLOT_KB", "8")) * 1024
+
+_MAGIC = b"APEXSHM1"
+_HEADER = struct.Struct("<8sII")           # magic, slots, slot size
+_HEADER_BYTES = 64
+_SLOT = struct.Struct("<BxHIdQ")           # state, key length, value length, expires_at, key hash
+_EMPTY, _USED = 0, 1
+# Slots are grouped into small sets; a key lives in one set, locked as a unit
+WAYS = 8
+MAX_KEY_BYTES = 256
+
+T = TypeVar("T")
+
+
+def shared_state_enabled() -> bool:
+    if SHARED_STATE == "auto":
+        return GATEWAY_WORKERS > 1
+    return SHARED_STATE in ("1", "on", "true", "yes")
+
+
+def _key_hash(key: bytes) -> int:
+    # Stable across processes, unlike hash()
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+class SharedTable:
+    """Set-associative table in a memory-mapped file
+
+    Every worker maps the same file. A key hashes to one set of `WAYS`
+    slots, guarded by a POSIX byte-range lock on that set, so operations
+    on different sets never contend. A full set evicts its entry closest
+    to expiry. Values larger than a slot are refused (`set` returns False).
+    """
+
+    def __init__(self, path: str = SHARED_STATE_PATH, slots: int = SHARED_STATE_SLOTS,
+                 slot_bytes: int = SHARED_STATE_SLOT_BYTES):
+        self.path = path
+        self.sets = max(1, slots // WAYS)
+        self.slots = self.sets * WAYS
+        self.slot_bytes = slot_bytes
+        self.capacity = slot_bytes - _SLOT.size - MAX_KEY_BYTES
+        size = _HEADER_BYTES + self.slots * slot_bytes
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        # Whole-file lock while the first worker sizes and stamps the table
+        fcntl.lockf(self.fd, fcntl.LOCK_EX, _HEADER_BYTES, 0)
+        try:
+            header = os.pread(self.fd, _HEADER.size, 0)
+            expected = _HEADER.pack(_MAGIC, self.slots, slot_bytes)
+            if header != expected:
+                os.ftruncate(self.fd, 0)
+                os.ftruncate(self.fd, size)
+                os.pwrite(self.fd, expected, 0)
+        finally:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, _HEADER_BYTES, 0)
+        self.map = mmap.mmap(self.fd, size)
+        self.evictions = 0
+        self.refused = 0
+
+    # ---------- locking ----------
+
+    def _lock(self, index: int):
+        # Lock ranges sit past the header, one byte per set
+        fcntl.lockf(self.fd, fcntl.LOCK_EX, 1, _HEADER_BYTES + index)
+
+    def _unlock(self, index: int):
+        fcntl.lockf(self.fd, fcntl.LOCK_UN, 1, _HEADER_BYTES + index)
+
+    # ---------- slot access (caller holds the set lock) ----------
+
+    def _offset(self, set_index: int, way: int) -> int:
+        return _HEADER_BYTES + (set_index * WAYS + way) * self.slot_bytes
+
+    def _find(self, set_index: int, key: bytes, key_hash: int, now: float) -> Tuple[Optional[int], Optional[int]]:
+        """(way holding key, best way to write a new entry into)"""
+        free, oldest, oldest_expiry = None, None, 0.0
+        for way in range(WAYS):
+            offset = self._offset(set_index, way)
+            state, key_len, _, expires_at, slot_hash = _SLOT.unpack_from(self.map, offset)
+            if state != _USED or (expires_at and expires_at <= now):
+                if free is None:
+                    free = way
+                continue
+            if slot_hash == key_hash:
+                start = offset + _SLOT.size
+                if self.map[start:start + key_len] == key:
+                    return way, way
+            # Entries without a TTL are evicted last
+            expiry = expires_at or float("inf")
+            if oldest is None or expiry < oldest_expiry:
+                oldest, oldest_expiry = way, expiry
+        return None, free if free is not None else oldest
+
+    def _read(self, set_index: int, way: int) -> bytes:
+        offset = self._offset(set_index, way)
+        _, key_len, value_len, _, _ = _SLOT.unpack_from(self.map, offset)
+        start = offset + _SLOT.size + MAX_KEY_BYTES
+        return self.map[start:start + value_len]
+
+    def _write(self, set_index: int, way: int, key: bytes, key_hash: int, value: bytes, ttl: Optional[float], now: float):
+        offset = self._offset(set_index, way)
+        state, _, _, expires_at, slot_hash = _SLOT.unpack_from(self.map, offset)
+        if state == _USED and slot_hash != key_hash and (expires_at == 0 or expires_at > now):
+            self.evictions += 1
+        start = offset + _SLOT.size
+        self.map[start:start + len(key)] = key
+        self.map[start + MAX_KEY_BYTES:start + MAX_KEY_BYTES + len(value)] = value
+        _SLOT.pack_into(self.map, offset, _USED, len(key), len(value), now + ttl if ttl else 0.0, key_hash)
+
+    # ---------- public API ----------
+
+    def _locate(self, key: str) -> Tuple[bytes, int, int]:
+        raw = key.encode("utf-8")
+        if len(raw) > MAX_KEY_BYTES:
+            # Long keys are stored by digest
+            raw = hashlib.sha1(raw).hexdigest().encode("ascii")
+        key_hash = _key_hash(raw)
+        return raw, key_hash, key_hash % self.sets
+
+    def get(self, key: str) -> Optional[bytes]:
+        raw, key_hash, set_index = self._locate(key)
+        self._lock(set_index)
+        try:
+            way, _ = self._find(set_index, raw, key_hash, time.time())
+            return self._read(set_index, way) if way is not None else None
+        finally:
+            self._unlock(set_index)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        if len(value) > self.capacity:
+            self.refused += 1
+            return False
+        raw, key_hash, set_index = self._locate(key)
+        self._lock(set_index)
+        try:
+            now = time.time()
+            _, way = self._find(set_index, raw, key_hash, now)
+            self._write(set_index, way, raw, key_hash, value, ttl, now)
+            return True
+        finally:
+            self._unlock(set_index)
+
+    def update(self, key: str, fn: Callable[[Optional[bytes]], Tuple[bytes, T]], ttl: Optional[float] = None) -> T:
+        """Atomic read-modify-write: `fn(current)` returns (new value, result)"""
+        raw, key_hash, set_index = self._locate(key)
+        self._lock(set_index)
+        try:
+            now = time.time()
+            found, way = self._find(set_index, raw, key_hash, now)
+            value, result = fn(self._read(set_index, found) if found is not None else None)
+            if len(value) > self.capacity:
+                raise ValueError(f"Shared value for {key!r} exceeds {self.capacity} bytes")
+            self._write(set_index, way, raw, key_hash, value, ttl, now)
+            return result
+        finally:
+            self._unlock(set_index)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        used = 0
+        for index in range(self.slots):
+            state, _, _, expires_at, _ = _SLOT.unpack_from(self.map, _HEADER_BYTES + index * self.slot_bytes)
+            if state == _USED and (expires_at == 0 or expires_at > now):
+                used += 1
+        return {
+            "path": self.path,
+            "slots": self.slots,
+            "slot_bytes": self.slot_bytes,
+            "used": used,
+            "evictions": self.evictions,
+            "refused_too_large": self.refused,
+        }
+
+    def close(self):
+        self.map.close()
+        os.close(self.fd)
+
+
+_table: Optional[SharedTable] = None
+
+
+def shared_table() -> Optional[SharedTable]:
+    """This process's mapping of the shared table, or None when disabled"""
+    global _table
+    if _table is None and shared_state_enabled():
+        _table = SharedTable()
+        logger.info("Shared worker state at %s (%d slots)", _table.path, _table.slots)
+    return _table
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Request Coalescing (single-flight)
+Identical in-flight gateway calls share one upstream request
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from typing import Any, Awaitable, Callable, Dict
+
+# Routes coalesced by default; skills are excluded since they may have side effects
+SINGLEFLIGHT_ROUTES = os.getenv("APEX_SINGLEFLIGHT_ROUTES", "forensic_analyze,memory_search")
+
+
+def digest(value: Any) -> str:
+    """Short stable hash of a JSON-able value, for building keys"""
+    raw = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Per-route coalescing of identical concurrent calls
+
+    The first caller for a key (the leader) starts the upstream call in its
+    own task; later callers with the same key await that task instead of
+    issuing their own. Running it as a task means a leader whose client
+    disconnects does not cancel the call for everyone else.
+    """
+
+    def __init__(self, enabled_routes: str = SINGLEFLIGHT_ROUTES):
+        self.enabled = {route.strip() for route in enabled_routes.split(",") if route.strip()}
+        self.key_fns: Dict[str, Callable[..., str]] = {}
+        self.inflight: Dict[str, asyncio.Task] = {}
+        self.leaders: Dict[str, int] = {}
+        self.coalesced: Dict[str, int] = {}
+
+    def register(self, route: str, key_fn: Callable[..., str]):
+        """Declare a coalescible route and how to derive its key"""
+        self.key_fns[route] = key_fn
+        self.leaders[route] = 0
+        self.coalesced[route] = 0
+
+    async def run(self, route: str, fn: Callable[[], Awaitable[Any]], *key_args: Any) -> Any:
+        """Await `fn()`, sharing it with identical in-flight calls on `route`"""
+        if route not in self.enabled:
+            return await fn()
+
+        key = f"{route}:{self.key_fns[route](*key_args)}"
+        task = self.inflight.get(key)
+        if task is None:
+            self.leaders[route] += 1
+            task = asyncio.ensure_future(fn())
+            self.inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.coalesced[route] += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        self.inflight.pop(key, None)
+        # Mark the error as retrieved even if every waiter has gone away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {}
+        for route in self.key_fns:
+            inflight = sum(1 for key in self.inflight if key.startswith(f"{route}:"))
+            stats[route] = {
+                "enabled": route in self.enabled,
+                "upstream_calls": self.leaders[route],
+                "coalesced": self.coalesced[route],
+                "inflight_keys": inflight,
+            }
+        return stats
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Streaming Memory Search
+Per-source search fan-out that emits each backend's results as it answers
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from proxy import dumps
+from resilience import Resilience, UpstreamTimeout
+
+SOURCE_DEADLINE = float(os.getenv("APEX_SEARCH_SOURCE_DEADLINE_MS", "3000")) / 1000
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+
+async def _search_source(upstream: Resilience, source: str, payload: Dict[str, Any]) -> Any:
+    response = await upstream.request(
+        'memory_nexus', "POST", "/api/memory/search",
+        json={**payload, "sources": [source]},
+        timeout=10.0,
+        hedge=True,
+        adaptive=True
+    )
+    if response.status_code != 200:
+        raise RuntimeError(f"status {response.status_code}")
+    return response.json()
+
+
+async def stream_search(upstream: Resilience, query: str, user_id: str, sources: List[str],
+                        limit: Optional[int], deadline: float = SOURCE_DEADLINE) -> AsyncIterator[Dict[str, Any]]:
+    """Yield one frame per source as it completes, then a final summary frame
+
+    Every source gets its own `deadline` (seconds); a source that misses it is
+    cancelled and listed under `timed_out` in the final frame.
+    """
+    payload = {"query": query, "user_id": user_id, "limit": limit}
+    started = time.perf_counter()
+    queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+    async def run(source: str):
+        source_started = time.perf_counter()
+        try:
+            data = await asyncio.wait_for(_search_source(upstream, source, payload), timeout=deadline)
+            frame = {"type": "result", "source": source, "data": data}
+        except (asyncio.TimeoutError, UpstreamTimeout):
+            frame = {"type": "timeout", "source": source}
+        except Exception as e:
+            frame = {"type": "error", "source": source, "error": str(e) or type(e).__name__}
+        frame["elapsed_ms"] = round((time.perf_counter() - source_started) * 1000, 2)
+        await queue.put(frame)
+
+    tasks = [asyncio.create_task(run(source)) for source in sources]
+    completed, timed_out, failed = [], [], []
+    try:
+        for _ in tasks:
+            frame = await queue.get()
+            if frame["type"] == "result":
+                completed.append(frame["source"])
+            elif frame["type"] == "timeout":
+                timed_out.append(frame["source"])
+            else:
+                failed.append(frame["source"])
+            yield frame
+    finally:
+        # Client went away mid-stream: stop the remaining upstream calls
+        for task in tasks:
+            task.cancel()
+
+    yield {
+        "type": "done",
+        "sources": sources,
+        "completed": completed,
+        "timed_out": timed_out,
+        "failed": failed,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+async def encode_frames(frames: AsyncIterator[Dict[str, Any]], media_type: str) -> AsyncIterator[bytes]:
+    """Serialize frames as NDJSON lines or Server-Sent Events"""
+    async for frame in frames:
+        data = dumps(frame)
+        if media_type == SSE_MEDIA_TYPE:
+            yield b"event: " + frame["type"].encode("utf-8") + b"\ndata: " + data + b"\n\n"
+        else:
+            yield data + b"\n"
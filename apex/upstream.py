@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Upstream Connection Pools
+One long-lived, pooled HTTP client per upstream service
+"""
+
+import logging
+import os
+from typing import Any, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger("apex.upstream")
+
+# Pool defaults (overridable globally or per service, see _env)
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_CONNECT_TIMEOUT = 2.0
+
+
+def _env(service: str, name: str, default: str) -> str:
+    """Resolve APEX_POOL_<SERVICE>_<NAME>, then APEX_POOL_<NAME>, then default"""
+    specific = os.getenv(f"APEX_POOL_{service.upper()}_{name}")
+    if specific is not None:
+        return specific
+    return os.getenv(f"APEX_POOL_{name}", default)
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package (httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class UpstreamPools:
+    """Owns one pooled httpx.AsyncClient per HTTP upstream in CONFIG"""
+
+    def __init__(self, services: Dict[str, str]):
+        # Only HTTP upstreams get a pool (neo4j speaks bolt)
+        self.services = {
+            name: url for name, url in services.items()
+            if url.startswith(("http://", "https://"))
+        }
+        self.clients: Dict[str, httpx.AsyncClient] = {}
+        self.settings: Dict[str, Dict[str, Any]] = {}
+        self.requests_total: Dict[str, int] = {name: 0 for name in self.services}
+
+    def _settings_for(self, service: str) -> Dict[str, Any]:
+        """Pool settings for a single upstream"""
+        http2 = _env(service, "HTTP2", "false").lower() in ("1", "true", "yes")
+        if http2 and not _http2_available():
+            logger.warning("HTTP/2 requested for %s but h2 is not installed; using HTTP/1.1", service)
+            http2 = False
+        return {
+            "max_connections": int(_env(service, "MAX_CONNECTIONS", str(DEFAULT_MAX_CONNECTIONS))),
+            "max_keepalive_connections": int(_env(service, "MAX_KEEPALIVE", str(DEFAULT_MAX_KEEPALIVE))),
+            "keepalive_expiry": float(_env(service, "KEEPALIVE_EXPIRY", str(DEFAULT_KEEPALIVE_EXPIRY))),
+            "connect_timeout": float(_env(service, "CONNECT_TIMEOUT", str(DEFAULT_CONNECT_TIMEOUT))),
+            "http2": http2,
+        }
+
+    async def start(self):
+        """Create the pooled clients (called from the app lifespan)"""
+        for service, url in self.services.items():
+            settings = self._settings_for(service)
+            limits = httpx.Limits(
+                max_connections=settings["max_connections"],
+                max_keepalive_connections=settings["max_keepalive_connections"],
+                keepalive_expiry=settings["keepalive_expiry"],
+            )
+            self.clients[service] = httpx.AsyncClient(
+                base_url=url,
+                limits=limits,
+                http2=settings["http2"],
+                # Per-call timeouts still override the read timeout
+                timeout=httpx.Timeout(10.0, connect=settings["connect_timeout"]),
+                event_hooks={"request": [self._count_request(service)]},
+            )
+            self.settings[service] = settings
+
+    async def close(self):
+        """Close every pooled client (called from the app lifespan)"""
+        for client in self.clients.values():
+            await client.aclose()
+        self.clients.clear()
+
+    def client(self, service: str) -> httpx.AsyncClient:
+        """Pooled client for an upstream; paths are relative to its base URL"""
+        try:
+            return self.clients[service]
+        except KeyError:
+            raise RuntimeError(f"No connection pool for upstream '{service}' (gateway not started?)")
+
+    def _count_request(self, service: str):
+        async def hook(request: httpx.Request):
+            self.requests_total[service] += 1
+        return hook
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-upstream pool usage for sizing the limits"""
+        stats = {}
+        for service, client in self.clients.items():
+            stats[service] = {
+                **self.settings[service],
+                "requests_total": self.requests_total[service],
+                **_pool_usage(client),
+            }
+        return stats
+
+
+def _pool_usage(client: httpx.AsyncClient) -> Dict[str, Optional[int]]:
+    """Inspect the httpcore pool behind a client (best effort)"""
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    if pool is None:
+        return {"connections": None, "active": None, "idle": None, "queued_requests": None}
+    connections = list(pool.connections)
+    idle = sum(1 for conn in connections if conn.is_idle())
+    return {
+        "connections": len(connections),
+        "active": len(connections) - idle,
+        "idle": idle,
+        "queued_requests": sum(
+            1 for request in getattr(pool, "_requests", []) if request.is_queued()
+        ),
+    }
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Memory Add Write-Behind Log
+Local append-only log with group-committed fsync, drained to memory_nexus
+in the background and replayed after a crash
+"""
+
+import asyncio
+import fcntl
+import itertools
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from proxy import dumps, loads
+
+logger = logging.getLogger("apex.wal")
+
+WAL_ENABLED = os.getenv("APEX_WAL_ENABLED", "false").lower() in ("1", "true", "yes")
+WAL_DIR = os.getenv("APEX_WAL_DIR", "/var/lib/apex/wal")
+WAL_FSYNC_INTERVAL = float(os.getenv("APEX_WAL_FSYNC_INTERVAL_MS", "5")) / 1000
+WAL_SEGMENT_BYTES = int(os.getenv("APEX_WAL_SEGMENT_MB", "64")) * 1048576
+WAL_BATCH_SIZE = int(os.getenv("APEX_WAL_BATCH_SIZE", "200"))
+WAL_MAX_ATTEMPTS = int(os.getenv("APEX_WAL_MAX_ATTEMPTS", "20"))
+WAL_RETRY_MAX_DELAY = float(os.getenv("APEX_WAL_RETRY_MAX_DELAY", "30"))
+
+# Provisional id -> outcome, kept for status lookups
+RESOLVED_IDS = 10000
+
+
+class _Segment:
+    __slots__ = ("path", "first_seq", "last_seq")
+
+    def __init__(self, path: Path, first_seq: int, last_seq: int):
+        self.path = path
+        self.first_seq = first_seq
+        self.last_seq = last_seq
+
+
+class WriteBehindLog:
+    """Durably queues memory adds and drains them with `send(record)`
+
+    Appends are acknowledged once fsynced; concurrent appends share one
+    fsync (group commit, at most every `fsync_interval`). Records are
+    delivered at least once: anything past the checkpoint is replayed on
+    start, and carries its provisional id as `idempotency_key`.
+
+    Each gateway worker owns one `worker-N` subdirectory, held with an
+    exclusive lock, so workers never share a log and a restarted worker
+    picks up whichever slot is free, replaying what it holds.
+    """
+
+    def __init__(self, directory: str, send: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                 fsync_interval: float = WAL_FSYNC_INTERVAL, segment_bytes: int = WAL_SEGMENT_BYTES,
+                 batch_size: int = WAL_BATCH_SIZE, max_attempts: int = WAL_MAX_ATTEMPTS,
+                 on_flushed: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+                 on_dead_letter: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None):
+        self.base = Path(directory)
+        self.directory = self.base
+        self.lock_fd: Optional[int] = None
+        self.send = send
+        self.on_flushed = on_flushed
+        self.on_dead_letter = on_dead_letter
+        self.fsync_interval = fsync_interval
+        self.segment_bytes = segment_bytes
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.segments: List[_Segment] = []
+        self.file = None
+        self.active: Optional[_Segment] = None
+        self.active_bytes = 0
+        self.next_seq = 1
+        self.checkpoint = 0
+        self.pending: Deque[Dict[str, Any]] = deque()
+        self.done: Set[int] = set()
+        self.attempts: Dict[int, int] = {}
+        self.resolved: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.wakeup: Optional[asyncio.Event] = None
+        self.sync_waiter: Optional[asyncio.Future] = None
+        self.sync_lock = asyncio.Lock()
+        # Rotated-out segment files, fsynced and closed by the next group commit
+        self.retired: List[Any] = []
+        self.flusher: Optional[asyncio.Task] = None
+        self.appended = 0
+        self.flushed = 0
+        self.replayed = 0
+        self.retries = 0
+        self.dead_lettered = 0
+        self.fsyncs = 0
+        self.sync_failures = 0
+        self.last_error: Optional[str] = None
+
+    # ---------- lifecycle ----------
+
+    async def start(self):
+        """Recover unflushed records, open a fresh segment, start draining"""
+        self.directory = await asyncio.to_thread(self._claim_slot)
+        await asyncio.to_thread(self._recover)
+        self._open_segment()
+        self.wakeup = asyncio.Event()
+        if self.pending:
+            logger.info("Replaying %d unflushed memory adds from %s", len(self.pending), self.directory)
+            self.wakeup.set()
+        self.flusher = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        if self.flusher is not None:
+            self.flusher.cancel()
+            await asyncio.gather(self.flusher, return_exceptions=True)
+        if self.file is not None:
+            async with self.sync_lock:
+                retired, self.retired = self.retired, []
+                await asyncio.to_thread(self._fsync, self.file, retired)
+            self.file.close()
+            self.file = None
+        if self.lock_fd is not None:
+            os.close(self.lock_fd)
+            self.lock_fd = None
+
+    def _claim_slot(self) -> Path:
+        slot = 0
+        while True:
+            directory = self.base / f"worker-{slot}"
+            directory.mkdir(parents=True, exist_ok=True)
+            fd = os.open(directory / "lock", os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                slot += 1
+                continue
+            self.lock_fd = fd
+            return directory
+
+    def _recover(self):
+        checkpoint_path = self.directory / "checkpoint"
+        if checkpoint_path.exists():
+            self.checkpoint = int(checkpoint_path.read_text().strip() or 0)
+        self.next_seq = self.checkpoint + 1
+        for path in sorted(self.directory.glob("wal-*.log")):
+            first_seq = int(path.stem.split("-")[1])
+            last_seq = first_seq - 1
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        record = loads(line)
+                    except ValueError:
+                        # Torn final write from a crash: never acknowledged
+                        logger.warning("Skipping unreadable record in %s", path.name)
+                        continue
+                    last_seq = record["seq"]
+                    if record["seq"] > self.checkpoint:
+                        self.pending.append(record)
+            self.next_seq = max(self.next_seq, last_seq + 1)
+            self.segments.append(_Segment(path, first_seq, last_seq))
+        self.replayed = len(self.pending)
+        self._drop_flushed_segments()
+
+    def _open_segment(self):
+        path = self.directory / f"wal-{self.next_seq:016d}.log"
+        # A recovered segment holding no records has this name already
+        self.segments = [segment for segment in self.segments if segment.path != path]
+        self.file = open(path, "ab")
+        self.active = _Segment(path, self.next_seq, self.next_seq - 1)
+        self.active_bytes = 0
+        self.segments.append(self.active)
+
+    # ---------- append path ----------
+
+    async def append(self, item: Dict[str, Any], backend: str) -> Dict[str, Any]:
+        """Durably queue one add; returns its record (with provisional `id`)
+
+        The record is queued for delivery either way; if the group fsync
+        fails the returned copy carries `"durable": False` (it would not
+        survive a crash), rather than the add reporting a failure while
+        the flusher still delivers it.
+        """
+        record = {
+            "seq": self.next_seq,
+            "id": f"pending_{uuid.uuid4().hex}",
+            "backend": backend,
+            "item": item,
+            "ts": time.time(),
+        }
+        self.next_seq += 1
+        line = dumps(record) + b"\n"
+        self.file.write(line)
+        self.active.last_seq = record["seq"]
+        self.active_bytes += len(line)
+        self.pending.append(record)
+        self.appended += 1
+        self.wakeup.set()
+        try:
+            await self._group_commit()
+        except OSError as e:
+            self.sync_failures += 1
+            self.last_error = f"fsync: {e}"
+            logger.error("WAL fsync failed; %s is queued but not durable: %s", record["id"], e)
+            return {**record, "durable": False}
+        return record
+
+    async def _group_commit(self):
+        if self.sync_waiter is None:
+            self.sync_waiter = asyncio.get_running_loop().create_future()
+            asyncio.create_task(self._sync_after(self.sync_waiter))
+        await asyncio.shield(self.sync_waiter)
+
+    async def _sync_after(self, waiter: asyncio.Future):
+        await asyncio.sleep(self.fsync_interval)
+        async with self.sync_lock:
+            # Appends from here on wait for the next fsync
+            self.sync_waiter = None
+            retired, self.retired = self.retired, []
+            try:
+                await asyncio.to_thread(self._fsync, self.file, retired)
+            except Exception as e:
+                self.retired[:0] = retired
+                waiter.set_exception(e)
+                return
+            waiter.set_result(None)
+            if self.active_bytes >= self.segment_bytes:
+                # Appends made while that fsync ran are in this file and wait
+                # on the next one, which syncs it once more before closing it
+                self.retired.append(self.file)
+                self._open_segment()
+
+    def _fsync(self, file, retired: List[Any]):
+        for old in retired:
+            old.flush()
+            os.fsync(old.fileno())
+        file.flush()
+        os.fsync(file.fileno())
+        for old in retired:
+            old.close()
+        self.fsyncs += 1
+
+    # ---------- drain path ----------
+
+    async def _flush_loop(self):
+        delay = 0.5
+        while True:
+            if not self.pending:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+            try:
+                failed = await self._flush_batch()
+            except Exception:
+                # Keep draining; the records are retried on the next pass
+                logger.exception("WAL flush pass failed")
+                failed = 1
+            if failed:
+                self.retries += failed
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, WAL_RETRY_MAX_DELAY)
+            else:
+                delay = 0.5
+
+    async def _flush_batch(self) -> int:
+        """Send the oldest unflushed records once; returns how many failed"""
+        batch = [record for record in itertools.islice(self.pending, self.batch_size)
+                 if record["seq"] not in self.done]
+        results = await asyncio.gather(*(self.send(record) for record in batch), return_exceptions=True)
+
+        failed = 0
+        for record, result in zip(batch, results):
+            if isinstance(result, Exception):
+                failed += 1
+                self.last_error = str(result) or type(result).__name__
+                self.attempts[record["seq"]] = self.attempts.get(record["seq"], 0) + 1
+                if self.attempts[record["seq"]] < self.max_attempts:
+                    continue
+                await asyncio.to_thread(self._dead_letter, record, self.last_error)
+                self._resolve(record, {"status": "failed", "error": self.last_error})
+                callback = self.on_dead_letter
+            else:
+                self.flushed += 1
+                self._resolve(record, {"status": "written", "memory_id": result.get("memory_id")})
+                callback = self.on_flushed
+            # Settled before the callback runs, so a failing callback cannot resend it
+            self.done.add(record["seq"])
+            self.attempts.pop(record["seq"], None)
+            if callback is not None:
+                await callback(record)
+
+        await self._advance_checkpoint()
+        return failed
+
+    def _resolve(self, record: Dict[str, Any], outcome: Dict[str, Any]):
+        self.resolved[record["id"]] = outcome
+        while len(self.resolved) > RESOLVED_IDS:
+            self.resolved.popitem(last=False)
+
+    def _dead_letter(self, record: Dict[str, Any], error: str):
+        self.dead_lettered += 1
+        logger.error("Giving up on memory add %s after %d attempts: %s", record["id"], self.max_attempts, error)
+        with open(self.directory / "dead-letter.ndjson", "ab") as f:
+            f.write(dumps({**record, "error": error}) + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def _advance_checkpoint(self):
+        advanced = False
+        while self.pending and self.pending[0]["seq"] in self.done:
+            self.done.discard(self.pending[0]["seq"])
+            self.checkpoint = self.pending.popleft()["seq"]
+            advanced = True
+        if advanced:
+            await asyncio.to_thread(self._write_checkpoint)
+
+    def _write_checkpoint(self):
+        tmp = self.directory / "checkpoint.tmp"
+        with open(tmp, "w") as f:
+            f.write(str(self.checkpoint))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.directory / "checkpoint")
+        self._drop_flushed_segments()
+
+    def _drop_flushed_segments(self):
+        for segment in list(self.segments):
+            if segment is not self.active and segment.last_seq <= self.checkpoint:
+                segment.path.unlink(missing_ok=True)
+                self.segments.remove(segment)
+
+    # ---------- introspection ----------
+
+    def status(self, provisional_id: str) -> Optional[Dict[str, Any]]:
+        if provisional_id in self.resolved:
+            return self.resolved[provisional_id]
+        for record in self.pending:
+            if record["id"] == provisional_id:
+                return {"status": "pending", "attempts": self.attempts.get(record["seq"], 0)}
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        oldest = self.pending[0]["ts"] if self.pending else None
+        log_bytes = 0
+        for segment in self.segments:
+            try:
+                log_bytes += segment.path.stat().st_size
+            except OSError:
+                pass
+        return {
+            "directory": str(self.directory),
+            "pending": len(self.pending),
+            "lag_seconds": round(time.time() - oldest, 3) if oldest else 0.0,
+            "log_bytes": log_bytes,
+            "segments": len(self.segments),
+            "checkpoint_seq": self.checkpoint,
+            "next_seq": self.next_seq,
+            "appended": self.appended,
+            "flushed": self.flushed,
+            "replayed_on_start": self.replayed,
+            "retries": self.retries,
+            "dead_lettered": self.dead_lettered,
+            "fsyncs": self.fsyncs,
+            "sync_failures": self.sync_failures,
+            "avg_appends_per_fsync": round(self.appended / self.fsyncs, 2) if self.fsyncs else None,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Startup Warm-Up and Readiness
+Resolves and caches upstream addresses, opens warm pooled connections, and
+gates /ready until the gateway can serve without cold-start penalties
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpcore
+
+from upstream import UpstreamPools
+
+logger = logging.getLogger("apex.warmup")
+
+# Taken when api.py first imports this module
+IMPORTED_AT = time.monotonic()
+
+PREWARM_CONNECTIONS = int(os.getenv("APEX_PREWARM_CONNECTIONS", "2"))
+PREWARM_TIMEOUT = float(os.getenv("APEX_PREWARM_TIMEOUT", "10"))
+# Upstreams that must be warm before /ready passes; the rest are best effort
+READY_REQUIRES = [name for name in os.getenv("APEX_READY_REQUIRES", "memory_nexus").split(",") if name]
+DNS_CACHE_TTL = float(os.getenv("APEX_DNS_CACHE_TTL", "60"))
+
+
+class DNSCache:
+    """getaddrinfo results per host, reused until `ttl` expires"""
+
+    def __init__(self, ttl: float = DNS_CACHE_TTL):
+        self.ttl = ttl
+        self.entries: Dict[str, Tuple[float, List[str]]] = {}
+        self.hits = 0
+        self.lookups = 0
+
+    async def resolve(self, host: str, port: int) -> List[str]:
+        entry = self.entries.get(host)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        self.lookups += 1
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self.entries[host] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    def forget(self, host: str):
+        self.entries.pop(host, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hosts": len(self.entries), "hits": self.hits, "lookups": self.lookups, "ttl_seconds": self.ttl}
+
+
+class CachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """httpcore network backend that connects to DNSCache addresses
+
+    TLS still verifies against the original hostname: httpcore passes the
+    request's host as server_hostname to start_tls, not the address.
+    """
+
+    def __init__(self, cache: DNSCache, backend: Optional[httpcore.AsyncNetworkBackend] = None):
+        self.cache = cache
+        self.backend = backend or httpcore.AnyIOBackend()
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        try:
+            addresses = await self.cache.resolve(host, port)
+        except OSError:
+            addresses = [host]
+        for address in addresses[:-1]:
+            try:
+                return await self.backend.connect_tcp(address, port, timeout, local_address, socket_options)
+            except httpcore.ConnectError:
+                continue
+        try:
+            return await self.backend.connect_tcp(addresses[-1], port, timeout, local_address, socket_options)
+        except httpcore.ConnectError:
+            # The host may have moved; look it up again next time
+            self.cache.forget(host)
+            raise
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self.backend.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds):
+        await self.backend.sleep(seconds)
+
+
+def install_dns_cache(pools: UpstreamPools, cache: DNSCache):
+    """Route every pooled client's new connections through the cache (best effort)"""
+    for service, client in pools.clients.items():
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        if pool is None or not hasattr(pool, "_network_backend"):
+            logger.warning("Cannot install DNS cache for %s; using the system resolver", service)
+            continue
+        pool._network_backend = CachingNetworkBackend(cache, pool._network_backend)
+
+
+class Warmup:
+    """Startup phase: resolve upstreams, open warm connections, then go ready"""
+
+    def __init__(self, pools: UpstreamPools, connections: int = PREWARM_CONNECTIONS,
+                 requires: Optional[List[str]] = None, timeout: float = PREWARM_TIMEOUT,
+                 dns_cache: Optional[DNSCache] = None):
+        self.pools = pools
+        self.connections = connections
+        self.requires = [service for service in (READY_REQUIRES if requires is None else requires)
+                         if service in pools.services]
+        self.timeout = timeout
+        self.dns_cache = dns_cache or DNSCache()
+        self.upstreams: Dict[str, Dict[str, Any]] = {}
+        self.phase = "starting"
+        self.ready_at: Optional[float] = None
+        self.attempts = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_at is not None
+
+    async def _warm(self, service: str) -> Dict[str, Any]:
+        url = urlsplit(self.pools.services[service])
+        host, port = url.hostname, url.port or (443 if url.scheme == "https" else 80)
+        result: Dict[str, Any] = {"connections": 0, "dns_ms": None, "warm_ms": None, "error": None}
+        started = time.perf_counter()
+        try:
+            await self.dns_cache.resolve(host, port)
+        except OSError as e:
+            result["error"] = f"dns: {e}"
+            return result
+        result["dns_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+        # Concurrent requests on an idle pool each open their own connection,
+        # which then stays in the pool as keep-alive
+        client = self.pools.client(service)
+        started = time.perf_counter()
+        responses = await asyncio.gather(
+            *(client.get("/health", timeout=self.timeout) for _ in range(self.connections)),
+            return_exceptions=True
+        )
+        result["warm_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        result["connections"] = sum(1 for response in responses if not isinstance(response, Exception))
+        errors = [response for response in responses if isinstance(response, Exception)]
+        if errors:
+            result["error"] = type(errors[0]).__name__
+        return result
+
+    async def run(self):
+        delay = 1.0
+        while True:
+            self.attempts += 1
+            self.phase = "warming"
+            services = [service for service in self.pools.services
+                        if not self.upstreams.get(service, {}).get("connections")]
+            results = await asyncio.gather(*(self._warm(service) for service in services))
+            self.upstreams.update(zip(services, results))
+            cold = [service for service in self.requires if not self.upstreams[service]["connections"]]
+            if not cold:
+                break
+            self.phase = "waiting"
+            logger.warning("Warm-up attempt %d: %s not reachable yet; retrying in %.0fs",
+                           self.attempts, ", ".join(cold), delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 10.0)
+        self.phase = "ready"
+        self.ready_at = time.monotonic()
+        logger.info("Gateway ready %.0f ms after import", (self.ready_at - IMPORTED_AT) * 1000)
+
+    def start(self):
+        """Install the DNS cache and warm up in the background (app lifespan)"""
+        install_dns_cache(self.pools, self.dns_cache)
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "phase": self.phase,
+            "attempts": self.attempts,
+            "import_to_ready_ms": round((self.ready_at - IMPORTED_AT) * 1000, 1) if self.ready else None,
+            "uptime_ms": round((time.monotonic() - IMPORTED_AT) * 1000, 1),
+            "requires": self.requires,
+            "upstreams": self.upstreams,
+            "dns_cache": self.dns_cache.stats(),
+        }
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Adaptive Routing Benchmark
+Default-routed memory adds against mock backends with skewed latency, with
+adaptive routing off (keyword rules only) and on
+
+    python benchmarks/bench_adaptive_routing.py [--concurrency 4] [--duration 15]
+        [--backend-profile supermemory=latency:60,jitter:20,tail:400@0.05] ...
+
+By default supermemory, the default rule's backend, is the slow one. Keep
+concurrency low enough that the host is not CPU bound, or queueing in the
+gateway and mocks swamps the backend latency differences being measured.
+"""
+
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_gateway import _git_commit, _wait_ready, run_level, start_processes  # noqa: E402
+
+DEFAULT_BACKEND_PROFILES = [
+    "supermemory=latency:60,jitter:20,tail:400@0.05",
+    "mem0=latency:15,jitter:5,tail:100@0.01",
+    "memory_plugin=latency:20,jitter:5,tail:100@0.01",
+]
+
+
+async def measure(args, base_url: str) -> Dict[str, Any]:
+    await _wait_ready(f"http://127.0.0.1:{args.mock_port_base}/health")
+    await _wait_ready(f"{base_url}/ready")
+    if args.warmup:
+        await run_level(base_url, "add_default", args.concurrency, args.warmup, None)
+    async with httpx.AsyncClient() as client:
+        before = (await client.get(f"http://127.0.0.1:{args.mock_port_base}/_mock/stats")).json()["adds"]
+    row = await run_level(base_url, "add_default", args.concurrency, args.duration, None)
+    async with httpx.AsyncClient() as client:
+        after = (await client.get(f"http://127.0.0.1:{args.mock_port_base}/_mock/stats")).json()["adds"]
+        scores = (await client.get(f"{base_url}/api/v1/routing/scores")).json()
+    total = sum(after.values()) - sum(before.values())
+    return {
+        "requests": row["requests"],
+        "errors": row["errors"],
+        "rps": row["rps"],
+        "latency_ms": row["latency_ms"],
+        "backend_share": {
+            backend: round((after[backend] - before[backend]) / total, 3) if total else None for backend in after
+        },
+        "scores": scores.get("scores"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds (adaptive mode learns here)")
+    parser.add_argument("--port", type=int, default=18000)
+    parser.add_argument("--mock-port-base", type=int, default=18080)
+    parser.add_argument("--backend-profile", action="append", help="backend profile, see mock_upstreams.py")
+    parser.add_argument("--output", help="write results JSON to this file")
+    args = parser.parse_args()
+    args.backend_profile = args.backend_profile or DEFAULT_BACKEND_PROFILES
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    results = {}
+    for mode in ("off", "on"):
+        run_args = argparse.Namespace(**vars(args), workers=1, profile=None,
+                                      gateway_env=[f"APEX_ADAPTIVE_ROUTING={'true' if mode == 'on' else 'false'}",
+                                                   "APEX_DEDUP=false"])
+        mocks, gateway = start_processes(run_args)
+        try:
+            results[mode] = asyncio.run(measure(run_args, base_url))
+        finally:
+            for process in (gateway, mocks):
+                process.terminate()
+            for process in (gateway, mocks):
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    off, on = results["off"]["latency_ms"], results["on"]["latency_ms"]
+    report = {
+        "benchmark": "adaptive_routing",
+        "commit": _git_commit(),
+        "config": {
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "backend_profiles": args.backend_profile,
+        },
+        "results": results,
+        "p99_improvement": round(1 - on["p99"] / off["p99"], 3) if off.get("p99") and on.get("p99") else None,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Gateway Load Test
+Starts mock upstreams and the gateway locally, drives its endpoints at fixed
+concurrency levels and reports RPS, latency percentiles and gateway memory
+
+    python benchmarks/bench_gateway.py [--scenarios search,add,forensic,skill]
+        [--concurrency 1,16,64] [--duration 10] [--profile memory_nexus=latency:20]
+        [--output results.json] [--baseline previous.json] [--quick]
+
+Results are JSON (stdout, or --output). Passing an earlier result file as
+--baseline adds per-row RPS and p99 deltas, so runs can be compared
+between commits.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mock_upstreams import SERVICES, parse_profiles  # noqa: E402
+
+# name -> (method, path, body builder taking a request counter)
+SCENARIOS: Dict[str, Tuple[str, str, Callable[[int], Dict[str, Any]]]] = {
+    "search": ("POST", "/api/v1/memory/search",
+               lambda n: {"query": f"deployment notes {n}", "user_id": f"user{n % 50}", "limit": 10}),
+    "search_cached": ("POST", "/api/v1/memory/search",
+                      lambda n: {"query": f"deployment notes {n % 20}", "user_id": "user0", "limit": 10}),
+    "add": ("POST", "/api/v1/memory/add",
+            lambda n: {"content": f"meeting note {n}: I prefer async standups", "user_id": f"user{n % 50}"}),
+    # No routing keywords: lands on the default rule's backend
+    "add_default": ("POST", "/api/v1/memory/add",
+                    lambda n: {"content": f"meeting note {n}: roadmap review moved", "user_id": f"user{n % 50}"}),
+    "forensic": ("POST", "/api/v1/forensic/analyze",
+                 lambda n: {"case_id": f"case-{n}", "evidence": [{"type": "document", "id": n}]}),
+    "skill": ("POST", "/api/v1/skills/execute",
+              lambda n: {"skill": "summarize", "params": {"doc": n}}),
+}
+
+
+def _percentile(ordered: List[float], fraction: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def _rss_mb(pid: int) -> Optional[float]:
+    """Resident set size of a process (Linux /proc, else psutil if installed)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import psutil
+        return round(psutil.Process(pid).memory_info().rss / 1048576, 1)
+    except Exception:
+        return None
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+async def _wait_ready(url: str, timeout: float = 20.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url, timeout=1.0)).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"{url} did not become ready within {timeout:.0f}s")
+
+
+def start_processes(args) -> Tuple[subprocess.Popen, subprocess.Popen]:
+    mock_cmd = [sys.executable, str(ROOT / "benchmarks" / "mock_upstreams.py"), "--port-base", str(args.mock_port_base)]
+    for profile in args.profile or []:
+        mock_cmd += ["--profile", profile]
+    for profile in getattr(args, "backend_profile", None) or []:
+        mock_cmd += ["--backend-profile", profile]
+    mocks = subprocess.Popen(mock_cmd)
+
+    env = dict(os.environ)
+    for index, service in enumerate(SERVICES):
+        env[f"APEX_{service.upper()}_URL"] = f"http://127.0.0.1:{args.mock_port_base + index}"
+    env["APEX_WORKERS"] = str(args.workers)
+    env["APEX_HOST"] = "127.0.0.1"
+    env["APEX_PORT"] = str(args.port)
+    env.setdefault("APEX_SHARED_STATE_PATH", f"/tmp/apex-bench-{args.port}.state")
+    # No dedup snapshot, so earlier runs' adds are not answered as duplicates
+    env.setdefault("APEX_DEDUP_SNAPSHOT", "")
+    for setting in args.gateway_env or []:
+        key, _, value = setting.partition("=")
+        env[key] = value
+    # The image's own entrypoint (Dockerfile CMD), so startup problems show up here
+    gateway = subprocess.Popen(
+        [sys.executable, "api.py", "--log-level", "warning", "--no-access-log"],
+        cwd=ROOT / "apex", env=env,
+    )
+    return mocks, gateway
+
+
+async def run_level(base_url: str, scenario: str, concurrency: int, duration: float,
+                    gateway_pid: Optional[int]) -> Dict[str, Any]:
+    """Closed-loop load: `concurrency` workers each send back-to-back requests"""
+    method, path, build = SCENARIOS[scenario]
+    counter = itertools.count()
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    rss_samples: List[float] = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=build(next(counter)))
+                    key = str(response.status_code)
+                except httpx.HTTPError as e:
+                    key = type(e).__name__
+                latencies.append(time.perf_counter() - started)
+                statuses[key] = statuses.get(key, 0) + 1
+
+        async def sample_memory():
+            while time.perf_counter() < deadline:
+                rss = _rss_mb(gateway_pid) if gateway_pid else None
+                if rss is not None:
+                    rss_samples.append(rss)
+                await asyncio.sleep(0.25)
+
+        started = time.perf_counter()
+        await asyncio.gather(sample_memory(), *(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    ok = sum(count for key, count in statuses.items() if key.startswith("2"))
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(latencies) - ok,
+        "statuses": statuses,
+        "rps": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            name: round(value * 1000, 2) if value is not None else None
+            for name, value in (("p50", _percentile(ordered, 0.50)), ("p95", _percentile(ordered, 0.95)),
+                                ("p99", _percentile(ordered, 0.99)), ("max", ordered[-1] if ordered else None))
+        },
+        "gateway_rss_mb": {
+            "start": rss_samples[0] if rss_samples else None,
+            "peak": max(rss_samples) if rss_samples else None,
+        },
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any]) -> List[Dict[str, Any]]:
+    previous = {(row["scenario"], row["concurrency"]): row for row in baseline.get("results", [])}
+    comparison = []
+    for row in results:
+        before = previous.get((row["scenario"], row["concurrency"]))
+        if before is None:
+            continue
+        p99, p99_before = row["latency_ms"]["p99"], before["latency_ms"]["p99"]
+        comparison.append({
+            "scenario": row["scenario"],
+            "concurrency": row["concurrency"],
+            "rps_change_pct": round((row["rps"] / before["rps"] - 1) * 100, 1) if before["rps"] else None,
+            "p99_change_pct": round((p99 / p99_before - 1) * 100, 1) if p99 and p99_before else None,
+        })
+    return comparison
+
+
+async def run(args) -> Dict[str, Any]:
+    base_url = f"http://127.0.0.1:{args.port}"
+    mocks, gateway = start_processes(args)
+    try:
+        await _wait_ready(f"http://127.0.0.1:{args.mock_port_base}/health")
+        await _wait_ready(f"{base_url}/ready")
+        results = []
+        for scenario in args.scenarios.split(","):
+            if scenario not in SCENARIOS:
+                raise ValueError(f"Unknown scenario '{scenario}' (expected one of {', '.join(SCENARIOS)})")
+            for concurrency in (int(value) for value in args.concurrency.split(",")):
+                if args.warmup:
+                    await run_level(base_url, scenario, concurrency, args.warmup, None)
+                results.append(await run_level(base_url, scenario, concurrency, args.duration, gateway.pid))
+    finally:
+        for process in (gateway, mocks):
+            process.terminate()
+        for process in (gateway, mocks):
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    return {
+        "benchmark": "gateway",
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "config": {
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "profiles": parse_profiles(args.profile),
+            "gateway_env": args.gateway_env or [],
+            "workers": args.workers,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default="search,add,forensic,skill")
+    parser.add_argument("--concurrency", default="1,16,64")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario/concurrency level")
+    parser.add_argument("--warmup", type=float, default=1.0, help="unmeasured seconds before each level")
+    parser.add_argument("--port", type=int, default=18000)
+    parser.add_argument("--mock-port-base", type=int, default=18080)
+    parser.add_argument("--profile", action="append", help="mock profile, see mock_upstreams.py")
+    parser.add_argument("--gateway-env", action="append", help="KEY=VALUE passed to the gateway process")
+    parser.add_argument("--workers", type=int, default=1, help="gateway worker processes (APEX_WORKERS)")
+    parser.add_argument("--output", help="write results JSON to this file")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--quick", action="store_true", help="short smoke run (concurrency 1,8; 2s levels)")
+    parser.add_argument("--fail-on-errors", action="store_true", help="exit 1 if any request failed")
+    args = parser.parse_args()
+    if args.quick:
+        args.concurrency, args.duration, args.warmup = "1,8", 2.0, 0.5
+
+    report = asyncio.run(run(args))
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = compare(report["results"], json.load(f))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+    if args.fail_on_errors and any(row["errors"] for row in report["results"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
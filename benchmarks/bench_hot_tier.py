@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Hot-Tier Index Benchmark
+Index memory per 100k memories, add throughput and search latency
+
+    python benchmarks/bench_hot_tier.py [--memories 100000] [--users 1000] [--words 24]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "apex"))
+
+from hot_tier import HotTierIndex  # noqa: E402
+
+# Small closed vocabulary plus unique tokens, roughly like chat memories
+VOCABULARY = [
+    "prefer", "coffee", "meeting", "case", "client", "deadline", "contract", "review", "project", "call",
+    "email", "budget", "invoice", "travel", "flight", "hotel", "doctor", "appointment", "birthday", "gift",
+    "report", "quarterly", "linked", "related", "witness", "statement", "evidence", "draft", "agreement", "team",
+] + [f"term{index}" for index in range(5000)]
+
+
+def make_memory(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words)) + f" ref{rng.randrange(10 ** 9)}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--memories", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--words", type=int, default=24)
+    parser.add_argument("--searches", type=int, default=5000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    memories = [(f"user{rng.randrange(args.users)}", make_memory(rng, args.words)) for _ in range(args.memories)]
+
+    def build() -> HotTierIndex:
+        index = HotTierIndex(max_docs=args.memories, max_per_user=args.memories, ttl=3600)
+        for number, (user_id, content) in enumerate(memories):
+            index.add(user_id, f"mem-{number}", content, None, "supermemory")
+        return index
+
+    started = time.perf_counter()
+    index = build()
+    add_seconds = time.perf_counter() - started
+    del index
+    tracemalloc.start()
+    index = build()
+    index_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Memory text is allocated before tracing; the index holds it on top
+    content_bytes = sum(sys.getsizeof(content) for _, content in memories)
+
+    latencies = []
+    for _ in range(args.searches):
+        query = " ".join(rng.choice(VOCABULARY[:30]) for _ in range(3))
+        started = time.perf_counter()
+        index.search(f"user{rng.randrange(args.users)}", query, 10)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+
+    per_100k = 100000 / args.memories
+    print(json.dumps({
+        "benchmark": "hot_tier",
+        "memories": args.memories,
+        "users": args.users,
+        "words_per_memory": args.words,
+        "index_mb_per_100k": round(index_bytes * per_100k / 1048576, 1),
+        "content_mb_per_100k": round(content_bytes * per_100k / 1048576, 1),
+        "adds_per_second": round(args.memories / add_seconds),
+        "search_p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "search_p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 3),
+        "stats": index.stats(),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Passthrough Microbenchmark
+Parse + re-encode (the old proxied-endpoint path) vs raw passthrough on
+multi-MB upstream JSON bodies
+
+    python benchmarks/bench_passthrough.py [--sizes-mb 1,4,16] [--iterations 5]
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "apex"))
+
+import proxy  # noqa: E402
+
+
+def make_body(size_mb: float) -> bytes:
+    """A forensic-analysis-shaped JSON document of roughly size_mb"""
+    finding = {
+        "evidence_id": "ev-000000",
+        "type": "document",
+        "score": 0.8731,
+        "excerpt": "the witness statement references the signed agreement dated 2024-03-14 " * 3,
+        "entities": ["party_a", "party_b", "counsel"],
+        "tags": {"privileged": False, "reviewed": True},
+    }
+    per_item = len(json.dumps(finding))
+    findings = []
+    for index in range(int(size_mb * 1048576 / per_item)):
+        findings.append({**finding, "evidence_id": f"ev-{index:06d}"})
+    return json.dumps({"case_id": "case-1", "findings": findings, "confidence": 0.91}).encode("utf-8")
+
+
+def legacy(upstream: httpx.Response) -> bytes:
+    """response.json(), then FastAPI's jsonable_encoder + JSONResponse"""
+    return JSONResponse(jsonable_encoder(upstream.json())).body
+
+
+def fast_json(upstream: httpx.Response) -> bytes:
+    """Parsed body handed to proxy.respond: FastJSONResponse, no jsonable_encoder"""
+    return proxy.respond(proxy.loads(upstream.content)).body
+
+
+def passthrough(upstream: httpx.Response) -> bytes:
+    """RawJSON relay: no parse, no re-encode"""
+    return proxy.RawJSON.from_response(upstream).response().body
+
+
+def measure(fn, upstream: httpx.Response, iterations: int):
+    fn(upstream)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn(upstream)
+    elapsed = (time.perf_counter() - started) / iterations
+    tracemalloc.start()
+    fn(upstream)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", default="1,4,16")
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    results = []
+    for size_mb in (float(value) for value in args.sizes_mb.split(",")):
+        body = make_body(size_mb)
+        upstream = httpx.Response(200, content=body, headers={"content-type": "application/json"})
+        row = {"size_bytes": len(body)}
+        for name, fn in (("legacy", legacy), ("fast_json", fast_json), ("passthrough", passthrough)):
+            elapsed, peak = measure(fn, upstream, args.iterations)
+            row[f"{name}_ms"] = round(elapsed * 1000, 2)
+            row[f"{name}_peak_mb"] = round(peak / 1048576, 2)
+        row["fast_json_speedup"] = round(row["legacy_ms"] / row["fast_json_ms"], 1)
+        results.append(row)
+
+    print(json.dumps({"benchmark": "passthrough", "orjson": proxy.orjson is not None, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Routing Microbenchmark
+Legacy keyword scans vs the compiled routing engine on multi-KB memory contents
+
+    python benchmarks/bench_routing.py [--sizes 1024,8192,65536] [--iterations 2000]
+"""
+
+import argparse
+import json
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "apex"))
+
+from routing import RoutingEngine  # noqa: E402
+
+FILLER = (
+    "the quarterly roadmap review covered deployment timelines, staffing and budget. "
+    "we walked through observability dashboards, incident retrospectives and the "
+    "migration plan for the search cluster; the team agreed to revisit latency "
+    "targets after the next release and to document the rollout checklist with "
+    "owners for each milestone. notes were shared with product, design and "
+    "operations, and follow-up items were filed against the platform backlog. "
+    "a demo of the new dashboard is planned for friday"
+).split()
+
+# Words the legacy substring checks misroute (expected backend: supermemory)
+MISFIRES = ["showcase", "briefcase", "unlikely", "resettings", "unrelated", "disconnection"]
+
+
+def legacy_route(content, metadata=None):
+    """The original _route_memory_add, kept here as the baseline"""
+    if any(word in content.lower() for word in ['prefer', 'like', 'favorite', 'setting']):
+        return 'memory_plugin'
+    if any(word in content.lower() for word in ['case', 'linked', 'related', 'connection']):
+        return 'mem0'
+    if metadata and metadata.get('priority', 0) >= 5:
+        return 'all'
+    return 'supermemory'
+
+
+def make_content(size, keyword=None, rng=None):
+    """Filler text of ~size bytes, optionally with a keyword near the end"""
+    rng = rng or random.Random(42)
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(FILLER)
+        words.append(word)
+        length += len(word) + 1
+    if keyword:
+        words.insert(int(len(words) * 0.9), keyword)
+    return " ".join(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1024,8192,65536")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    engine = RoutingEngine()
+    results = []
+    for size in (int(value) for value in args.sizes.split(",")):
+        for label, keyword in (("default", None), ("preference", "preferred"), ("relationship", "linked")):
+            content = make_content(size, keyword)
+            iterations = max(10, args.iterations * 1024 // size)
+            legacy = timeit.timeit(lambda: legacy_route(content), number=iterations) / iterations
+            compiled = timeit.timeit(lambda: engine.route(content), number=iterations) / iterations
+            results.append({
+                "size_bytes": len(content),
+                "case": label,
+                "legacy_backend": legacy_route(content),
+                "engine_backend": engine.route(content).backend,
+                "legacy_us": round(legacy * 1e6, 2),
+                "engine_us": round(compiled * 1e6, 2),
+                "speedup": round(legacy / compiled, 2),
+            })
+
+    correctness = [
+        {"word": word, "legacy_backend": legacy_route(f"notes: {word}"),
+         "engine_backend": engine.route(f"notes: {word}").backend}
+        for word in MISFIRES
+    ]
+
+    print(json.dumps({"benchmark": "routing", "results": results, "misfires": correctness}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
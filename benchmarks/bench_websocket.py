@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - WebSocket Session Benchmark
+Small memory add/search operations over REST (one HTTP request each) vs
+pipelined over /api/v1/ws sessions, at the same number of operations in flight
+
+    python benchmarks/bench_websocket.py [--inflight 1,16,64] [--sessions 1]
+        [--duration 10] [--profile memory_nexus=latency:2,jitter:1]
+
+The default mock latency is low so per-request gateway overhead, which the
+session endpoint removes, dominates.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import httpx
+import websockets
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_gateway import _git_commit, _percentile, _wait_ready, start_processes  # noqa: E402
+
+DEFAULT_PROFILES = ["memory_nexus=latency:2,jitter:1"]
+
+
+def _operation(n: int) -> Tuple[str, str, Dict[str, Any]]:
+    """(ws op, REST path, body): alternating adds and searches"""
+    if n % 2:
+        return "memory.search", "/api/v1/memory/search", {"query": f"notes {n % 20}", "user_id": f"user{n % 50}",
+                                                          "limit": 5}
+    return "memory.add", "/api/v1/memory/add", {"content": f"agent note {n}", "user_id": f"user{n % 50}"}
+
+
+def _summary(latencies: Dict[str, List[float]], errors: int, elapsed: float) -> Dict[str, Any]:
+    total = sum(len(values) for values in latencies.values())
+    return {
+        "ops": total,
+        "errors": errors,
+        "ops_per_sec": round(total / elapsed, 1),
+        "latency_ms": {
+            op: {
+                name: round(value * 1000, 2) if value is not None else None
+                for name, value in (("p50", _percentile(sorted(values), 0.50)),
+                                    ("p99", _percentile(sorted(values), 0.99)))
+            }
+            for op, values in latencies.items()
+        },
+    }
+
+
+async def run_rest(base_url: str, inflight: int, duration: float) -> Dict[str, Any]:
+    counter = itertools.count()
+    latencies: Dict[str, List[float]] = {"memory.add": [], "memory.search": []}
+    errors = 0
+    limits = httpx.Limits(max_connections=inflight, max_keepalive_connections=inflight)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                op, path, body = _operation(next(counter))
+                started = time.perf_counter()
+                try:
+                    response = await client.post(path, json=body)
+                    errors += response.status_code != 200
+                except httpx.HTTPError:
+                    errors += 1
+                latencies[op].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(inflight)))
+    return _summary(latencies, errors, time.perf_counter() - started)
+
+
+async def run_ws(ws_url: str, inflight: int, sessions: int, duration: float) -> Dict[str, Any]:
+    counter = itertools.count()
+    latencies: Dict[str, List[float]] = {"memory.add": [], "memory.search": []}
+    errors = 0
+    depth = max(1, inflight // sessions)
+
+    async def session():
+        nonlocal errors
+        async with websockets.connect(ws_url, max_size=None) as ws:
+            sent: Dict[int, Tuple[str, float]] = {}
+            deadline = time.perf_counter() + duration
+
+            async def send_one():
+                n = next(counter)
+                op, _, body = _operation(n)
+                sent[n] = (op, time.perf_counter())
+                await ws.send(json.dumps({"id": n, "op": op, "data": body}))
+
+            for _ in range(depth):
+                await send_one()
+            # Closed loop: every reply (in whatever order) frees one slot
+            while sent:
+                reply = json.loads(await ws.recv())
+                op, started = sent.pop(reply["id"])
+                latencies[op].append(time.perf_counter() - started)
+                errors += not reply["ok"]
+                if time.perf_counter() < deadline:
+                    await send_one()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(session() for _ in range(sessions)))
+    return _summary(latencies, errors, time.perf_counter() - started)
+
+
+async def measure(args, base_url: str, ws_url: str) -> List[Dict[str, Any]]:
+    await _wait_ready(f"http://127.0.0.1:{args.mock_port_base}/health")
+    await _wait_ready(f"{base_url}/ready")
+    rows = []
+    for inflight in (int(value) for value in args.inflight.split(",")):
+        sessions = min(args.sessions, inflight)
+        if args.warmup:
+            await run_rest(base_url, inflight, args.warmup)
+            await run_ws(ws_url, inflight, sessions, args.warmup)
+        rest = await run_rest(base_url, inflight, args.duration)
+        ws = await run_ws(ws_url, inflight, sessions, args.duration)
+        rows.append({
+            "inflight": inflight,
+            "sessions": sessions,
+            "rest": rest,
+            "websocket": ws,
+            "speedup": round(ws["ops_per_sec"] / rest["ops_per_sec"], 2) if rest["ops_per_sec"] else None,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--inflight", default="1,16,64", help="operations in flight (REST: concurrent requests)")
+    parser.add_argument("--sessions", type=int, default=1, help="WebSocket sessions sharing the in-flight ops")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--port", type=int, default=18000)
+    parser.add_argument("--mock-port-base", type=int, default=18080)
+    parser.add_argument("--profile", action="append", help="mock profile, see mock_upstreams.py")
+    parser.add_argument("--output", help="write results JSON to this file")
+    args = parser.parse_args()
+    args.profile = args.profile or DEFAULT_PROFILES
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    ws_url = f"ws://127.0.0.1:{args.port}/api/v1/ws"
+    run_args = argparse.Namespace(**vars(args), workers=1, gateway_env=["APEX_DEDUP=false"])
+    mocks, gateway = start_processes(run_args)
+    try:
+        rows = asyncio.run(measure(args, base_url, ws_url))
+    finally:
+        for process in (gateway, mocks):
+            process.terminate()
+        for process in (gateway, mocks):
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    report = {
+        "benchmark": "websocket",
+        "commit": _git_commit(),
+        "config": {"duration_s": args.duration, "profiles": args.profile},
+        "results": rows,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
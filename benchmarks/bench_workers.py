@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Worker Scaling Benchmark
+Gateway throughput at 1..N worker processes, with load spread over several
+client processes so the load generator is not the bottleneck
+
+    python benchmarks/bench_workers.py [--workers 1,2,4] [--scenario search_cached]
+        [--concurrency 64] [--clients 4] [--duration 10]
+
+Scaling is bounded by the cores available to the gateway, the mock
+upstreams and the clients together; run on a host with spare cores.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_gateway import _git_commit, _wait_ready, run_level, start_processes  # noqa: E402
+
+
+def _client(base_url: str, scenario: str, concurrency: int, duration: float) -> Dict[str, Any]:
+    return asyncio.run(run_level(base_url, scenario, concurrency, duration, None))
+
+
+def drive(base_url: str, args) -> Dict[str, Any]:
+    """Run `args.clients` load processes at once and combine their results"""
+    per_client = max(1, args.concurrency // args.clients)
+    with ProcessPoolExecutor(args.clients) as pool:
+        if args.warmup:
+            list(pool.map(_client, *zip(*[(base_url, args.scenario, per_client, args.warmup)] * args.clients)))
+        rows: List[Dict[str, Any]] = list(pool.map(
+            _client, *zip(*[(base_url, args.scenario, per_client, args.duration)] * args.clients)
+        ))
+    return {
+        "requests": sum(row["requests"] for row in rows),
+        "errors": sum(row["errors"] for row in rows),
+        "rps": round(sum(row["rps"] for row in rows), 1),
+        # Upper bounds: the worst client's percentiles
+        "latency_ms": {
+            name: max(row["latency_ms"][name] or 0 for row in rows) for name in ("p50", "p99")
+        },
+    }
+
+
+async def _ready(args, base_url: str):
+    await _wait_ready(f"http://127.0.0.1:{args.mock_port_base}/health")
+    await _wait_ready(f"{base_url}/ready")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--scenario", default="search_cached")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--clients", type=int, default=4, help="load generator processes")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--port", type=int, default=18000)
+    parser.add_argument("--mock-port-base", type=int, default=18080)
+    parser.add_argument("--profile", action="append", help="mock profile, see mock_upstreams.py")
+    parser.add_argument("--gateway-env", action="append", help="KEY=VALUE passed to the gateway process")
+    parser.add_argument("--output", help="write results JSON to this file")
+    args = parser.parse_args()
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    results = []
+    for workers in (int(value) for value in args.workers.split(",")):
+        mocks, gateway = start_processes(argparse.Namespace(**{**vars(args), "workers": workers}))
+        try:
+            asyncio.run(_ready(args, base_url))
+            row = {"workers": workers, **drive(base_url, args)}
+        finally:
+            for process in (gateway, mocks):
+                process.terminate()
+            for process in (gateway, mocks):
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+        row["speedup"] = round(row["rps"] / results[0]["rps"], 2) if results and results[0]["rps"] else 1.0
+        results.append(row)
+
+    report = {
+        "benchmark": "workers",
+        "commit": _git_commit(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "scenario": args.scenario,
+            "concurrency": args.concurrency,
+            "clients": args.clients,
+            "duration_s": args.duration,
+            "profiles": args.profile or [],
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Mock Upstreams
+Local stand-ins for memory_nexus, intelligence and execution_engine with
+configurable latency and error profiles
+
+    python benchmarks/mock_upstreams.py [--port-base 18080]
+        [--profile memory_nexus=latency:20,jitter:5,errors:0.01,tail:500@0.01]
+        [--backend-profile supermemory=latency:80,tail:400@0.05]
+
+Each service listens on its own port (port-base + index, in SERVICES order).
+A profile sets the base latency and uniform jitter (ms), the fraction of
+requests answered with 503, and an occasional slow tail (ms@fraction).
+A backend profile replaces memory_nexus's profile for memory adds whose
+preferred_backend is that backend.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from typing import Any, Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from starlette.requests import ClientDisconnect
+
+SERVICES = ("memory_nexus", "intelligence", "execution_engine")
+MEMORY_BACKENDS = ("supermemory", "mem0", "memory_plugin")
+ADD_PATHS = ("/api/memory/add", "/api/memory/add_batch")
+# Results each source holds for any query (--search-results)
+SEARCH_RESULTS = 3
+
+DEFAULT_PROFILE = {"latency": 10.0, "jitter": 5.0, "errors": 0.0, "tail": 0.0, "tail_rate": 0.0}
+
+
+def parse_profile(spec: str) -> Dict[str, float]:
+    """"latency:20,jitter:5,errors:0.01,tail:500@0.01" -> profile dict"""
+    profile = dict(DEFAULT_PROFILE)
+    for part in filter(None, (item.strip() for item in spec.split(","))):
+        key, _, value = part.partition(":")
+        if key not in profile or key == "tail_rate":
+            raise ValueError(f"Unknown profile setting '{key}'")
+        if key == "tail":
+            value, _, rate = value.partition("@")
+            profile["tail_rate"] = float(rate or 0.01)
+        profile[key] = float(value)
+    return profile
+
+
+def parse_profiles(specs) -> Dict[str, Dict[str, float]]:
+    """["memory_nexus=latency:20", ...] -> {service: profile} for every service"""
+    profiles = {service: dict(DEFAULT_PROFILE) for service in SERVICES}
+    for spec in specs or []:
+        service, _, settings = spec.partition("=")
+        if service not in profiles:
+            raise ValueError(f"Unknown service '{service}' (expected one of {', '.join(SERVICES)})")
+        profiles[service] = parse_profile(settings)
+    return profiles
+
+
+def parse_backend_profiles(specs) -> Dict[str, Dict[str, float]]:
+    """["supermemory=latency:80", ...] -> {backend: profile} for the listed backends"""
+    profiles = {}
+    for spec in specs or []:
+        backend, _, settings = spec.partition("=")
+        if backend not in MEMORY_BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}' (expected one of {', '.join(MEMORY_BACKENDS)})")
+        profiles[backend] = parse_profile(settings)
+    return profiles
+
+
+def _respond(path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    """Plausible response bodies for the upstream paths the gateway calls"""
+    if path == "/api/memory/add":
+        return {"memory_id": f"mem_{random.getrandbits(48):012x}", "backend": body.get("preferred_backend")}
+    if path == "/api/memory/add_batch":
+        return {"results": [{"memory_id": f"mem_{random.getrandbits(48):012x}"} for _ in body.get("memories", [])]}
+    if path == "/api/memory/search":
+        sources = body.get("sources") or ["mem0", "memory_plugin", "supermemory"]
+        limit = body.get("limit") or 10
+        offset = body.get("offset") or 0
+        return {"results": [
+            {"source": source, "content": f"result {i} for {body.get('query', '')}",
+             "score": round(1 - i / SEARCH_RESULTS, 6)}
+            for source in sources for i in range(offset, min(offset + limit, SEARCH_RESULTS))
+        ]}
+    if path == "/api/case/analyze":
+        return {"case_id": body.get("case_id"), "findings": [], "confidence": 0.9}
+    if path == "/api/skill/execute":
+        return {"skill": body.get("skill"), "status": "completed", "output": {}}
+    return {"ok": True, "path": path}
+
+
+def create_app(service: str, profile: Dict[str, float],
+               backend_profiles: Optional[Dict[str, Dict[str, float]]] = None) -> FastAPI:
+    app = FastAPI(title=f"mock {service}")
+    counters = {"requests": 0, "errors": 0}
+    backend_profiles = backend_profiles or {}
+    adds = {backend: 0 for backend in backend_profiles}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy", "service": service}
+
+    @app.get("/_mock/stats")
+    async def stats():
+        return {"service": service, "profile": profile, **counters,
+                **({"backend_profiles": backend_profiles, "adds": adds} if backend_profiles else {})}
+
+    @app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
+    async def handle(path: str, request: Request):
+        counters["requests"] += 1
+        # Read the body first: hedged gateway calls may disconnect while we sleep
+        try:
+            raw = await request.body()
+        except ClientDisconnect:
+            return Response(status_code=499)
+        body = json.loads(raw) if raw else {}
+        body = body if isinstance(body, dict) else {}
+        current = profile
+        if f"/{path}" in ADD_PATHS and body.get("preferred_backend") in backend_profiles:
+            current = backend_profiles[body["preferred_backend"]]
+            adds[body["preferred_backend"]] += 1
+        delay = current["latency"] + random.uniform(0, current["jitter"])
+        if current["tail_rate"] and random.random() < current["tail_rate"]:
+            delay = max(delay, current["tail"])
+        await asyncio.sleep(delay / 1000)
+        if current["errors"] and random.random() < current["errors"]:
+            counters["errors"] += 1
+            return JSONResponse(status_code=503, content={"detail": "mock upstream error"})
+        return _respond(f"/{path}", body)
+
+    return app
+
+
+async def serve(port_base: int, profiles: Dict[str, Dict[str, float]], host: str = "127.0.0.1",
+                backend_profiles: Optional[Dict[str, Dict[str, float]]] = None):
+    servers = [
+        uvicorn.Server(uvicorn.Config(create_app(service, profiles[service],
+                                                 backend_profiles if service == "memory_nexus" else None), host=host,
+                                      port=port_base + index, log_level="warning", access_log=False))
+        for index, service in enumerate(SERVICES)
+    ]
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def main():
+    global SEARCH_RESULTS
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port-base", type=int, default=18080)
+    parser.add_argument("--profile", action="append", help="service=latency:MS,jitter:MS,errors:RATE,tail:MS@RATE")
+    parser.add_argument("--backend-profile", action="append", help="backend=... profile for memory adds to it")
+    parser.add_argument("--search-results", type=int, default=3, help="results per source per query")
+    args = parser.parse_args()
+    SEARCH_RESULTS = args.search_results
+    asyncio.run(serve(args.port_base, parse_profiles(args.profile), args.host,
+                      parse_backend_profiles(args.backend_profile)))
+
+
+if __name__ == "__main__":
+    main()
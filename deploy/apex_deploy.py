@@ -13,6 +13,9 @@ from pathlib import Path
 from typing import Dict, List
 import httpx
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import deps  # noqa: E402
+
 
 class ApexDeploymentOrchestrator:
     """Supreme deployment orchestrator for APEX architecture"""
@@ -133,22 +136,19 @@ class ApexDeploymentOrchestrator:
         """Deploy memory layer (Memory Nexus + Trinity)"""
         print("\n🧠 [L1] Deploying Memory Layer...")
         
-        # Install Python dependencies
+        # Install Python dependencies (one resolver pass; skipped if unchanged)
         print("  📦 Installing Python dependencies...")
-        deps = [
-            "mem0ai",
-            "httpx",
-            "fastapi",
-            "uvicorn",
-            "python-dotenv",
-            "pydantic",
-            "neo4j"
-        ]
-        
-        for dep in deps:
-            subprocess.run(["pip", "install", "-q", dep])
+        try:
+            report = deps.install()
+        except RuntimeError as e:
+            print(f"  ❌ {e}")
+            return False
         
-        print("  ✅ Dependencies installed")
+        if report["skipped"]:
+            print(f"  ✅ Dependencies up to date (lock {report['hash']})")
+        else:
+            mode = "offline wheelhouse" if report["offline"] else report["source"]
+            print(f"  ✅ Dependencies installed from {mode} in {report['seconds']}s")
         
         print("\n✅ [L1] Memory Layer: CONFIGURED")
         return True
@@ -170,7 +170,15 @@ class ApexDeploymentOrchestrator:
             ],
             "rate_limiting": {
                 "enabled": True,
-                "requests_per_minute": 100
+                "requests_per_minute": 100,
+                "burst": 20,
+                "upstream_concurrency": {
+                    "memory_nexus": 200,
+                    "intelligence": 32,
+                    "execution_engine": 32
+                },
+                "upstream_queue": 100,
+                "queue_timeout_seconds": 5
             }
         }
         
@@ -212,7 +220,8 @@ class ApexDeploymentOrchestrator:
         # The API will be started by docker-compose
         # Here we just verify it's ready
         print("  ⏳ Waiting for APEX API...")
-        self._wait_for_service(f"http://localhost:{self.ports['apex_api']}/api/v1/health", timeout=60)
+        # /ready answers 503 until the gateway's upstream connections are warm
+        self._wait_for_service(f"http://localhost:{self.ports['apex_api']}/ready", timeout=60)
         
         print("  ✅ APEX API operational")
         print("\n✅ [L0] APEX API Gateway: OPERATIONAL")
@@ -5,13 +5,14 @@ One command to deploy the entire orchestration system
 """
 
 import asyncio
-import subprocess
 import sys
 import os
 import json
+import time
 from pathlib import Path
 from typing import Dict, List, Optional
 import httpx
+import yaml
 
 class APEXDeployer2025:
     """Master deployment orchestrator for APEX 2025"""
@@ -20,6 +21,9 @@ class APEXDeployer2025:
         self.base_dir = Path(__file__).parent.parent
         self.config = self._load_config()
         self.deployment_status = {}
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self.critical_path: List[str] = []
+        self.total_time = 0.0
         
     def _load_config(self) -> Dict:
         """Load configuration from .env and config files"""
@@ -48,28 +52,76 @@ class APEXDeployer2025:
         }
         return config
     
-    async def deploy_layer(self, layer_name: str, port: int) -> bool:
-        """Deploy a single layer of the APEX architecture"""
-        print(f"\n🚀 Deploying {layer_name} on port {port}...")
+    # docker-compose service -> (layer name, health URL)
+    LAYERS = {
+        'memory_nexus': ('Memory Nexus (L1)', 'http://localhost:8080/health'),
+        'orchestration': ('Orchestration (L2)', 'http://localhost:9000/health'),
+        'memory_trinity': ('Memory Trinity (L3)', 'http://localhost:8081/health'),
+        'execution_engine': ('Execution Engine (L4)', 'http://localhost:9100/health'),
+        'intelligence': ('Intelligence (L5)', 'http://localhost:9001/health'),
+        'neo4j': ('Graph Engine (L6)', 'http://localhost:7474/'),
+        'prometheus': ('Monitoring (L7)', 'http://localhost:9090/-/healthy'),
+        'grafana': ('Dashboards (L7)', 'http://localhost:3000/api/health'),
+        'apex_gateway': ('APEX Gateway (L0)', 'http://localhost:8000/ready'),
+    }
+    
+    def _load_dependencies(self) -> Dict[str, List[str]]:
+        """Dependency DAG from docker-compose.yml depends_on (deployed layers only)"""
+        with open(self.base_dir / 'docker-compose.yml') as f:
+            services = yaml.safe_load(f).get('services', {})
+        
+        graph = {}
+        for service in self.LAYERS:
+            depends_on = services.get(service, {}).get('depends_on', [])
+            # Short form is a list, long form a mapping of service -> condition
+            graph[service] = [dep for dep in depends_on if dep in self.LAYERS]
+        
+        # Fail before starting anything if the compose file has a cycle
+        visiting, done = set(), set()
+        def visit(service, chain):
+            if service in done:
+                return
+            if service in visiting:
+                raise ValueError(f"Dependency cycle: {' -> '.join(chain + [service])}")
+            visiting.add(service)
+            for dep in graph[service]:
+                visit(dep, chain + [service])
+            visiting.discard(service)
+            done.add(service)
+        for service in graph:
+            visit(service, [])
+        return graph
+    
+    async def deploy_layer(self, service: str, started: float) -> bool:
+        """Start one docker-compose service and wait until it is healthy"""
+        layer_name, health_url = self.LAYERS[service]
+        timing = self.timings[service]
+        timing['start'] = time.monotonic() - started
+        print(f"\n🚀 Deploying {layer_name} ({service})...")
         
         try:
-            # Use docker-compose to bring up the service
-            result = subprocess.run(
-                ['docker-compose', 'up', '-d', layer_name.lower().replace(' ', '_')],
+            # Dependencies are brought up by the DAG, not by compose
+            process = await asyncio.create_subprocess_exec(
+                'docker-compose', 'up', '-d', '--no-deps', service,
                 cwd=self.base_dir,
-                capture_output=True,
-                text=True,
-                timeout=60
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
             )
+            try:
+                _, stderr = await asyncio.wait_for(process.communicate(), timeout=60)
+            except asyncio.TimeoutError:
+                process.kill()
+                raise TimeoutError("docker-compose up timed out after 60s")
+            timing['up'] = time.monotonic() - started - timing['start']
             
-            if result.returncode == 0:
-                # Wait for service to be healthy
-                await self._wait_for_health(port)
+            if process.returncode == 0:
+                await self._wait_for_health(health_url)
+                timing['healthy'] = time.monotonic() - started - timing['start'] - timing['up']
                 print(f"✅ {layer_name} deployed successfully")
                 self.deployment_status[layer_name] = 'SUCCESS'
                 return True
             else:
-                print(f"❌ {layer_name} deployment failed: {result.stderr}")
+                print(f"❌ {layer_name} deployment failed: {stderr.decode(errors='replace')}")
                 self.deployment_status[layer_name] = 'FAILED'
                 return False
                 
@@ -77,54 +129,106 @@ class APEXDeployer2025:
             print(f"❌ {layer_name} deployment error: {e}")
             self.deployment_status[layer_name] = 'ERROR'
             return False
+        finally:
+            timing['end'] = time.monotonic() - started
     
-    async def _wait_for_health(self, port: int, timeout: int = 30):
-        """Wait for service health check"""
+    async def _wait_for_health(self, url: str, timeout: float = 30):
+        """Poll a health URL with exponential backoff (0.25s doubling to 4s)"""
+        deadline = time.monotonic() + timeout
+        delay = 0.25
         async with httpx.AsyncClient() as client:
-            for _ in range(timeout):
+            while True:
                 try:
-                    response = await client.get(
-                        f"http://localhost:{port}/health",
-                        timeout=1.0
-                    )
+                    response = await client.get(url, timeout=1.0)
                     if response.status_code == 200:
                         return True
-                except:
-                    await asyncio.sleep(1)
-        raise TimeoutError(f"Service on port {port} did not become healthy")
+                except httpx.HTTPError:
+                    pass
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                await asyncio.sleep(min(delay, remaining))
+                delay = min(delay * 2, 4.0)
+        raise TimeoutError(f"{url} did not become healthy within {timeout:.0f}s")
     
     async def deploy_all(self):
-        """Deploy all APEX layers in order"""
+        """Deploy all APEX layers, each as soon as its dependencies are healthy"""
         print("\n" + "="*60)
         print("🏛️  APEX OMNIBUS SUPREME 2025 DEPLOYMENT")
         print("="*60)
         
-        layers = [
-            ('Memory Nexus (L1)', 8080),
-            ('Orchestration (L2)', 9000),
-            ('Memory Trinity (L3)', 8081),
-            ('Execution Engine (L4)', 9100),
-            ('Intelligence (L5)', 9001),
-            ('Graph Engine (L6)', 7474),
-            ('Monitoring (L7)', 3000),
-            ('APEX Gateway (L0)', 8000),
-        ]
+        graph = self._load_dependencies()
+        self.timings = {service: {} for service in graph}
+        started = time.monotonic()
+        tasks: Dict[str, asyncio.Task] = {}
         
-        for layer_name, port in layers:
-            success = await self.deploy_layer(layer_name, port)
-            if not success and layer_name == 'APEX Gateway (L0)':
-                print("\n❌ CRITICAL: APEX Gateway failed to deploy")
+        async def deploy(service: str) -> bool:
+            deps_ok = await asyncio.gather(*(tasks[dep] for dep in graph[service]))
+            if not all(deps_ok):
+                failed = [dep for dep, ok in zip(graph[service], deps_ok) if not ok]
+                layer_name = self.LAYERS[service][0]
+                print(f"⏭️  Skipping {layer_name}: {', '.join(failed)} not healthy")
+                self.deployment_status[layer_name] = 'SKIPPED'
                 return False
+            return await self.deploy_layer(service, started)
+        
+        for service in graph:
+            tasks[service] = asyncio.ensure_future(deploy(service))
+        results = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+        
+        self.total_time = time.monotonic() - started
+        self.critical_path = self._critical_path(graph)
+        self.print_timings()
+        
+        if not results['apex_gateway']:
+            print("\n❌ CRITICAL: APEX Gateway failed to deploy")
+            return False
         
         return True
     
+    def _critical_path(self, graph: Dict[str, List[str]]) -> List[str]:
+        """Chain of layers that determined the total deploy time"""
+        finished = [service for service in graph if 'end' in self.timings[service]]
+        if not finished:
+            return []
+        path = [max(finished, key=lambda service: self.timings[service]['end'])]
+        while True:
+            # The dependency that finished last is what this layer waited on
+            deps = [dep for dep in graph[path[-1]] if 'end' in self.timings[dep]]
+            if not deps:
+                break
+            path.append(max(deps, key=lambda dep: self.timings[dep]['end']))
+        return list(reversed(path))
+    
+    def print_timings(self):
+        """Per-layer timings and the critical path"""
+        print("\n⏱️  LAYER TIMINGS (seconds from deploy start):")
+        for service, timing in sorted(self.timings.items(), key=lambda item: item[1].get('start', float('inf'))):
+            if 'start' not in timing:
+                continue
+            print(f"  {self.LAYERS[service][0]:<24} start {timing['start']:6.1f}  "
+                  f"up {timing.get('up', 0):5.1f}  health {timing.get('healthy', 0):5.1f}  "
+                  f"done {timing['end']:6.1f}")
+        chain = ' -> '.join(self.LAYERS[service][0] for service in self.critical_path)
+        print(f"  Critical path: {chain}")
+        print(f"  Total: {self.total_time:.1f}s")
+        
+        report = {
+            'total_seconds': round(self.total_time, 2),
+            'critical_path': self.critical_path,
+            'layers': {service: {key: round(value, 2) for key, value in timing.items()}
+                       for service, timing in self.timings.items()},
+        }
+        with open(self.base_dir / 'deploy_timings.json', 'w') as f:
+            json.dump(report, f, indent=2)
+    
     async def verify_integrations(self) -> bool:
         """Verify all 75+ integrations are working"""
         print("\n🔍 Verifying 75+ integrations...")
         
         tests = [
             ('Memory Nexus API', 'http://localhost:8080/health'),
-            ('APEX Gateway', 'http://localhost:8000/health'),
+            ('APEX Gateway', 'http://localhost:8000/ready'),
             ('Orchestration Layer', 'http://localhost:9000/health'),
             ('Neo4j', 'http://localhost:7474/'),
             ('Prometheus', 'http://localhost:9090/-/healthy'),
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+APEX OMNIBUS SUPREME - Dependency Installer
+One resolver pass for every deploy-time Python dependency, from a reusable
+wheelhouse when one has been built
+
+    python deploy/deps.py lock       # resolve once: wheelhouse/ + requirements.lock
+    python deploy/deps.py install    # install (skipped if nothing changed)
+
+Without requirements.lock, install resolves requirements.txt plus the
+memory layer packages in a single pip run. With it (and wheelhouse/),
+install is offline and pinned.
+"""
+
+import argparse
+import hashlib
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+REQUIREMENTS = ROOT / "requirements.txt"
+LOCK = ROOT / "requirements.lock"
+WHEELHOUSE = ROOT / "wheelhouse"
+STAMP = ROOT / ".deps-installed.json"
+
+# Memory layer packages the gateway image does not need
+EXTRA_PACKAGES = ["mem0ai"]
+
+
+def _pip(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-m", "pip", *args], capture_output=True, text=True)
+
+
+def _sources() -> List[str]:
+    """pip arguments naming what to install"""
+    if LOCK.exists():
+        return ["-r", str(LOCK)]
+    return ["-r", str(REQUIREMENTS), *EXTRA_PACKAGES]
+
+
+def lock_hash() -> str:
+    """Identity of the dependency set for this interpreter"""
+    digest = hashlib.sha256()
+    if LOCK.exists():
+        digest.update(LOCK.read_bytes())
+    else:
+        digest.update(REQUIREMENTS.read_bytes())
+        digest.update(" ".join(EXTRA_PACKAGES).encode())
+    digest.update(sys.version.encode())
+    return digest.hexdigest()
+
+
+def build_lock() -> Dict[str, object]:
+    """Resolve everything once into wheelhouse/ and pin the result"""
+    started = time.monotonic()
+    staging = Path(tempfile.mkdtemp(prefix="apex-wheelhouse-"))
+    try:
+        result = _pip("wheel", "-q", "-w", str(staging), "-r", str(REQUIREMENTS), *EXTRA_PACKAGES)
+        if result.returncode != 0:
+            raise RuntimeError(f"pip wheel failed:\n{result.stderr}")
+        pins = []
+        for wheel in sorted(staging.glob("*.whl")):
+            # {name}-{version}-...whl, with '-' in names escaped to '_'
+            name, version = wheel.name.split("-")[:2]
+            pins.append(f"{name.replace('_', '-').lower()}=={version}")
+        if WHEELHOUSE.exists():
+            shutil.rmtree(WHEELHOUSE)
+        shutil.move(str(staging), str(WHEELHOUSE))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    inputs = " + ".join([REQUIREMENTS.name, *EXTRA_PACKAGES])
+    LOCK.write_text(
+        f"# Generated by `python deploy/deps.py lock` from {inputs} (Python {sys.version.split()[0]})\n"
+        + "\n".join(sorted(pins)) + "\n"
+    )
+    return {"packages": len(pins), "seconds": round(time.monotonic() - started, 1)}
+
+
+def install(force: bool = False) -> Dict[str, object]:
+    """Install the dependency set in one pip run unless it is already in place"""
+    key = lock_hash()
+    stamps = json.loads(STAMP.read_text()) if STAMP.exists() else {}
+    if not force and stamps.get(sys.executable) == key:
+        return {"skipped": True, "hash": key[:12], "seconds": 0.0}
+
+    args = ["install", "-q"]
+    offline = LOCK.exists() and WHEELHOUSE.is_dir()
+    if offline:
+        args += ["--no-index", "--find-links", str(WHEELHOUSE)]
+    started = time.monotonic()
+    result = _pip(*args, *_sources())
+    elapsed = round(time.monotonic() - started, 1)
+    if result.returncode != 0:
+        raise RuntimeError(f"pip install failed after {elapsed}s:\n{result.stderr}")
+
+    stamps[sys.executable] = key
+    STAMP.write_text(json.dumps(stamps, indent=2))
+    return {"skipped": False, "hash": key[:12], "seconds": elapsed, "offline": offline,
+            "source": "requirements.lock" if LOCK.exists() else "requirements.txt"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["lock", "install"])
+    parser.add_argument("--force", action="store_true", help="install even if the lock hash is unchanged")
+    args = parser.parse_args()
+
+    try:
+        report = build_lock() if args.command == "lock" else install(args.force)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""
+APEX OMNIBUS SUPREME - Test Configuration
+The gateway modules import each other as top-level modules from apex/
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "apex"))
@@ -0,0 +1,122 @@
+"""
+APEX OMNIBUS SUPREME - Memory Add Deduplication Tests
+Dead-lettered adds must stop being answered as duplicates
+"""
+
+import asyncio
+
+from dedup import DedupIndex
+from wal import WriteBehindLog
+
+USER = "casey"
+CONTENT = "Meeting moved to Friday"
+METADATA = {"source": "calendar"}
+
+
+def test_dead_lettered_add_is_evicted(tmp_path):
+    index = DedupIndex(snapshot_path=None)
+    adds = []
+    outage = asyncio.Event()
+
+    async def upstream_down(record):
+        await outage.wait()
+        raise ConnectionError("memory_nexus unreachable")
+
+    async def dead_lettered(record):
+        # As the gateway wires it (api._memory_add_dead_lettered)
+        index.forget(record["item"]["user_id"], record["item"]["content"], record["item"].get("metadata"),
+                     record["id"])
+
+    async def run():
+        log = WriteBehindLog(str(tmp_path), upstream_down, fsync_interval=0, max_attempts=1,
+                             on_dead_letter=dead_lettered)
+        await log.start()
+
+        async def add():
+            record = await log.append({"content": CONTENT, "user_id": USER, "metadata": METADATA}, "mem0")
+            adds.append(record["id"])
+            return {"memory_id": record["id"], "backend_used": "mem0"}
+
+        first, duplicate = await index.add_once(USER, CONTENT, METADATA, add)
+        assert not duplicate
+        again, duplicate = await index.add_once(USER, CONTENT, METADATA, add)
+        assert duplicate and again["memory_id"] == first["memory_id"]
+
+        outage.set()
+        for _ in range(100):
+            if log.status(first["memory_id"])["status"] == "failed":
+                break
+            await asyncio.sleep(0.01)
+        assert log.dead_lettered == 1
+
+        retried, duplicate = await index.add_once(USER, CONTENT, METADATA, add)
+        await log.stop()
+        return retried, duplicate
+
+    retried, duplicate = asyncio.run(run())
+    assert not duplicate
+    assert len(adds) == 2 and retried["memory_id"] == adds[1]
+
+
+def test_add_dead_lettered_while_in_flight_is_not_recorded():
+    index = DedupIndex(snapshot_path=None)
+
+    async def run():
+        async def add():
+            # The write-behind log gave up on it before the add returned
+            index.forget(USER, CONTENT, METADATA, "pending_1")
+            return {"memory_id": "pending_1", "backend_used": "mem0"}
+
+        await index.add_once(USER, CONTENT, METADATA, add)
+
+    asyncio.run(run())
+    assert index.stats()["entries"] == 0
+    assert not index.forgotten_inflight
+
+
+def test_forget_ignores_a_newer_memory_id():
+    index = DedupIndex(snapshot_path=None)
+
+    async def run():
+        async def add():
+            return {"memory_id": "mem_2", "backend_used": "mem0"}
+        await index.add_once(USER, CONTENT, METADATA, add)
+
+    asyncio.run(run())
+    # A dead letter for an older add of the same content leaves the newer one
+    index.forget(USER, CONTENT, METADATA, "mem_1")
+    assert index.stats()["entries"] == 1
+
+
+def test_forgotten_entry_is_not_merged_back_from_snapshot(tmp_path):
+    snapshot = str(tmp_path / "snapshot")
+    worker_a = DedupIndex(snapshot_path=snapshot)
+    worker_b = DedupIndex(snapshot_path=snapshot)
+
+    async def run():
+        async def add():
+            return {"memory_id": "pending_1", "backend_used": "mem0"}
+
+        await worker_a.add_once(USER, CONTENT, METADATA, add)
+        await worker_a.save()
+        assert await worker_b.save() == 1
+
+        worker_a.forget(USER, CONTENT, METADATA, "pending_1")
+        await worker_a.save()
+        # Worker B still holds the entry and writes it back into the snapshot
+        await worker_b.save()
+        assert await worker_a.save() == 0
+
+        fresh = DedupIndex(snapshot_path=snapshot)
+        await fresh.save()
+        calls = []
+
+        async def re_add():
+            calls.append(1)
+            return {"memory_id": "mem_9", "backend_used": "mem0"}
+
+        _, duplicate = await worker_a.add_once(USER, CONTENT, METADATA, re_add)
+        return duplicate, calls
+
+    duplicate, calls = asyncio.run(run())
+    assert not duplicate and calls == [1]
@@ -0,0 +1,50 @@
+"""
+APEX OMNIBUS SUPREME - Shared Worker State Tests
+The mmap-backed table shared by gateway worker processes
+"""
+
+import multiprocessing
+
+from shared import SharedTable
+
+INCREMENTS = 5000
+
+
+def _increment(path, start):
+    table = SharedTable(path, slots=64, slot_bytes=1024)
+    start.wait()
+    for _ in range(INCREMENTS):
+        table.update("counter", lambda value: (str(int(value or b"0") + 1).encode(), None))
+    table.set(f"written-by-{multiprocessing.current_process().name}", b"done")
+    table.close()
+
+
+def test_update_is_atomic_across_processes(tmp_path):
+    path = str(tmp_path / "state")
+    context = multiprocessing.get_context("fork")
+    start = context.Event()
+    workers = [context.Process(target=_increment, args=(path, start), name=f"w{i}") for i in range(2)]
+    for worker in workers:
+        worker.start()
+    start.set()
+    for worker in workers:
+        worker.join(30)
+        assert worker.exitcode == 0
+
+    table = SharedTable(path, slots=64, slot_bytes=1024)
+    try:
+        assert table.get("counter") == str(2 * INCREMENTS).encode()
+        assert table.get("written-by-w0") == b"done"
+        assert table.get("written-by-w1") == b"done"
+    finally:
+        table.close()
+
+
+def test_oversized_value_is_refused(tmp_path):
+    table = SharedTable(str(tmp_path / "state"), slots=8, slot_bytes=512)
+    try:
+        assert not table.set("big", b"x" * 512)
+        assert table.get("big") is None
+        assert table.stats()["refused_too_large"] == 1
+    finally:
+        table.close()
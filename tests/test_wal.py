@@ -0,0 +1,108 @@
+"""
+APEX OMNIBUS SUPREME - Write-Behind Log Tests
+Crash recovery and segment rotation of the memory-add WAL
+"""
+
+import asyncio
+
+from wal import WriteBehindLog
+
+
+async def _never_sends(record):
+    # Keeps records pending so a "crash" leaves them in the log
+    await asyncio.Event().wait()
+
+
+def test_replay_skips_torn_tail_of_partial_segment(tmp_path):
+    async def write_then_crash():
+        log = WriteBehindLog(str(tmp_path), _never_sends, fsync_interval=0)
+        await log.start()
+        records = [await log.append({"content": f"m{i}"}, "mem0") for i in range(3)]
+        await log.stop()
+        return log.directory, records
+
+    directory, written = asyncio.run(write_then_crash())
+    [segment] = directory.glob("wal-*.log")
+    with open(segment, "ab") as f:
+        f.write(b'{"seq": 4, "id": "pending_torn", "item": {"con')
+
+    delivered = []
+
+    async def recover():
+        async def send(record):
+            delivered.append(record["id"])
+            return {"memory_id": f"mem_{record['seq']}"}
+
+        log = WriteBehindLog(str(tmp_path), send, fsync_interval=0)
+        await log.start()
+        assert log.replayed == 3
+        record = await log.append({"content": "after restart"}, "mem0")
+        for _ in range(100):
+            if not log.pending:
+                break
+            await asyncio.sleep(0.01)
+        await log.stop()
+        return log, record
+
+    log, record = asyncio.run(recover())
+    assert delivered == [r["id"] for r in written] + [record["id"]]
+    # The torn record was never acknowledged, so its seq is reused
+    assert record["seq"] == 4
+    assert log.checkpoint == 4
+    assert all(log.status(r["id"])["status"] == "written" for r in written)
+
+
+class _Recorder:
+    """Stands in for a segment file, logging the calls made on it"""
+
+    def __init__(self, file, calls):
+        self.file = file
+        self.calls = calls
+
+    def flush(self):
+        self.calls.append("flush")
+        self.file.flush()
+
+    def fileno(self):
+        self.calls.append("fileno")
+        return self.file.fileno()
+
+    def close(self):
+        self.calls.append("close")
+        self.file.close()
+
+
+def test_rotated_segment_is_fsynced_before_close(tmp_path, monkeypatch):
+    import wal
+
+    calls = []
+    fsynced = []
+    real_fsync = wal.os.fsync
+
+    def fsync(fd):
+        calls.append("fsync")
+        fsynced.append(fd)
+        real_fsync(fd)
+
+    monkeypatch.setattr(wal.os, "fsync", fsync)
+
+    async def run():
+        log = WriteBehindLog(str(tmp_path), _never_sends, fsync_interval=0, segment_bytes=1)
+        await log.start()
+        first = log.active.path
+        await log.append({"content": "fills the first segment"}, "mem0")
+        assert log.active.path != first
+        [retired] = log.retired
+        old_fd = retired.fileno()
+        log.retired = [_Recorder(retired, calls)]
+        calls.clear()
+        fsynced.clear()
+        await log.append({"content": "lands in the next segment"}, "mem0")
+        await log.stop()
+        return old_fd, retired
+
+    old_fd, retired = asyncio.run(run())
+    assert retired.closed
+    assert old_fd in fsynced
+    assert calls.index("fsync") < calls.index("close")
+    assert calls.count("close") == 1